@@ -0,0 +1,109 @@
+"""Compare memory and time of loading a stored revoked set at boot.
+
+``full`` decompresses the whole blob, decodes it into a new ``LimitedSet``
+and copies that into the worker's set with ``update()``. ``streaming``
+decompresses piece by piece and merges each block straight into the
+worker's set (``RedisStateDB.get_state(into=...)``).
+
+The merge table compares merging an already loaded set into the worker's
+(tracked) revoked set with ``update()`` plus ``purge()`` and with
+``serialization.merge_set()``, 10% of the entries being expired.
+
+Usage::
+
+    python benchmarks/bench_load.py [--sizes 10000,100000,1000000] [--codec zlib]
+"""
+
+import argparse
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from bench_serialization import make_revoked
+from celery.utils.collections import LimitedSet  # type: ignore[attr-defined]
+
+from celery_redis_statedb import compression, serialization
+from celery_redis_statedb.tracking import RevokedTracker
+
+
+def load_full(blob: bytes, target: LimitedSet) -> None:
+    target.update(serialization.loads(compression.decode(blob)[1]))
+
+
+def load_streaming(blob: bytes, target: LimitedSet) -> None:
+    serialization.merge(target, serialization.iter_blocks(compression.decode_stream(blob)[1]))
+
+
+def measure(blob: bytes, size: int, load: Callable[[bytes, LimitedSet], None]) -> tuple[float, int]:
+    """Return time and transient memory of ``load``.
+
+    Transient memory is the peak of allocations while loading minus what
+    the loaded set retains, measured in a second, traced run.
+    """
+    target = LimitedSet(maxlen=size)
+    start = time.perf_counter()
+    load(blob, target)
+    elapsed = time.perf_counter() - start
+    assert len(target) == size
+
+    del target
+    target = LimitedSet(maxlen=size)
+    tracemalloc.start()
+    load(blob, target)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak - retained
+
+
+def merge_update(target: LimitedSet, loaded: LimitedSet) -> None:
+    target.update(loaded)
+    target.purge()
+
+
+def merge_bulk(target: LimitedSet, loaded: LimitedSet) -> None:
+    serialization.merge_set(target, loaded)
+
+
+def measure_merge(
+    loaded: LimitedSet, size: int, merge: Callable[[LimitedSet, LimitedSet], None]
+) -> tuple[float, int]:
+    # Stamps of make_revoked() span size / 10 seconds, expire the oldest 10%.
+    target = LimitedSet(maxlen=size, expires=size * 0.09)
+    RevokedTracker(target)
+    start = time.perf_counter()
+    merge(target, loaded)
+    return time.perf_counter() - start, len(target)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma separated set sizes")
+    parser.add_argument("--codec", default="zlib", help="codec of the stored blob")
+    args = parser.parse_args()
+    codec = compression.get_codec(args.codec)
+
+    sizes = [int(value) for value in args.sizes.split(",")]
+
+    print(f"{'load':<10} {'items':>9} {'blob':>12} {'transient':>12} {'time':>10}")
+    for size in sizes:
+        revoked = make_revoked(size)
+        blob = compression.encode(serialization.dumps(revoked), codec, compression.FORMAT_BINARY)
+        del revoked
+        for name, load in (("full", load_full), ("streaming", load_streaming)):
+            elapsed, transient = measure(blob, size, load)
+            print(
+                f"{name:<10} {size:>9} {len(blob):>12,} "
+                f"{transient / 1e6:>10.1f}MB {elapsed * 1000:>8.1f}ms"
+            )
+
+    print()
+    print(f"{'merge':<10} {'items':>9} {'kept':>12} {'time':>10}")
+    for size in sizes:
+        loaded = make_revoked(size)
+        for name, merge in (("update", merge_update), ("bulk", merge_bulk)):
+            elapsed, kept = measure_merge(loaded, size, merge)
+            print(f"{name:<10} {size:>9} {kept:>12,} {elapsed * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
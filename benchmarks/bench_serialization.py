@@ -0,0 +1,85 @@
+"""Compare revoked set serialization formats.
+
+Measures blob size and round-trip time of the revoked ``LimitedSet`` for
+Celery's format (pickle + zlib, what ``RedisStateDB`` used to write) and
+the ``binary`` serializer with each available codec.
+
+Usage::
+
+    python benchmarks/bench_serialization.py [--sizes 10000,50000] [--repeat 5]
+"""
+
+import argparse
+import time
+import uuid
+import zlib
+from collections.abc import Callable
+from typing import Any
+
+from celery.exceptions import ImproperlyConfigured
+from celery.utils.collections import LimitedSet  # type: ignore[attr-defined]
+from kombu.serialization import pickle, pickle_protocol  # type: ignore[attr-defined]
+
+from celery_redis_statedb import compression, serialization
+
+
+def make_revoked(size: int) -> LimitedSet:
+    revoked = LimitedSet(maxlen=size)
+    now = time.monotonic()
+    for i in range(size):
+        revoked.add(str(uuid.uuid4()), now=now - (size - i) * 0.1)
+    return revoked
+
+
+def best_of(repeat: int, func: Callable[[], Any]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def formats() -> dict[str, tuple[Callable[[LimitedSet], bytes], Callable[[bytes], LimitedSet]]]:
+    result = {
+        "pickle+zlib": (
+            lambda revoked: zlib.compress(pickle.dumps(revoked, protocol=pickle_protocol)),
+            lambda blob: pickle.loads(zlib.decompress(blob)),
+        )
+    }
+    for name in ("none", "zlib", "zstd", "lz4"):
+        try:
+            codec = compression.get_codec(name)
+        except ImproperlyConfigured:
+            continue  # codec extra not installed
+        result[f"binary+{name}"] = (
+            lambda revoked, codec=codec: compression.encode(
+                serialization.dumps(revoked), codec, compression.FORMAT_BINARY
+            ),
+            lambda blob: serialization.loads(compression.decode(blob)[1]),
+        )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,50000", help="comma separated set sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement (best kept)")
+    args = parser.parse_args()
+
+    print(f"{'format':<16} {'items':>9} {'size':>12} {'dumps':>10} {'loads':>10}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        revoked = make_revoked(size)
+        for name, (dumps, loads) in formats().items():
+            blob = dumps(revoked)
+            assert set(loads(blob)) == set(revoked)
+            dump_time = best_of(args.repeat, lambda: dumps(revoked))
+            load_time = best_of(args.repeat, lambda: loads(blob))
+            print(
+                f"{name:<16} {size:>9} {len(blob):>12,} "
+                f"{dump_time * 1000:>8.1f}ms {load_time * 1000:>8.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,14 @@
+import importlib
 import logging
-from typing import TYPE_CHECKING
-
-from click import Option
-
-from celery_redis_statedb.bootstep import RedisStatePersistence
-from celery_redis_statedb.migration import StateDBMigrator
-from celery_redis_statedb.state import RedisPersistent, RedisStateDB
+from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from celery import Celery
 
+    from celery_redis_statedb.bootstep import RedisStatePersistence
+    from celery_redis_statedb.migration import StateDBMigrator
+    from celery_redis_statedb.state import RedisPersistent, RedisStateDB
+
 __version__ = "0.1.0"
 __all__ = [
     "RedisStateDB",
@@ -27,6 +26,29 @@ persistence.
 
 logger = logging.getLogger(__name__)
 
+# Exported classes are imported on first access (PEP 562): app modules
+# calling install_redis_statedb, and the celery command, do not load redis,
+# the state layer or the migration code until a worker needs them.
+_LAZY_ATTRIBUTES = {
+    "RedisStateDB": "celery_redis_statedb.state",
+    "RedisPersistent": "celery_redis_statedb.state",
+    "RedisStatePersistence": "celery_redis_statedb.bootstep",
+    "StateDBMigrator": "celery_redis_statedb.migration",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *_LAZY_ATTRIBUTES])
+
 
 def install_redis_statedb(app: "Celery") -> None:
     """Install Redis StateDB on a Celery app.
@@ -51,6 +73,10 @@ def install_redis_statedb(app: "Celery") -> None:
         >>> # celery -A myapp worker --redis-statedb=redis://localhost:6379/0 --migrate-statedb=/path/to/worker.db
 
     """
+    from click import Option
+
+    from celery_redis_statedb.bootstep import RedisStatePersistence
+
     # Add the --redis-statedb option to worker command using Celery's extension API
     assert app.user_options is not None, "Celery app.user_options is not initialized"
     app.user_options["worker"].add(
@@ -58,7 +84,10 @@ def install_redis_statedb(app: "Celery") -> None:
             ("--redis-statedb",),
             type=str,
             default=None,
-            help="Redis URL for state persistence (e.g., redis://localhost:6379/0). ",
+            help=(
+                "Redis URL for state persistence "
+                "(e.g., redis://localhost:6379/0, or sentinel:// URLs). "
+            ),
         )
     )
     app.user_options["worker"].add(
@@ -71,6 +100,15 @@ def install_redis_statedb(app: "Celery") -> None:
         )
     )
 
+    app.user_options["worker"].add(
+        Option(
+            ("--redis-statedb-codec",),
+            type=str,
+            default=None,
+            help="Compression codec for state stored in Redis (zlib, zstd, lz4 or none).",
+        )
+    )
+
     logger.debug("[redis-statedb] Registered --redis-statedb CLI option for worker command")
 
     # Add Redis-based StateDB
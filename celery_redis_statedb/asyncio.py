@@ -0,0 +1,405 @@
+"""Asyncio variants of the Redis state database and persistent state.
+
+:class:`AsyncRedisStateDB` has the same interface as
+:class:`~celery_redis_statedb.state.RedisStateDB` with coroutine methods on
+a ``redis.asyncio`` client. The storage logic (queued commands, parsing of
+replies, digests, catch-up) is shared with the synchronous class, so both
+read and write the same keys and formats.
+
+This lets services embedding the state layer in asyncio code (admin APIs,
+sidecars, tests) run the state I/O of many workers concurrently::
+
+    dbs = [AsyncRedisStateDB(url, name) for name in worker_names]
+    states = await asyncio.gather(*(db.get_state() for db in dbs))
+"""
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+import redis
+import redis.asyncio as aioredis
+from celery.utils.collections import LimitedSet  # type: ignore[attr-defined]
+
+from celery_redis_statedb import retry
+from celery_redis_statedb.state import (
+    CLIENT_OPTIONS,
+    SAVE_FAILED,
+    SAVE_SKIPPED,
+    SAVE_SYNCED,
+    STORAGE_JOURNAL,
+    STORAGE_SHARED,
+    STORAGE_ZSET,
+    BaseRedisPersistent,
+    BaseRedisStateDB,
+    _Commands,
+)
+from celery_redis_statedb.tracking import RevokedChanges
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class AsyncRedisStateDB(BaseRedisStateDB):
+    """Redis-based state database on a ``redis.asyncio`` client.
+
+    See :class:`~celery_redis_statedb.state.BaseRedisStateDB` for storage
+    modes and settings.
+    """
+
+    cluster_transactions = hasattr(aioredis.cluster, "TransactionStrategy")
+
+    def _create_client(self, redis_url: str, **options: Any) -> Any:
+        if self.connection_pool is not None:
+            # A redis.asyncio pool, bound to the event loop using it.
+            pool = self.connection_pool
+            if options:
+                pool = type(pool)(
+                    connection_class=pool.connection_class,
+                    **{**pool.connection_kwargs, **options},
+                )
+            return aioredis.Redis(connection_pool=pool)
+        if self.sentinel_url is not None:
+            self.sentinel = aioredis.sentinel.Sentinel(
+                self.sentinel_url.sentinels, **self.sentinel_url.connection_kwargs, **CLIENT_OPTIONS
+            )
+            return self.sentinel.master_for(self.sentinel_master, **options)
+        from_url = aioredis.RedisCluster.from_url if self.cluster else aioredis.from_url
+        return from_url(redis_url, **{**CLIENT_OPTIONS, **options})
+
+    async def _call(self, operation: Callable[[], Awaitable[_T]]) -> _T:
+        """Run a Redis operation, retrying it on connection errors and timeouts.
+
+        Raises:
+            redis.RedisError: The error of the last attempt, or
+                :class:`~celery_redis_statedb.retry.CircuitOpenError`
+        """
+        self.breaker.check()
+        started = time.monotonic()
+        retries = 0
+        while True:
+            try:
+                result = await operation()
+            except retry.RETRY_ERRORS as exc:
+                delay = self._retry_delay(retries, started, exc)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                retries += 1
+            else:
+                self.breaker.record_success()
+                return result
+
+    async def update(
+        self,
+        zrevoked: LimitedSet,
+        clock: int | None,
+        changes: RevokedChanges | None = None,
+    ) -> bool:
+        """Write the revoked tasks and clock to Redis.
+
+        Args:
+            zrevoked: Current revoked tasks
+            clock: Clock value to store, or None to leave the stored clock alone
+            changes: Changes since the previous update. Journal storage appends
+                only these; without them a full snapshot is written.
+
+        Returns:
+            True if the state was written, False on Redis errors
+        """
+        try:
+            commands = _Commands()
+            pending = self._queue_update(commands, zrevoked, clock, changes)
+            await self._call(
+                lambda: commands.pipeline(self.redis_client, self._transactional).execute()
+            )
+        except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
+            logger.error("[redis-statedb] Error syncing state to Redis: %s", exc)
+            return False
+        except TypeError as exc:
+            logger.error("[redis-statedb] Cannot serialize revoked tasks: %s", exc)
+            return False
+        self._update_done(pending)
+        return True
+
+    async def get_zrevoked(self) -> LimitedSet | None:
+        if self.storage in (STORAGE_ZSET, STORAGE_SHARED):
+            zrevoked = await self._get_zrevoked_zset()
+            if zrevoked is not None:
+                return zrevoked
+            # Nothing in the sorted set yet, roll forward from blob storage.
+        elif self.storage == STORAGE_JOURNAL:
+            return await self._get_zrevoked_journal()
+        return await self._get_zrevoked_blob()
+
+    async def get_state(self, into: LimitedSet | None = None) -> tuple[LimitedSet | None, int]:
+        """Load the revoked tasks and the clock in a single round trip.
+
+        Args:
+            into: Set to add the revoked tasks to, instead of a new one.
+                Blobs are then decompressed and merged into it piece by
+                piece, never holding the decompressed payload or a second
+                copy of the set in memory.
+
+        Returns:
+            Tuple of (revoked tasks, i.e. ``into`` when given, or None when
+            nothing is stored, clock value or 0)
+        """
+        if self._loads_blob_apart:
+            # The conditional load avoids the transfer, or moves it to a replica.
+            zrevoked = await self._get_zrevoked_blob(into)
+            try:
+                commands = _Commands()
+                self._queue_clock_load(commands)
+                replies = await self._call(
+                    lambda: commands.pipeline(self.redis_client, transaction=False).execute()
+                )
+            except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
+                logger.error("[redis-statedb] Failed to get clock value: %s", exc)
+                return zrevoked, 0
+            return self._parse_clock(zrevoked, replies)
+
+        try:
+            commands = _Commands()
+            self._queue_state_load(commands)
+            replies = await self._call(
+                lambda: commands.pipeline(self.redis_client, transaction=False).execute()
+            )
+        except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
+            logger.error("[redis-statedb] Failed to get worker state: %s", exc)
+            return None, 0
+        return self._parse_state(replies, into)
+
+    async def _get_zrevoked_blob(self, into: LimitedSet | None = None) -> LimitedSet | None:
+        try:
+            value = None
+            if self._loads_blob_apart:
+                digest = await self._call(
+                    lambda: self.redis_client.get(self._get_key("zrevoked_digest"))
+                )
+                zrevoked = self._load_cached(digest, into)
+                if zrevoked is not None:
+                    return zrevoked
+                if self.replica_client is not None and digest is not None:
+                    value = await self._get_replica_blob(digest)
+            if value is None:
+                value = await self._call(lambda: self.redis_client.get(self._get_key("zrevoked")))
+        except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
+            logger.error("[redis-statedb] Failed to get revoked tasks: %s", exc)
+            return self._load_fallback(into)
+        zrevoked = self._parse_blob(value, into)
+        if zrevoked is not None and value is not None:
+            self._store_local(value)
+        return zrevoked
+
+    async def _get_replica_blob(self, digest: bytes) -> bytes | None:
+        """Read the blob from a replica, None unless it holds the current one.
+
+        See :meth:`~celery_redis_statedb.state.RedisStateDB._get_replica_blob`.
+        """
+        try:
+            reply = await self.replica_client.mget(
+                self._get_key("zrevoked"), self._get_key("zrevoked_digest")
+            )
+        except redis.RedisError as exc:
+            logger.warning("[redis-statedb] Failed to load revoked tasks from replica: %s", exc)
+            return None
+        return self._replica_blob(reply, digest)
+
+    async def _get_zrevoked_journal(self) -> LimitedSet | None:
+        try:
+            commands = _Commands()
+            commands.get(self._get_key("zrevoked"))
+            commands.xrange(self._get_key("journal"))
+            value, entries = await self._call(
+                lambda: commands.pipeline(self.redis_client, transaction=False).execute()
+            )
+        except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
+            logger.error("[redis-statedb] Failed to get revoked tasks: %s", exc)
+            return None
+        return self._parse_journal(value, entries)
+
+    async def _get_zrevoked_zset(self) -> LimitedSet | None:
+        try:
+            members = await self._call(
+                lambda: self.redis_client.zrange(self._zset_key, 0, -1, withscores=True)
+            )
+        except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
+            logger.error("[redis-statedb] Failed to get revoked tasks: %s", exc)
+            return None
+        return self._parse_zset(members)
+
+    async def get_clock(self) -> int:
+        try:
+            value = await self._call(lambda: self.redis_client.get(self._get_key("clock")))
+            return int(value) if value else 0
+        except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
+            logger.error("[redis-statedb] Failed to get clock value: %s", exc)
+            return 0
+
+    async def set_clock_max(self, value: int) -> int:
+        """Store ``value`` as clock unless the stored clock is already ahead.
+
+        Returns:
+            The stored clock value, or ``value`` on Redis errors
+        """
+        try:
+            stored = int(
+                await self._call(
+                    lambda: self._clock_max(keys=[self._get_key("clock")], args=[value])
+                )
+            )
+        except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
+            logger.error("[redis-statedb] Failed to set clock value: %s", exc)
+            return value
+        logger.debug("[redis-statedb] Set clock value to %d", stored)
+        return stored
+
+    async def set_clock(self, value: int) -> None:
+        try:
+            await self._call(lambda: self.redis_client.set(self._get_key("clock"), value))
+            logger.debug("[redis-statedb] Set clock value to %d", value)
+        except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
+            logger.error("[redis-statedb] Failed to set clock value: %s", exc)
+
+    async def close(self) -> None:
+        try:
+            # aclose() replaced close() in redis 5.0.1
+            for client in (self.redis_client, self.replica_client):
+                if client is not None:
+                    close = getattr(client, "aclose", None) or client.close
+                    await close()
+            logger.info("[redis-statedb] Closed Redis connection")
+        except Exception as exc:
+            logger.error("[redis-statedb] Error closing Redis connection: %s", exc)
+
+    async def ping(self) -> bool:
+        try:
+            result: bool = await self._call(self.redis_client.ping)
+            return result
+        except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
+            logger.error("[redis-statedb] Error testing redis connection: %s", exc)
+            return False
+
+
+class AsyncRedisPersistent(BaseRedisPersistent):
+    """Persistent state manager doing its I/O with ``asyncio``.
+
+    Unlike :class:`~celery_redis_statedb.state.RedisPersistent`, creating
+    it does not load anything: await :meth:`merge` before use. See
+    :class:`~celery_redis_statedb.state.BaseRedisPersistent` for the
+    arguments.
+
+    Attributes:
+        loaded: Whether :meth:`merge` completed. Syncs and saves are skipped
+            until then, so that the stored state is never overwritten by a
+            set it was not merged into.
+    """
+
+    db_class = AsyncRedisStateDB
+    redis_db: AsyncRedisStateDB
+    loaded = False
+
+    async def merge(self) -> None:
+        """Merge existing Redis state into worker state.
+
+        Records of the write-ahead log are merged too and synced to Redis.
+        """
+        zrevoked, clock_value = await self.db.get_state(into=self._revoked_tasks)
+        self._merge_revoked(zrevoked)
+        if self.clock:
+            new_value = self.clock.adjust(clock_value)
+            stored = await self.db.set_clock_max(new_value)
+            if stored > new_value:
+                # Written by another process since it was read.
+                self.clock.adjust(stored)
+        self.loaded = True
+        if self._replay_wal():
+            await self.sync()
+
+    async def sync(self) -> None:
+        """Synchronize current state to Redis."""
+        if not self.loaded:
+            logger.warning("[redis-statedb] Worker state still loading, skipping sync")
+            return
+        pending = self._begin_sync()
+        if pending is None:
+            if self.clock:
+                await self.db.set_clock(self.clock.forward())
+            return
+
+        generation, changes, zrevoked = pending
+        started = time.monotonic()
+        success = await self.db.update(
+            zrevoked=zrevoked,
+            clock=self.clock.forward() if self.clock else 0,
+            changes=changes,
+        )
+        self._end_sync(generation, changes, success, time.monotonic() - started)
+
+    async def save(self, deadline: float | None = None) -> str:
+        """Save state and close connections.
+
+        See :meth:`~celery_redis_statedb.state.RedisPersistent.save`.
+        """
+        started = time.monotonic()
+        if deadline is None:
+            deadline = self._save_deadline()
+        try:
+            logger.info("[redis-statedb] Saving worker state to Redis")
+            outcome = await self._save(deadline)
+        except Exception as exc:
+            logger.error("[redis-statedb] Failed to save state: %s", exc)
+            outcome = SAVE_FAILED
+        await self.close()
+        self._report_save(outcome, started)
+        return outcome
+
+    async def _save(self, deadline: float | None) -> str:
+        if not self.loaded:
+            logger.warning("[redis-statedb] Worker state still loading, not saving it")
+            return SAVE_SKIPPED
+        sync_deadline = self._sync_deadline(deadline)
+        try:
+            if self._should_sync(sync_deadline) and await self._sync_before(sync_deadline):
+                return SAVE_SYNCED
+        except Exception as exc:
+            logger.error("[redis-statedb] Failed to save state to Redis: %s", exc)
+        return self._save_locally(deadline)
+
+    async def _sync_before(self, deadline: float | None) -> bool:
+        """Sync to Redis, giving up at ``deadline``.
+
+        Returns:
+            True if the state was written to Redis
+        """
+        if deadline is None:
+            await self.sync()
+            return not self._sync_failed
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        try:
+            # Cancelled when late, Redis applies a transaction whole or not at
+            # all. Nothing keeps running on the client closed after the save.
+            await asyncio.wait_for(self.sync(), remaining)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "[redis-statedb] Sync to Redis not done after %.2f seconds, giving up", remaining
+            )
+            return False
+        return not self._sync_failed
+
+    async def close(self) -> None:
+        """Close Redis connection."""
+        try:
+            await self.db.close()
+        except Exception as exc:
+            logger.error("[redis-statedb] Failed to close Redis connection: %s", exc)
+
+    @property
+    def db(self) -> AsyncRedisStateDB:
+        return self.redis_db
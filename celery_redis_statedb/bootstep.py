@@ -4,22 +4,56 @@ import os
 from typing import TYPE_CHECKING, Any
 
 from celery import bootsteps
+from celery.exceptions import ImproperlyConfigured
+from celery.signals import worker_shutting_down
+from celery.utils.nodenames import node_format
+from celery.utils.serialization import strtobool
 
-from celery_redis_statedb.migration import StateDBMigrator
-from celery_redis_statedb.state import RedisPersistent
+from celery_redis_statedb import offload, sentinel
+from celery_redis_statedb.compression import DEFAULT_CODEC
 
 if TYPE_CHECKING:
     from celery.apps.worker import Worker
 
+    from celery_redis_statedb.state import RedisPersistent
+
 logger = logging.getLogger(__name__)
 
 
-class RedisStatePersistence(bootsteps.Step):
+DEFAULT_KEY_PREFIX = "celery:worker:state:"
+DEFAULT_SYNC_INTERVAL = 60.0
+DEFAULT_FLUSH_DELAY = 0.0
+DEFAULT_LOAD_TIMEOUT = 30.0
+DEFAULT_JOURNAL_MAX_LEN = 10_000
+DEFAULT_SHUTDOWN_TIMEOUT = 0.0
+
+
+def _get_setting(worker: "Worker", name: str, env_var: str, default: Any) -> Any:
+    """Read a setting from the environment first, then app.conf, then default."""
+    return os.environ.get(
+        env_var,
+        getattr(worker.app.conf, name, default),  # type: ignore[attr-defined]
+    )
+
+
+class RedisStatePersistence(bootsteps.StartStopStep):
     """Celery bootstep for Redis-based state persistence.
 
     This bootstep adds Celery state persistence with Redis.
     Revoked tasks persist indefinitely in Redis.
 
+    State is synced periodically from the worker timer (every
+    ``redis_state_sync_interval`` seconds) and once more at shutdown.
+    With ``redis_state_flush_delay`` set, changes of the revoked tasks are
+    also written behind: the first change schedules a sync that far ahead
+    and every change until it runs is written with it.
+
+    With ``redis_state_background_load`` the stored state is loaded from a
+    thread started when the step is created, while the other steps create
+    and start (e.g. the pool spawns its processes). The step's start then
+    waits at most ``redis_state_load_timeout`` seconds for it to complete or
+    fail, before the consumer starts receiving tasks.
+
     Usage:
         Add to Celery worker configuration:
 
@@ -35,16 +69,27 @@ class RedisStatePersistence(bootsteps.Step):
         ```
     """
 
+    # Started after the pool, so that its processes spawn while the state
+    # is loaded in the background.
+    requires = ("celery.worker.components:Timer", "celery.worker.components:Pool")
+
     def __init__(
         self,
         worker: "Worker",
         redis_statedb: str | None = None,
         migrate_statedb: str | None = None,
+        redis_statedb_codec: str | None = None,
         **kwargs: Any,
     ) -> None:
         # Store redis_statedb and migrate_statedb for later use
         self.redis_statedb = redis_statedb
         self.migrate_statedb = migrate_statedb
+        self.redis_statedb_codec = redis_statedb_codec
+        self.sync_interval = DEFAULT_SYNC_INTERVAL
+        self.flush_delay = DEFAULT_FLUSH_DELAY
+        self.load_timeout = DEFAULT_LOAD_TIMEOUT
+        self._sync_tref: Any = None
+        self._flush_tref: Any = None
         # Check if statedb is configured
         self.enabled = self._should_enable(worker, redis_statedb)
         # worker._persistence = None  # type: ignore[attr-defined]
@@ -53,13 +98,17 @@ class RedisStatePersistence(bootsteps.Step):
     def _should_enable(self, worker: "Worker", redis_statedb: str | None) -> bool:
         # Prioritize --redis-statedb over --statedb
         if redis_statedb:
-            return redis_statedb.startswith(("redis://", "rediss://"))
+            return redis_statedb.startswith(("redis://", "rediss://", "sentinel://"))
 
         return False
 
     def create(self, worker: "Worker") -> None:
         if not self.enabled:
             return
+        # Imported once enabled, workers without --redis-statedb never load
+        # redis and the state layer.
+        from celery_redis_statedb import pools, retry
+        from celery_redis_statedb.state import DEFAULT_SERIALIZER, STORAGE_BLOB, RedisPersistent
 
         # Use redis_statedb if provided
         redis_url = self.redis_statedb
@@ -67,13 +116,143 @@ class RedisStatePersistence(bootsteps.Step):
         worker_name = worker.hostname  # type: ignore[attr-defined]
 
         # Check environment variable first, then app.conf, then default
-        key_prefix = os.environ.get(
-            "CELERY_REDIS_STATE_KEY_PREFIX",
-            getattr(
-                worker.app.conf,  # type: ignore[attr-defined]
-                "redis_state_key_prefix",
-                "celery:worker:state:",
-            ),
+        key_prefix = _get_setting(
+            worker, "redis_state_key_prefix", "CELERY_REDIS_STATE_KEY_PREFIX", DEFAULT_KEY_PREFIX
+        )
+        self.sync_interval = float(
+            _get_setting(
+                worker,
+                "redis_state_sync_interval",
+                "CELERY_REDIS_STATE_SYNC_INTERVAL",
+                DEFAULT_SYNC_INTERVAL,
+            )
+        )
+        self.flush_delay = float(
+            _get_setting(
+                worker,
+                "redis_state_flush_delay",
+                "CELERY_REDIS_STATE_FLUSH_DELAY",
+                DEFAULT_FLUSH_DELAY,
+            )
+        )
+        storage = _get_setting(
+            worker, "redis_state_storage", "CELERY_REDIS_STATE_STORAGE", STORAGE_BLOB
+        )
+        # --redis-statedb-codec wins over environment and app.conf
+        codec = self.redis_statedb_codec or _get_setting(
+            worker, "redis_state_codec", "CELERY_REDIS_STATE_CODEC", DEFAULT_CODEC
+        )
+        serializer = _get_setting(
+            worker, "redis_state_serializer", "CELERY_REDIS_STATE_SERIALIZER", DEFAULT_SERIALIZER
+        )
+        allow_pickle = strtobool(
+            _get_setting(
+                worker, "redis_state_allow_pickle", "CELERY_REDIS_STATE_ALLOW_PICKLE", True
+            )
+        )
+        catch_up = strtobool(
+            _get_setting(worker, "redis_state_catch_up", "CELERY_REDIS_STATE_CATCH_UP", False)
+        )
+        # Enabled on gevent/eventlet pools unless configured otherwise
+        cooperative = _get_setting(
+            worker, "redis_state_cooperative", "CELERY_REDIS_STATE_COOPERATIVE", "auto"
+        )
+        cooperative = offload.is_green() if cooperative == "auto" else strtobool(cooperative)
+        local_snapshot = _get_setting(
+            worker, "redis_state_local_snapshot", "CELERY_REDIS_STATE_LOCAL_SNAPSHOT", None
+        )
+        if local_snapshot:
+            # %n, %h and %d expand like in --statedb
+            local_snapshot = node_format(local_snapshot, worker_name)
+        max_retries = int(
+            _get_setting(worker, "redis_state_max_retries", "CELERY_REDIS_STATE_MAX_RETRIES", 3)
+        )
+        retry_delay = float(
+            _get_setting(worker, "redis_state_retry_delay", "CELERY_REDIS_STATE_RETRY_DELAY", 0.1)
+        )
+        retry_deadline = float(
+            _get_setting(
+                worker,
+                "redis_state_retry_deadline",
+                "CELERY_REDIS_STATE_RETRY_DEADLINE",
+                retry.DEFAULT_DEADLINE,
+            )
+        )
+        breaker_threshold = int(
+            _get_setting(
+                worker,
+                "redis_state_breaker_threshold",
+                "CELERY_REDIS_STATE_BREAKER_THRESHOLD",
+                retry.DEFAULT_THRESHOLD,
+            )
+        )
+        breaker_reset_timeout = float(
+            _get_setting(
+                worker,
+                "redis_state_breaker_reset_timeout",
+                "CELERY_REDIS_STATE_BREAKER_RESET_TIMEOUT",
+                retry.DEFAULT_RESET_TIMEOUT,
+            )
+        )
+        cluster = strtobool(
+            _get_setting(worker, "redis_state_cluster", "CELERY_REDIS_STATE_CLUSTER", False)
+        )
+        sentinel_master = _get_setting(
+            worker, "redis_state_sentinel_master", "CELERY_REDIS_STATE_SENTINEL_MASTER", None
+        )
+        replica_reads = strtobool(
+            _get_setting(
+                worker, "redis_state_replica_reads", "CELERY_REDIS_STATE_REPLICA_READS", False
+            )
+        )
+        connection_pool = None
+        if strtobool(
+            _get_setting(worker, "redis_state_shared_pool", "CELERY_REDIS_STATE_SHARED_POOL", False)
+        ):
+            if cluster or sentinel.is_sentinel_url(redis_url):
+                raise ImproperlyConfigured(
+                    "redis_state_shared_pool cannot be used with cluster mode or Sentinel"
+                )
+            connection_pool = pools.get_pool(redis_url, app=worker.app)  # type: ignore[attr-defined]
+        local_wal = _get_setting(
+            worker, "redis_state_local_wal", "CELERY_REDIS_STATE_LOCAL_WAL", None
+        )
+        if local_wal:
+            local_wal = node_format(local_wal, worker_name)
+        background_load = strtobool(
+            _get_setting(
+                worker,
+                "redis_state_background_load",
+                "CELERY_REDIS_STATE_BACKGROUND_LOAD",
+                False,
+            )
+        )
+        if background_load and self.migrate_statedb:
+            # The migration merges what it stored, load in line with it.
+            background_load = False
+        self.load_timeout = float(
+            _get_setting(
+                worker,
+                "redis_state_load_timeout",
+                "CELERY_REDIS_STATE_LOAD_TIMEOUT",
+                DEFAULT_LOAD_TIMEOUT,
+            )
+        )
+        journal_max_len = int(
+            _get_setting(
+                worker,
+                "redis_state_journal_max_len",
+                "CELERY_REDIS_STATE_JOURNAL_MAX_LEN",
+                DEFAULT_JOURNAL_MAX_LEN,
+            )
+        )
+        shutdown_timeout = float(
+            _get_setting(
+                worker,
+                "redis_state_shutdown_timeout",
+                "CELERY_REDIS_STATE_SHUTDOWN_TIMEOUT",
+                DEFAULT_SHUTDOWN_TIMEOUT,
+            )
         )
 
         logger.info(
@@ -90,8 +269,36 @@ class RedisStatePersistence(bootsteps.Step):
                 state=worker.state,  # type: ignore[attr-defined]
                 redis_url=redis_url,
                 clock=worker.app.clock,  # type: ignore[attr-defined]
+                storage=storage,
+                journal_max_len=journal_max_len,
+                codec=codec,
+                serializer=serializer,
+                allow_pickle=allow_pickle,
+                catch_up=catch_up,
+                cooperative=cooperative,
+                local_snapshot=local_snapshot,
+                local_wal=local_wal,
+                shutdown_timeout=shutdown_timeout,
+                max_retries=max_retries,
+                retry_delay=retry_delay,
+                retry_deadline=retry_deadline,
+                breaker_threshold=breaker_threshold,
+                breaker_reset_timeout=breaker_reset_timeout,
+                cluster=cluster,
+                sentinel_master=sentinel_master,
+                replica_reads=replica_reads,
+                connection_pool=connection_pool,
+                merge=not background_load,
             )
             atexit.register(worker._redis_persistence.save)  # type: ignore[attr-defined]
+            if shutdown_timeout > 0:
+                # The timeout runs from the shutdown request, not from the
+                # save after the pool stopped.
+                worker_shutting_down.connect(
+                    worker._redis_persistence.begin_shutdown  # type: ignore[attr-defined]
+                )
+            if background_load:
+                worker._redis_persistence.merge_in_background()  # type: ignore[attr-defined]
             logger.info("[redis-statedb] State persistence initialized successfully")
 
         except Exception as exc:
@@ -107,6 +314,8 @@ class RedisStatePersistence(bootsteps.Step):
                     "[redis-statedb] Migration requested from: %s",
                     self.migrate_statedb,
                 )
+                from celery_redis_statedb.migration import StateDBMigrator
+
                 migrator = StateDBMigrator(
                     statedb_path=self.migrate_statedb,
                     redis_state_db=worker._redis_persistence.db,  # type: ignore[attr-defined]
@@ -121,3 +330,69 @@ class RedisStatePersistence(bootsteps.Step):
                     logger.error("[redis-statedb] Migration failed, continuing with empty state")
         except Exception as exc:
             logger.error("[redis-statedb] Migration process failed: %s", exc)
+
+    def start(self, worker: "Worker") -> None:
+        persistence = getattr(worker, "_redis_persistence", None)
+        if not self.enabled or persistence is None:
+            return
+        if not persistence.loaded.is_set():
+            # Revoked tasks have to be known once the consumer gets tasks.
+            if not persistence.load_done.wait(self.load_timeout):
+                logger.warning(
+                    "[redis-statedb] Worker state not loaded after %.1f seconds, starting "
+                    "without it. Revoked tasks are merged once loaded, syncs wait for it.",
+                    self.load_timeout,
+                )
+            elif not persistence.loaded.is_set():
+                logger.warning(
+                    "[redis-statedb] Worker state failed to load, starting without it. "
+                    "It will not be saved."
+                )
+        if self.flush_delay > 0:
+            self._start_write_behind(worker, persistence)
+        if self.sync_interval <= 0:
+            return
+
+        # Same timer the worker uses for its own housekeeping (hub timer
+        # when running with an event loop), so syncs never overlap.
+        self._sync_tref = worker.timer.call_repeatedly(  # type: ignore[attr-defined]
+            self.sync_interval, persistence.sync
+        )
+        logger.info(
+            "[redis-statedb] Periodic state sync enabled every %.1f seconds",
+            self.sync_interval,
+        )
+
+    def _start_write_behind(self, worker: "Worker", persistence: "RedisPersistent") -> None:
+        timer = worker.timer  # type: ignore[attr-defined]
+
+        def flush() -> None:
+            # Changes made while syncing schedule the next flush.
+            self._flush_tref = None
+            persistence.sync()
+
+        def schedule_flush() -> None:
+            if self._flush_tref is None:
+                self._flush_tref = timer.call_after(self.flush_delay, flush)
+
+        persistence.tracker.on_change = schedule_flush
+        logger.info(
+            "[redis-statedb] Revoked tasks written behind within %.1f seconds",
+            self.flush_delay,
+        )
+
+    def stop(self, worker: "Worker") -> None:
+        if self._sync_tref is not None:
+            self._sync_tref.cancel()
+            self._sync_tref = None
+            logger.debug("[redis-statedb] Periodic state sync stopped")
+        persistence = getattr(worker, "_redis_persistence", None)
+        if persistence is not None:
+            persistence.tracker.on_change = None
+        if self._flush_tref is not None:
+            # The shutdown save writes whatever is pending.
+            self._flush_tref.cancel()
+            self._flush_tref = None
+
+    def terminate(self, worker: "Worker") -> None:
+        self.stop(worker)
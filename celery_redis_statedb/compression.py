@@ -0,0 +1,227 @@
+import struct
+import zlib
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from celery.exceptions import ImproperlyConfigured
+
+#: Marks blobs written with a codec header. Legacy blobs are raw zlib streams,
+#: which always start with 0x78, so they can never be mistaken for one.
+MAGIC = b"CRS"
+#: Version of the header layout itself.
+HEADER_VERSION = 1
+#: magic, header version, codec id, payload format
+HEADER = struct.Struct(">3sBBB")
+
+#: Payload is a pickled ``LimitedSet`` (Celery's own format).
+FORMAT_PICKLE = 1
+#: Payload is written by :func:`celery_redis_statedb.serialization.dumps`.
+FORMAT_BINARY = 2
+
+DEFAULT_CODEC = "zlib"
+
+#: Compressed bytes fed to a decompressor at a time by :func:`decode_stream`.
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class Codec:
+    """Compression codec for stored blobs.
+
+    Attributes:
+        name: Name used in configuration (``redis_state_codec``)
+        codec_id: Identifier written in the blob header, must never change
+        requires: Package to install when the codec is unavailable
+    """
+
+    def __init__(
+        self,
+        name: str,
+        codec_id: int,
+        loader: Callable[[], tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]],
+        requires: str | None = None,
+        stream_loader: Callable[[], Callable[[], Any]] | None = None,
+    ) -> None:
+        self.name = name
+        self.codec_id = codec_id
+        self.requires = requires
+        self._loader = loader
+        self._functions: tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]] | None = None
+        # Returns a factory of incremental decompressors (objects with a
+        # ``decompress(data)`` method), see iter_decompress().
+        self._stream_loader = stream_loader
+
+    def _load(self) -> tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+        if self._functions is None:
+            try:
+                self._functions = self._loader()
+            except ImportError as exc:
+                raise ImproperlyConfigured(
+                    f"The {self.name} codec requires the {self.requires!r} package"
+                ) from exc
+        return self._functions
+
+    def compress(self, data: bytes) -> bytes:
+        return self._load()[0](data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._load()[1](data)
+
+    def iter_decompress(
+        self, data: bytes | memoryview, chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """Decompress ``data`` piece by piece.
+
+        Compressed input is fed ``chunk_size`` bytes at a time, so the whole
+        decompressed payload never has to be held in memory. Codecs without
+        an incremental decompressor yield it in one piece.
+        """
+        self._load()
+        if self._stream_loader is None:
+            yield self.decompress(bytes(data))
+            return
+        decompressor = self._stream_loader()()
+        view = memoryview(data)
+        for start in range(0, len(view), chunk_size):
+            chunk = decompressor.decompress(view[start : start + chunk_size])
+            if chunk:
+                yield chunk
+        flush = getattr(decompressor, "flush", None)
+        if flush is not None and (chunk := flush()):
+            yield chunk
+
+    def __repr__(self) -> str:
+        return f"<Codec {self.name} id={self.codec_id}>"
+
+
+def _load_none() -> tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    return bytes, bytes
+
+
+class _Passthrough:
+    """Incremental "decompressor" of the ``none`` codec."""
+
+    def decompress(self, data: bytes) -> bytes:
+        return bytes(data)
+
+
+def _load_none_stream() -> Callable[[], Any]:
+    return _Passthrough
+
+
+def _load_zlib() -> tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    return zlib.compress, zlib.decompress
+
+
+def _load_zlib_stream() -> Callable[[], Any]:
+    return zlib.decompressobj
+
+
+def _load_zstd() -> tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    import zstandard
+
+    compressor = zstandard.ZstdCompressor(level=3)
+    decompressor = zstandard.ZstdDecompressor()
+    # Frames written by compress() always carry the content size.
+    return compressor.compress, decompressor.decompress
+
+
+def _load_zstd_stream() -> Callable[[], Any]:
+    import zstandard
+
+    return zstandard.ZstdDecompressor().decompressobj
+
+
+def _load_lz4() -> tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]:
+    import lz4.frame
+
+    return lz4.frame.compress, lz4.frame.decompress
+
+
+def _load_lz4_stream() -> Callable[[], Any]:
+    import lz4.frame
+
+    return lz4.frame.LZ4FrameDecompressor
+
+
+_codecs_by_name: dict[str, Codec] = {}
+_codecs_by_id: dict[int, Codec] = {}
+
+
+def register_codec(codec: Codec) -> None:
+    """Register a codec so it can be selected by name and read back by id."""
+    _codecs_by_name[codec.name] = codec
+    _codecs_by_id[codec.codec_id] = codec
+
+
+register_codec(Codec("none", 0, _load_none, stream_loader=_load_none_stream))
+register_codec(Codec("zlib", 1, _load_zlib, stream_loader=_load_zlib_stream))
+register_codec(Codec("zstd", 2, _load_zstd, requires="zstandard", stream_loader=_load_zstd_stream))
+register_codec(Codec("lz4", 3, _load_lz4, requires="lz4", stream_loader=_load_lz4_stream))
+
+
+def get_codec(name: str) -> Codec:
+    """Return the codec registered as ``name``.
+
+    Raises:
+        ImproperlyConfigured: If the codec is unknown or its package is missing
+    """
+    try:
+        codec = _codecs_by_name[name]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"Unknown redis statedb codec {name!r}, expected one of {sorted(_codecs_by_name)}"
+        ) from None
+    # Fail at configuration time rather than on the first sync.
+    codec._load()
+    return codec
+
+
+def encode(payload: bytes, codec: Codec, fmt: int) -> bytes:
+    """Compress ``payload`` and prefix it with the header naming codec and format."""
+    return HEADER.pack(MAGIC, HEADER_VERSION, codec.codec_id, fmt) + codec.compress(payload)
+
+
+def decode(blob: bytes) -> tuple[int, bytes]:
+    """Decompress a stored blob, detecting the codec from its header.
+
+    Blobs without a header are treated as zlib-compressed pickles, as
+    written by Celery and by earlier versions of this package.
+
+    Returns:
+        Tuple of (payload format, decompressed payload)
+
+    Raises:
+        ValueError: If the header names an unknown version or codec
+    """
+    if blob[: len(MAGIC)] != MAGIC:
+        return FORMAT_PICKLE, zlib.decompress(blob)
+
+    _, version, codec_id, fmt = HEADER.unpack_from(blob)
+    if version != HEADER_VERSION:
+        raise ValueError(f"Unsupported blob header version {version}")
+    codec = _codecs_by_id.get(codec_id)
+    if codec is None:
+        raise ValueError(f"Unknown blob codec id {codec_id}")
+    return fmt, codec.decompress(blob[HEADER.size :])
+
+
+def decode_stream(blob: bytes | memoryview) -> tuple[int, Iterator[bytes]]:
+    """Like :func:`decode`, but yield the payload in decompressed pieces.
+
+    Returns:
+        Tuple of (payload format, iterator over the decompressed payload)
+
+    Raises:
+        ValueError: If the header names an unknown version or codec
+    """
+    view = memoryview(blob)
+    if view[: len(MAGIC)] != MAGIC:
+        return FORMAT_PICKLE, _codecs_by_name["zlib"].iter_decompress(view)
+
+    _, version, codec_id, fmt = HEADER.unpack_from(view)
+    if version != HEADER_VERSION:
+        raise ValueError(f"Unsupported blob header version {version}")
+    codec = _codecs_by_id.get(codec_id)
+    if codec is None:
+        raise ValueError(f"Unknown blob codec id {codec_id}")
+    return fmt, codec.iter_decompress(view[HEADER.size :])
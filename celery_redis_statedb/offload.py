@@ -0,0 +1,48 @@
+"""Serialization off the hub for greenlet worker pools.
+
+With ``-P gevent`` or ``-P eventlet`` every task of the worker runs in a
+greenlet of a single OS thread. Serializing and compressing a large revoked
+set there stalls all of them until it is done. The runners returned by
+:func:`get_offload` execute a function in a native thread instead and only
+block the calling greenlet while waiting for the result, so in-flight tasks
+keep running: compression releases the GIL, and pure Python serialization
+is interleaved with them at the interpreter switch interval.
+"""
+
+from collections.abc import Callable
+from typing import Any
+
+from kombu.utils.compat import detect_environment
+
+#: ``runner(func, *args)`` returns ``func(*args)`` computed in another thread.
+Offload = Callable[..., Any]
+
+GREEN_ENVIRONMENTS = ("gevent", "eventlet")
+
+
+def is_green() -> bool:
+    """Return whether the process is monkey patched by gevent or eventlet."""
+    return detect_environment() in GREEN_ENVIRONMENTS
+
+
+def get_offload() -> Offload | None:
+    """Return the thread runner of the greenlet library in use.
+
+    Returns:
+        The runner, or None when neither gevent nor eventlet is in use and
+        blocking the calling thread does not stall anything else.
+    """
+    environment = detect_environment()
+    if environment == "gevent":
+        import gevent
+
+        def gevent_offload(func: Callable[..., Any], *args: Any) -> Any:
+            return gevent.get_hub().threadpool.apply(func, args)
+
+        return gevent_offload
+    if environment == "eventlet":
+        from eventlet import tpool
+
+        offload: Offload = tpool.execute
+        return offload
+    return None
@@ -0,0 +1,75 @@
+"""Process-wide registry of Redis connection pools.
+
+Every state database creates its own client, and with it a pool of
+connections to Redis. Processes running several of them against the same
+server (tooling inspecting many workers, a migration next to the worker's
+own state) open one set of connections per instance, each paying TCP and
+TLS handshakes. :func:`get_pool` returns one pool per URL and connection
+options instead, to pass as ``connection_pool`` to the state databases::
+
+    pool = get_pool("redis://localhost:6379/0")
+    dbs = [RedisStateDB(url, name, connection_pool=pool) for name in worker_names]
+
+Given the Celery app, it returns the pool of the app's Redis result
+backend when the URLs are the same, so the worker's state shares the
+connections of its results.
+
+Pools are never closed by the state databases using them, only by
+:func:`clear`. Pools of the synchronous client are shared across threads,
+and reset their connections in forked child processes by themselves.
+"""
+
+import threading
+from typing import Any
+
+import redis
+from celery.backends.redis import RedisBackend, SentinelBackend
+
+from celery_redis_statedb.state import CLIENT_OPTIONS
+
+_pools: dict[tuple[str, tuple[tuple[str, Any], ...]], redis.ConnectionPool] = {}
+_lock = threading.Lock()
+
+
+def get_pool(url: str, app: Any = None, **options: Any) -> redis.ConnectionPool:
+    """Return the connection pool of ``url``, creating it on first use.
+
+    Args:
+        url: Redis URL (``redis://``, ``rediss://`` or ``unix://``)
+        app: Celery app whose Redis result backend pool is reused when its
+            URL is ``url``
+        **options: Connection options, :data:`~celery_redis_statedb.state.CLIENT_OPTIONS`
+            when none are given. Pools are shared by equal URLs and options.
+    """
+    if app is not None:
+        pool = backend_pool(app, url)
+        if pool is not None:
+            return pool
+    key = (url, tuple(sorted((options or CLIENT_OPTIONS).items())))
+    with _lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = redis.ConnectionPool.from_url(url, **(options or CLIENT_OPTIONS))
+    return pool
+
+
+def backend_pool(app: Any, url: str) -> redis.ConnectionPool | None:
+    """Return the pool of the Redis result backend of ``app`` if it connects to ``url``."""
+    backend = app.backend
+    if (
+        not isinstance(backend, RedisBackend)
+        or isinstance(backend, SentinelBackend)
+        or backend.url != url
+    ):
+        return None
+    pool: redis.ConnectionPool = backend.client.connection_pool
+    return pool
+
+
+def clear() -> None:
+    """Disconnect and forget the pools created by :func:`get_pool`."""
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.disconnect()
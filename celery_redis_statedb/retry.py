@@ -0,0 +1,130 @@
+"""Retry policy and circuit breaker of the Redis operations.
+
+Each operation of the state databases (a command, or a pipeline) is tried
+again on connection errors and timeouts, up to ``max_retries`` times. The
+delay between attempts grows exponentially from ``retry_delay`` and is
+drawn at random below that bound ("full jitter"), so workers losing Redis
+together do not reconnect in lockstep. No attempt is started once the
+operation's deadline would pass.
+
+A :class:`CircuitBreaker` counts the operations failing that way. After
+``threshold`` consecutive ones it opens: operations raise
+:class:`CircuitOpenError` right away, without touching the network, for
+``reset_timeout`` seconds. The next operation then tries Redis again, and
+closes the circuit if it succeeds or opens it again if it fails.
+
+A degraded Redis thus adds a bounded delay to each operation, and none at
+all once the circuit is open, instead of every load and sync stalling on
+connection timeouts before falling back.
+"""
+
+import logging
+import random
+import time
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+#: Errors worth another attempt, others (e.g. a wrong key type) are not transient.
+RETRY_ERRORS = (redis.ConnectionError, redis.TimeoutError)
+
+DEFAULT_MAX_DELAY = 2.0
+DEFAULT_DEADLINE = 10.0
+DEFAULT_THRESHOLD = 5
+DEFAULT_RESET_TIMEOUT = 30.0
+
+
+class CircuitOpenError(redis.ConnectionError):
+    """Raised instead of contacting Redis while the circuit is open."""
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by a deadline.
+
+    Attributes:
+        max_retries: Attempts made after the first one failed
+        delay: Upper bound of the first delay, doubled on each retry
+        max_delay: Largest upper bound of a delay
+        deadline: Seconds after which an operation is not tried again
+            (``0`` for none)
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        delay: float = 0.1,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        deadline: float = DEFAULT_DEADLINE,
+    ) -> None:
+        self.max_retries = max_retries
+        self.delay = delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def backoff(self, retries: int, started: float) -> float | None:
+        """Return the delay before the next attempt of an operation.
+
+        Args:
+            retries: Attempts made after the first one so far
+            started: ``time.monotonic()`` when the operation started
+
+        Returns:
+            Seconds to sleep, or None to give up
+        """
+        if retries >= self.max_retries:
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.delay * 2**retries))
+        if self.deadline and time.monotonic() + delay - started >= self.deadline:
+            return None
+        return delay
+
+
+class CircuitBreaker:
+    """Fail fast after ``threshold`` consecutive failed operations.
+
+    Attributes:
+        threshold: Failed operations opening the circuit (``0`` disables)
+        reset_timeout: Seconds the circuit stays open
+        failures: Consecutive failed operations
+    """
+
+    def __init__(
+        self, threshold: int = DEFAULT_THRESHOLD, reset_timeout: float = DEFAULT_RESET_TIMEOUT
+    ) -> None:
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return (
+            self._opened_at is not None and time.monotonic() - self._opened_at < self.reset_timeout
+        )
+
+    def check(self) -> None:
+        """Raise :class:`CircuitOpenError` while the circuit is open."""
+        if self.is_open:
+            raise CircuitOpenError(
+                f"Redis unavailable after {self.failures} failed operations, failing fast"
+            )
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            logger.info("[redis-statedb] Redis reachable again, circuit closed")
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if not self.threshold or self.failures < self.threshold:
+            return
+        if self._opened_at is None:
+            logger.warning(
+                "[redis-statedb] %d Redis operations failed in a row, "
+                "failing fast for %.1f seconds",
+                self.failures,
+                self.reset_timeout,
+            )
+        self._opened_at = time.monotonic()
@@ -0,0 +1,77 @@
+"""Redis Sentinel URLs.
+
+``sentinel://`` URLs name the sentinels asked for the current master, in
+the format Celery uses for its broker and result backend: one URL per
+sentinel, separated by semicolons, each carrying the credentials and
+database of the master::
+
+    sentinel://:password@sentinel-1:26379/0;sentinel://:password@sentinel-2:26379/0
+
+The name of the monitored master is given by a ``master_name`` query
+parameter on any of the URLs, or by the ``sentinel_master`` argument of the
+state databases.
+"""
+
+import dataclasses
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from celery.exceptions import ImproperlyConfigured
+
+SCHEME = "sentinel"
+DEFAULT_PORT = 26379
+
+
+@dataclasses.dataclass
+class SentinelURL:
+    """Parsed ``sentinel://`` URL.
+
+    Attributes:
+        sentinels: Host and port of each sentinel
+        master_name: Name of the monitored master, or None
+        connection_kwargs: Database and credentials of the master and replicas
+    """
+
+    sentinels: list[tuple[str, int]] = dataclasses.field(default_factory=list)
+    master_name: str | None = None
+    connection_kwargs: dict[str, Any] = dataclasses.field(default_factory=dict)
+
+
+def is_sentinel_url(url: str) -> bool:
+    """Return whether ``url`` names sentinels rather than a Redis server."""
+    return url.startswith(f"{SCHEME}://")
+
+
+def parse_url(url: str) -> SentinelURL:
+    """Parse semicolon separated ``sentinel://`` URLs.
+
+    Credentials, database and master name are taken from the first URL
+    giving them.
+
+    Raises:
+        ImproperlyConfigured: If a part is not a valid ``sentinel://`` URL
+    """
+    parsed = SentinelURL()
+    for part in filter(None, (part.strip() for part in url.split(";"))):
+        split = urlsplit(part)
+        try:
+            port = split.port or DEFAULT_PORT
+            path = split.path.strip("/")
+            db = int(path) if path else None
+        except ValueError as exc:
+            raise ImproperlyConfigured(f"Invalid redis statedb sentinel URL {part!r}") from exc
+        if split.scheme != SCHEME or not split.hostname:
+            raise ImproperlyConfigured(f"Invalid redis statedb sentinel URL {part!r}")
+        parsed.sentinels.append((split.hostname, port))
+        if db is not None:
+            parsed.connection_kwargs.setdefault("db", db)
+        if split.username:
+            parsed.connection_kwargs.setdefault("username", unquote(split.username))
+        if split.password:
+            parsed.connection_kwargs.setdefault("password", unquote(split.password))
+        master_name = parse_qs(split.query).get("master_name")
+        if master_name and parsed.master_name is None:
+            parsed.master_name = master_name[0]
+    if not parsed.sentinels:
+        raise ImproperlyConfigured(f"Invalid redis statedb sentinel URL {url!r}")
+    return parsed
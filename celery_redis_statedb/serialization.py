@@ -0,0 +1,352 @@
+"""Compact binary serialization of revoked task sets.
+
+Layout (little endian)::
+
+    header   maxlen:u64  expires:f64  minlen:u64  count:u64
+    block*   entries:u32  strings:u32
+             kinds     entries x u8        0 = UUID, 1 = string
+             uuids     16 bytes per UUID id
+             lengths   strings x u32       utf-8 length of each string id
+             strings   concatenated utf-8 string ids
+             stamps    entries x i64       insertion time in microseconds, each
+                                           stored as the delta to the previous one
+
+Entries are written oldest first in blocks of at most :data:`BLOCK_SIZE`
+so that a reader never needs more than one block in memory besides the
+result. Celery task ids are UUID strings, which shrink from a 36 character
+string plus pickle framing to 16 raw bytes. Timestamps are sorted, so their
+deltas are small and compress well.
+
+Unlike pickle, loading never executes code from the payload, and the set is
+rebuilt in bulk (see :func:`rebuild`) instead of item by item.
+:func:`iter_blocks` decodes a payload arriving in pieces (e.g. from a
+streaming decompressor) one block at a time, and :func:`merge` adds the
+entries to an existing set without building an intermediate one.
+:func:`merge_set` is the same bulk merge for an already loaded set.
+"""
+
+import struct
+import sys
+import time
+from array import array
+from collections.abc import Iterable, Iterator
+from itertools import accumulate
+from typing import Any
+
+from celery.utils.collections import LimitedSet  # type: ignore[attr-defined]
+
+BLOCK_SIZE = 8192
+
+_HEADER = struct.Struct("<QdQQ")
+_BLOCK = struct.Struct("<II")
+_BIG_ENDIAN = sys.byteorder == "big"
+
+KIND_UUID = 0
+KIND_STRING = 1
+
+
+def _pack_uuid(item: str) -> bytes | None:
+    """Return the 16 raw bytes of a canonical (lowercase, dashed) UUID string."""
+    if len(item) != 36 or item[8] != "-" or item[13] != "-" or item[18] != "-" or item[23] != "-":
+        return None
+    hexstr = item.replace("-", "")
+    # Only ids that format back to the very same string can be packed.
+    if len(hexstr) != 32 or hexstr != hexstr.lower():
+        return None
+    try:
+        raw = bytes.fromhex(hexstr)
+    except ValueError:
+        return None
+    return raw if len(raw) == 16 else None
+
+
+def dumps(zrevoked: LimitedSet) -> bytes:
+    """Serialize a ``LimitedSet`` of string task ids.
+
+    Raises:
+        TypeError: If the set contains non-string items
+    """
+    entries = sorted(zrevoked._data.values())
+    chunks = [
+        _HEADER.pack(
+            zrevoked.maxlen or 0, float(zrevoked.expires or 0), zrevoked.minlen or 0, len(entries)
+        )
+    ]
+    for start in range(0, len(entries), BLOCK_SIZE):
+        chunks.append(_dump_block(entries[start : start + BLOCK_SIZE]))
+    return b"".join(chunks)
+
+
+def _dump_block(entries: list[tuple[float, Any]]) -> bytes:
+    kinds = bytearray(len(entries))
+    uuids = bytearray()
+    lengths = array("I")
+    strings = bytearray()
+    stamps = array("q")
+    previous = 0
+    for i, (inserted, item) in enumerate(entries):
+        if not isinstance(item, str):
+            raise TypeError(f"Cannot serialize revoked item of type {type(item).__name__}")
+        raw = _pack_uuid(item)
+        if raw is None:
+            kinds[i] = KIND_STRING
+            data = item.encode()
+            lengths.append(len(data))
+            strings += data
+        else:
+            uuids += raw
+        stamp = round(inserted * 1_000_000)
+        stamps.append(stamp - previous)
+        previous = stamp
+    if _BIG_ENDIAN:
+        lengths.byteswap()
+        stamps.byteswap()
+    return b"".join(
+        (
+            _BLOCK.pack(len(entries), len(lengths)),
+            kinds,
+            uuids,
+            lengths.tobytes(),
+            strings,
+            stamps.tobytes(),
+        )
+    )
+
+
+def _load_block(view: memoryview, offset: int) -> tuple[list[str], list[int], int]:
+    """Decode the block at ``offset``.
+
+    Returns:
+        Tuple of (task ids, microsecond stamps, offset of the next block)
+    """
+    count, string_count = _BLOCK.unpack_from(view, offset)
+    offset += _BLOCK.size
+    kinds = view[offset : offset + count]
+    offset += count
+    uuid_count = count - string_count
+    uuids = view[offset : offset + 16 * uuid_count].hex()
+    offset += 16 * uuid_count
+    lengths = array("I")
+    lengths.frombytes(view[offset : offset + 4 * string_count])
+    offset += 4 * string_count
+    if _BIG_ENDIAN:
+        lengths.byteswap()
+    strings_size = sum(lengths)
+    strings = view[offset : offset + strings_size].tobytes()
+    offset += strings_size
+    stamps = array("q")
+    stamps.frombytes(view[offset : offset + 8 * count])
+    offset += 8 * count
+    if _BIG_ENDIAN:
+        stamps.byteswap()
+
+    if not string_count:
+        # Celery task ids, no per-entry branching needed
+        items = [
+            f"{uuids[i : i + 8]}-{uuids[i + 8 : i + 12]}-{uuids[i + 12 : i + 16]}-"
+            f"{uuids[i + 16 : i + 20]}-{uuids[i + 20 : i + 32]}"
+            for i in range(0, len(uuids), 32)
+        ]
+        return items, list(accumulate(stamps)), offset
+
+    items = []
+    uuid_pos = string_pos = string_index = 0
+    for kind in kinds:
+        if kind == KIND_UUID:
+            h = uuids[uuid_pos : uuid_pos + 32]
+            items.append(f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}")
+            uuid_pos += 32
+        else:
+            length = lengths[string_index]
+            items.append(strings[string_pos : string_pos + length].decode())
+            string_pos += length
+            string_index += 1
+    return items, list(accumulate(stamps)), offset
+
+
+def loads(payload: bytes) -> LimitedSet:
+    """Rebuild a ``LimitedSet`` written by :func:`dumps`."""
+    view = memoryview(payload)
+    maxlen, expires, minlen, _count = _HEADER.unpack_from(view)
+    offset = _HEADER.size
+    items: list[str] = []
+    stamps: list[float] = []
+    while offset < len(view):
+        block_items, block_stamps, offset = _load_block(view, offset)
+        items += block_items
+        stamps += [stamp / 1_000_000 for stamp in block_stamps]
+    return rebuild(maxlen, expires, minlen, items, stamps)
+
+
+class ChunkReader:
+    """Binary file-like reader over an iterable of byte chunks.
+
+    Only the unread part of the current chunks is buffered. Usable with
+    ``pickle.load()`` as well.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._buffer = bytearray()
+        self._pos = 0
+
+    def _fill(self, size: int) -> bool:
+        """Buffer at least ``size`` unread bytes, return False at the end."""
+        while len(self._buffer) - self._pos < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return False
+            del self._buffer[: self._pos]
+            self._pos = 0
+            self._buffer += chunk
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            for chunk in self._chunks:
+                self._buffer += chunk
+            size = len(self._buffer) - self._pos
+        else:
+            self._fill(size)
+        data = bytes(self._buffer[self._pos : self._pos + size])
+        self._pos += len(data)
+        return data
+
+    def readline(self) -> bytes:
+        while True:
+            end = self._buffer.find(b"\n", self._pos)
+            if end >= 0:
+                return self.read(end + 1 - self._pos)
+            if not self._fill(len(self._buffer) - self._pos + 1):
+                return self.read()
+
+
+def _read_exactly(reader: ChunkReader, size: int) -> bytes:
+    data = reader.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated revoked tasks payload")
+    return data
+
+
+def iter_blocks(chunks: Iterable[bytes]) -> Iterator[tuple[list[str], list[float]]]:
+    """Decode a payload written by :func:`dumps` arriving in pieces.
+
+    Only one block is decoded at a time; the header is checked but its
+    ``LimitedSet`` parameters are not used.
+
+    Yields:
+        Tuple of (task ids, insertion times) for each block
+
+    Raises:
+        ValueError: If the payload is truncated
+    """
+    reader = ChunkReader(chunks)
+    _read_exactly(reader, _HEADER.size)
+    while head := reader.read(_BLOCK.size):
+        if len(head) != _BLOCK.size:
+            raise ValueError("Truncated revoked tasks payload")
+        count, string_count = _BLOCK.unpack(head)
+        # kinds, uuids and lengths, which give the size of the strings
+        fixed = _read_exactly(reader, count + 16 * (count - string_count) + 4 * string_count)
+        lengths = array("I")
+        lengths.frombytes(fixed[len(fixed) - 4 * string_count :])
+        if _BIG_ENDIAN:
+            lengths.byteswap()
+        rest = _read_exactly(reader, sum(lengths) + 8 * count)
+        items, stamps, _offset = _load_block(memoryview(head + fixed + rest), 0)
+        yield items, [stamp / 1_000_000 for stamp in stamps]
+
+
+def merge(
+    target: LimitedSet,
+    blocks: Iterable[tuple[list[Any], list[float]]],
+    now: float | None = None,
+) -> int:
+    """Add blocks of entries to ``target`` in place.
+
+    Like ``LimitedSet.update()`` with another set, loaded entries replace
+    existing ones and ``target`` is purged afterwards, see :func:`merge_set`.
+    Entries go into ``target``'s internals directly, so change tracking
+    does not see them.
+
+    Returns:
+        Number of entries added
+
+    Raises:
+        ValueError: If decoding a block fails, once the previous blocks
+            have been merged
+    """
+    data = target._data
+    count = 0
+    try:
+        for items, stamps in blocks:
+            data.update(zip(items, zip(stamps, items)))
+            count += len(items)
+    finally:
+        # Keep the set consistent with the blocks merged before an error.
+        _settle(target, now)
+    return count
+
+
+def merge_set(target: LimitedSet, other: LimitedSet, now: float | None = None) -> None:
+    """Bulk equivalent of ``target.update(other)`` followed by ``purge()``.
+
+    ``update()`` heapifies the union and ``purge()`` then pops evicted and
+    expired entries off the heap one at a time, through every wrapper
+    installed on ``target``. Here the union is sorted once, which is linear
+    since both sets' entries are already mostly in insertion order, and the
+    entries beyond ``maxlen`` or expired are cut off in the same pass. A
+    sorted list is a valid heap, so no heapify is needed either.
+    Like :func:`merge`, change tracking does not see the entries.
+    """
+    target._data.update(other._data)
+    _settle(target, now)
+
+
+def _settle(target: LimitedSet, now: float | None = None) -> None:
+    """Rebuild the heap of ``target`` and purge it like ``LimitedSet.purge()``."""
+    data = target._data
+    entries = sorted(data.values())
+    cut = len(entries) - target.maxlen if target.maxlen and len(entries) > target.maxlen else 0
+    if target.expires:
+        now = time.monotonic() if now is None else now
+        keep = max(len(entries) - target.minlen, 0)
+        while cut < keep and entries[cut][0] + target.expires <= now:
+            cut += 1
+    for _inserted, item in entries[:cut]:
+        del data[item]
+    del entries[:cut]
+    # Reuse the list rather than copying it into the old heap.
+    target._heap = entries
+
+
+def rebuild(
+    maxlen: int, expires: float, minlen: int, items: list[Any], stamps: list[float]
+) -> LimitedSet:
+    """Build a ``LimitedSet`` from parallel lists of items and insertion times.
+
+    ``LimitedSet.update()`` adds items one by one, paying a heap push and a
+    maxlen check for each of them. Here the internal ``_data`` mapping and
+    ``_heap`` are filled directly: entries sorted by insertion time already
+    form a valid heap. As with ``update()`` the oldest entries beyond
+    ``maxlen`` are dropped; expired entries are left to the next ``purge()``.
+    """
+    zrevoked = LimitedSet(maxlen=maxlen, expires=expires, minlen=minlen)
+    data = zrevoked._data
+    data.update(zip(items, zip(stamps, items)))
+    # Sorting is linear on the (already ordered) output of dumps().
+    heap = sorted(data.values())
+    if maxlen and len(heap) > maxlen:
+        for _inserted, item in heap[: len(heap) - maxlen]:
+            del data[item]
+        heap = heap[len(heap) - maxlen :]
+    zrevoked._heap[:] = heap
+    return zrevoked
+
+
+def clone(zrevoked: LimitedSet) -> LimitedSet:
+    """Return a copy of ``zrevoked``, copying its heap as is."""
+    copy = LimitedSet(maxlen=zrevoked.maxlen, expires=zrevoked.expires, minlen=zrevoked.minlen)
+    copy._data.update(zrevoked._data)
+    copy._heap[:] = zrevoked._heap
+    return copy
@@ -0,0 +1,93 @@
+"""Local file copy of the revoked tasks blob.
+
+A :class:`LocalSnapshot` holds the last blob written to or loaded from
+Redis, prefixed with the digest of its payload (the one stored in the
+``zrevoked_digest`` key). At boot the state database compares the two
+digests and reads the blob from the file when they match, downloading it
+only when the local copy is stale. While Redis cannot be reached the file
+is loaded as is, so a worker restarting during an outage still knows the
+tasks it revoked.
+
+Files are replaced atomically (written to a temporary file in the same
+directory, then renamed over the previous one) and read through ``mmap``,
+so the blob is decompressed straight from the page cache.
+"""
+
+import contextlib
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Iterator
+
+MAGIC = b"CRSL"
+VERSION = 1
+#: magic, version, payload digest
+HEADER = struct.Struct(">4sB16s")
+
+
+class LocalSnapshot:
+    """Blob and payload digest kept in a local file.
+
+    Attributes:
+        path: Path of the snapshot file
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def write(self, digest: bytes, blob: bytes) -> None:
+        """Replace the snapshot with ``blob``.
+
+        Raises:
+            OSError: If the file cannot be written
+        """
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=f".{os.path.basename(self.path)}.", suffix=".tmp", dir=directory
+        )
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(HEADER.pack(MAGIC, VERSION, digest))
+                tmp.write(blob)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_path)
+            raise
+
+    @contextlib.contextmanager
+    def open(self) -> Iterator[tuple[bytes, memoryview] | None]:
+        """Map the snapshot file into memory.
+
+        Yields:
+            Tuple of (payload digest, blob), or None when there is no valid
+            snapshot. The blob is only readable until the context exits.
+
+        Raises:
+            OSError: If the file exists but cannot be read
+        """
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            yield None
+            return
+        with file:
+            if os.fstat(file.fileno()).st_size <= HEADER.size:
+                yield None
+                return
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(mapped)
+            blob = view[HEADER.size :]
+            try:
+                magic, version, digest = HEADER.unpack_from(view)
+                yield (digest, blob) if magic == MAGIC and version == VERSION else None
+            finally:
+                blob.release()
+                view.release()
+                # Views of an aborted load may still be referenced, the file
+                # is then unmapped once they are collected.
+                with contextlib.suppress(BufferError):
+                    mapped.close()
@@ -1,19 +1,173 @@
+import abc
+import contextlib
+import hashlib
 import logging
-import zlib
-from collections.abc import Callable
-from typing import TYPE_CHECKING, Any
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, TypeVar
 
 import redis
+from celery.exceptions import ImproperlyConfigured
 from celery.utils.collections import LimitedSet  # type: ignore[attr-defined]
 from kombu.serialization import pickle, pickle_protocol  # type: ignore[attr-defined]
 
+from celery_redis_statedb import (
+    compression,
+    offload,
+    retry,
+    sentinel,
+    serialization,
+    snapshot,
+    wal,
+)
+from celery_redis_statedb.tracking import RevokedChanges, RevokedTracker
+
 if TYPE_CHECKING:
     pass
 
 logger = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+#: Revoked tasks stored as a single compressed pickle blob (Celery's format).
+STORAGE_BLOB = "blob"
+#: Revoked tasks stored as a sorted set, one member per task scored by revoke time.
+STORAGE_ZSET = "zset"
+#: Blob snapshot plus an append-only stream of revoke/expiry entries.
+STORAGE_JOURNAL = "journal"
+#: One sorted set of revoked tasks shared by all workers, scored by wall-clock time.
+STORAGE_SHARED = "shared"
+STORAGE_MODES = (STORAGE_BLOB, STORAGE_ZSET, STORAGE_JOURNAL, STORAGE_SHARED)
+
+#: Payload format written for each ``serializer`` setting.
+SERIALIZERS = {
+    "pickle": compression.FORMAT_PICKLE,
+    "binary": compression.FORMAT_BINARY,
+}
+DEFAULT_SERIALIZER = "binary"
+
+
+#: Store ARGV[1] in KEYS[1] unless the stored value is larger, return the result.
+CLOCK_MAX_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local value = tonumber(ARGV[1])
+if value > current then
+    redis.call('SET', KEYS[1], ARGV[1])
+    return value
+end
+return current
+"""
+
+
+#: Revokes in KEYS[1] scored after the timestamp in KEYS[2] minus ARGV[1]
+#: seconds (all of them if KEYS[2] is not set), with scores.
+CATCH_UP_SCRIPT = """
+local synced_at = redis.call('GET', KEYS[2])
+local since = '-inf'
+if synced_at then
+    since = tostring(tonumber(synced_at) - tonumber(ARGV[1]))
+end
+return redis.call('ZRANGEBYSCORE', KEYS[1], since, '+inf', 'WITHSCORES')
+"""
+
+#: Seconds a connection attempt, and a command, may wait on Redis. Bounds the
+#: duration of each attempt of a retried operation.
+CONNECT_TIMEOUT = 5.0
+SOCKET_TIMEOUT = 10.0
+
+#: Connection options of the clients created by the state databases.
+CLIENT_OPTIONS: dict[str, Any] = {
+    "decode_responses": False,
+    "socket_connect_timeout": CONNECT_TIMEOUT,
+    "socket_timeout": SOCKET_TIMEOUT,
+    "socket_keepalive": True,
+    "health_check_interval": 30,
+}
+
+#: Seconds subtracted from the last sync time when catching up, covering
+#: clock skew between the hosts that wrote the shared set.
+CATCH_UP_MARGIN = 60.0
+
+#: Outcomes of :meth:`RedisPersistent.save`: state written to Redis, to the
+#: write-ahead log, not written for lack of time, or not written on errors.
+SAVE_SYNCED = "synced"
+SAVE_WAL = "wal"
+SAVE_SKIPPED = "skipped"
+SAVE_FAILED = "failed"
+
+#: Share of the time left to a save kept for the write-ahead log, should the
+#: sync to Redis not complete in time.
+WAL_RESERVE = 0.1
+
+#: Seconds a save may wait on Redis, without retrying, after the last sync
+#: failed. Redis may be back, but the write-ahead log is there if it is not.
+PROBE_TIMEOUT = 1.0
+
+
+def _wall_clock_offset() -> float:
+    """Difference between wall-clock time and ``time.monotonic()``.
+
+    ``LimitedSet`` timestamps come from the monotonic clock, which has no
+    meaning outside of the host. Scores shared between hosts are converted
+    to and from wall-clock time with this offset.
+    """
+    return time.time() - time.monotonic()
+
+
+def _hasher(fmt: int) -> hashlib.blake2b:
+    return hashlib.blake2b(bytes((fmt,)), digest_size=16)
+
+
+def _digest(fmt: int, payload: bytes) -> bytes:
+    """Content digest of a serialized revoked set, independent of the codec."""
+    digest = _hasher(fmt)
+    digest.update(payload)
+    return digest.digest()
+
 
-class RedisStateDB:
+def _hashed(chunks: Iterator[bytes], digest: hashlib.blake2b) -> Iterator[bytes]:
+    """Pass ``chunks`` through, adding each of them to ``digest``."""
+    for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
+
+
+@dataclass
+class _PendingUpdate:
+    """Bookkeeping of a queued update, applied once Redis accepted it."""
+
+    zset_synced: dict[str, float] | None = None
+    log_synced: dict[str, float] | None = None
+    journal_len: int | None = None
+    blob_digest: bytes | None = None
+    blob: bytes | None = None
+
+
+class _Commands:
+    """Commands queued for a pipeline, queued again on a new one per attempt.
+
+    Pipelines forget their commands once executed, even when it failed.
+    """
+
+    def __init__(self) -> None:
+        self._calls: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+
+    def __getattr__(self, name: str) -> Callable[..., None]:
+        def queue(*args: Any, **kwargs: Any) -> None:
+            self._calls.append((name, args, kwargs))
+
+        return queue
+
+    def pipeline(self, client: Any, transaction: bool = True) -> Any:
+        pipe = client.pipeline(transaction=transaction)
+        for name, args, kwargs in self._calls:
+            getattr(pipe, name)(*args, **kwargs)
+        return pipe
+
+
+class BaseRedisStateDB(abc.ABC):
     """Redis-based state database with per-worker key isolation.
 
     Each worker maintains its own state using a unique key prefix based on
@@ -23,16 +177,108 @@ class RedisStateDB:
     Revoked tasks persist indefinitely in Redis (matching Celery's default behavior).
     Use clear_revoked() to manually clean up if needed.
 
+    Four storage modes are supported:
+
+    - ``blob``: the whole ``LimitedSet`` is pickled, compressed and written to
+      the ``zrevoked`` key on every update (same layout as Celery's shelve).
+    - ``zset``: each revoked task id is a member of the ``revoked`` sorted set
+      scored by its revoke timestamp. Updates only send the members added since
+      the last update and drop evicted ones with ``ZREMRANGEBYSCORE``.
+    - ``journal``: each revoke and expiry is appended with ``XADD`` to the
+      ``journal`` stream. Once the stream grows past ``journal_max_len``
+      entries it is compacted: folded into the ``zrevoked`` snapshot blob and
+      deleted in the same transaction. Loading reads snapshot plus stream.
+    - ``shared``: a single sorted set at ``<key_prefix>revoked`` holds the
+      revoked tasks of every worker using the same prefix, scored by the
+      wall-clock revoke time. Workers only add the members they have not
+      sent yet (``ZADD NX``, so a revoke broadcast to the whole fleet is
+      stored once) and trim the set by age and size. Per-worker keys only
+      hold the clock.
+
+    With ``catch_up`` enabled, workers using per-worker storage also add
+    their revokes to the shared sorted set and record the time of each
+    update. Loading with :meth:`get_state` then picks up the revokes other
+    workers stored since, i.e. those broadcast while this worker was down.
+
+    Blobs are compressed with the configured codec (see
+    :mod:`celery_redis_statedb.compression`) and carry a small header naming
+    codec and payload format, so blobs written with any codec can be read
+    back whatever codec is configured for writing. The payload itself is
+    either the compact ``binary`` format of
+    :mod:`celery_redis_statedb.serialization` or Celery's pickle. Loading
+    pickles can be refused with ``allow_pickle=False``, so that data read
+    from a shared Redis never runs ``pickle.loads``.
+
+    A digest of the serialized payload is stored next to the blob in the
+    ``zrevoked_digest`` key. With blob storage an update whose payload
+    hashes the same as the last one written is not sent at all, and
+    loading compares the remote digest with the last loaded snapshot to
+    skip download and decompression when nothing changed.
+
+    With blob storage, a ``local_snapshot`` file can also keep a copy of the
+    blob (see :mod:`celery_redis_statedb.snapshot`). Loading then reads it
+    from the file when its digest matches the one in Redis, and falls back
+    to it unvalidated when Redis cannot be reached.
+
+    With ``cluster=True`` the client is a ``RedisCluster`` and the worker
+    name in the keys is wrapped in a hash tag (``<key_prefix>{<worker>}:``),
+    so that all keys of a worker map to the same slot: each update and load
+    stays a single-slot pipeline (a ``MULTI`` transaction for updates) on
+    one shard, and the workers of a fleet spread over all of them. redis-py
+    releases without transactions in cluster pipelines (before 6.1, 6.2 for
+    asyncio) send updates as plain pipelines instead. The fleet-wide sorted
+    set of ``shared`` storage and ``catch_up`` cannot be used in this mode.
+
+    ``sentinel://`` URLs (see :mod:`celery_redis_statedb.sentinel`) connect
+    to the master monitored by Redis Sentinel. With ``replica_reads``, boot
+    loads of the blob are served by a replica instead: the digest stored
+    next to the blob is read from the master and the blob from a replica in
+    one round trip with the replica's digest. When the two digests differ
+    the replica lags behind, and the blob is read from the master. Writes
+    always go to the master.
+
+    A ``connection_pool`` (e.g. from :func:`celery_redis_statedb.pools.get_pool`)
+    makes the client use its connections instead of opening its own, so
+    that several databases, or a database and the Celery result backend,
+    share them. Closing the database leaves the pool open.
+
+    Operations failing on connection errors or timeouts are retried with
+    exponential backoff and jitter within a deadline, and a circuit breaker
+    fails them fast after repeated failures, see
+    :mod:`celery_redis_statedb.retry`.
+
+    This base class holds the settings, the key layout, the commands queued
+    on pipelines and the parsing of replies. :class:`RedisStateDB` and
+    :class:`~celery_redis_statedb.asyncio.AsyncRedisStateDB` create the
+    client and run the I/O, synchronously or with ``asyncio``.
+
     Attributes:
         redis_client: Redis client instance
+        replica_client: Client of the replicas serving blob loads, or None
         key_prefix: Prefix for all Redis keys (includes worker identifier)
+        storage: Storage mode for revoked tasks (``blob``, ``zset``, ``journal``
+            or ``shared``)
+        journal_max_len: Stream entries kept before compacting into the snapshot
+        codec: Compression codec used for written blobs
+        serializer: Payload format used for written blobs
+        allow_pickle: Whether pickle payloads are written and loaded
+        catch_up: Whether revokes are shared to catch up after downtime
+        cooperative: Whether blobs are encoded and decoded in a native thread
+        local_snapshot: Local copy of the blob, or None
+        cluster: Whether Redis is a Redis Cluster
+        sentinel_master: Name of the master monitored by Sentinel, or None
+        connection_pool: Connection pool shared with other clients, or None
         max_retries: Maximum number of retries for Redis operations
         retry_delay: Delay between retries in seconds
+        retry_policy: Backoff of retried operations
+        breaker: Circuit breaker of the Redis operations
     """
 
     protocol: int = pickle_protocol
-    compress: Callable[[bytes], bytes] = zlib.compress
-    decompress: Callable[[bytes], bytes] = zlib.decompress
+    #: Sentinel manager of ``sentinel://`` URLs, set when creating the client
+    sentinel: Any = None
+    #: Whether cluster pipelines of the client library support transactions
+    cluster_transactions: bool = False
 
     def __init__(
         self,
@@ -41,99 +287,971 @@ class RedisStateDB:
         key_prefix: str = "celery:worker:state:",
         max_retries: int = 3,
         retry_delay: float = 0.1,
+        storage: str = STORAGE_BLOB,
+        journal_max_len: int = 10_000,
+        codec: str = compression.DEFAULT_CODEC,
+        serializer: str = DEFAULT_SERIALIZER,
+        allow_pickle: bool = True,
+        catch_up: bool = False,
+        cooperative: bool = False,
+        local_snapshot: str | None = None,
+        retry_deadline: float = retry.DEFAULT_DEADLINE,
+        breaker_threshold: int = retry.DEFAULT_THRESHOLD,
+        breaker_reset_timeout: float = retry.DEFAULT_RESET_TIMEOUT,
+        cluster: bool = False,
+        sentinel_master: str | None = None,
+        replica_reads: bool = False,
+        connection_pool: Any = None,
     ) -> None:
         """Initialize Redis state database.
 
         Args:
-            redis_url: Redis connection URL (e.g., 'redis://localhost:6379/0')
+            redis_url: Redis connection URL (e.g., 'redis://localhost:6379/0'),
+                or ``sentinel://`` URLs of the sentinels
             worker_name: Unique worker identifier (hostname or worker name)
             key_prefix: Base prefix for all Redis keys
             max_retries: Maximum number of retries for Redis operations
-            retry_delay: Delay between retries in seconds
+            retry_delay: Delay before the first retry in seconds, doubled on
+                each further one and randomized
+            storage: Storage mode for revoked tasks (``blob``, ``zset``, ``journal``
+                or ``shared``)
+            journal_max_len: Stream entries kept before compacting into the snapshot
+            codec: Compression codec for written blobs (``zlib``, ``zstd``,
+                ``lz4`` or ``none``)
+            serializer: Payload format for written blobs (``binary`` or ``pickle``)
+            allow_pickle: Whether pickle payloads are written and loaded.
+                When False, pickled blobs (e.g. written by Celery's shelve
+                format or older versions) are ignored at load.
+            catch_up: Also add revokes to the shared sorted set and load the
+                ones stored by other workers since the last update at boot.
+                Implied by ``shared`` storage.
+            cooperative: Serialize, compress and load blobs in a native thread
+                when running on a gevent or eventlet pool, see
+                :mod:`celery_redis_statedb.offload`.
+            local_snapshot: Path of a file keeping a local copy of the blob
+                (``blob`` storage only)
+            retry_deadline: Seconds after which a failing operation is not
+                retried anymore (``0`` for no deadline)
+            breaker_threshold: Consecutive failed operations after which
+                operations fail fast (``0`` disables the circuit breaker)
+            breaker_reset_timeout: Seconds operations fail fast before Redis
+                is tried again
+            cluster: Connect to a Redis Cluster, with the keys of the worker
+                hash-tagged into one slot
+            sentinel_master: Name of the master monitored by Sentinel,
+                overriding the ``master_name`` of a ``sentinel://`` URL
+            replica_reads: Load the blob from a replica when it holds the
+                current one (``sentinel://`` URLs and ``blob`` storage only)
+            connection_pool: Pool to take connections from instead of
+                creating one for ``redis_url`` (not with cluster mode or
+                Sentinel)
 
         Raises:
-            ImproperlyConfigured: If redis library is not installed
+            ImproperlyConfigured: If redis library is not installed, the
+                storage mode or serializer is unknown, the codec is not
+                available, a local snapshot or replica reads are used with
+                another storage, cluster mode with fleet-wide keys or
+                Sentinel, a connection pool with either of them, or a
+                ``sentinel://`` URL names no master
         """
+        if storage not in STORAGE_MODES:
+            raise ImproperlyConfigured(
+                f"Unknown redis statedb storage {storage!r}, expected one of {STORAGE_MODES}"
+            )
+        self.storage = storage
+        self.codec = compression.get_codec(codec)
+        if serializer not in SERIALIZERS:
+            raise ImproperlyConfigured(
+                f"Unknown redis statedb serializer {serializer!r}, "
+                f"expected one of {tuple(SERIALIZERS)}"
+            )
+        if serializer == "pickle" and not allow_pickle:
+            raise ImproperlyConfigured(
+                "redis statedb serializer 'pickle' cannot be used when pickle is not allowed"
+            )
+        self.serializer = serializer
+        self.allow_pickle = allow_pickle
+        if local_snapshot and storage != STORAGE_BLOB:
+            raise ImproperlyConfigured(
+                f"redis statedb local snapshot needs {STORAGE_BLOB!r} storage, not {storage!r}"
+            )
+        self.local_snapshot = snapshot.LocalSnapshot(local_snapshot) if local_snapshot else None
+        self.catch_up = catch_up and storage != STORAGE_SHARED
+        if cluster and (storage == STORAGE_SHARED or self.catch_up):
+            # Scripts and pipelines would span the worker's and the shared slot.
+            raise ImproperlyConfigured(
+                f"redis statedb cluster mode cannot use {STORAGE_SHARED!r} storage or catch-up"
+            )
+        self.cluster = cluster
+        self.sentinel_url = (
+            sentinel.parse_url(redis_url) if sentinel.is_sentinel_url(redis_url) else None
+        )
+        self.sentinel_master = sentinel_master
+        if self.sentinel_url is not None:
+            if cluster:
+                raise ImproperlyConfigured("redis statedb cluster mode cannot use Sentinel")
+            self.sentinel_master = sentinel_master or self.sentinel_url.master_name
+            if not self.sentinel_master:
+                raise ImproperlyConfigured(
+                    "redis statedb sentinel URL needs a master name (master_name=<name>)"
+                )
+        if connection_pool is not None and (cluster or self.sentinel_url is not None):
+            raise ImproperlyConfigured(
+                "redis statedb connection pools cannot be used with cluster mode or Sentinel"
+            )
+        self.connection_pool = connection_pool
+        if replica_reads and (self.sentinel_url is None or storage != STORAGE_BLOB):
+            raise ImproperlyConfigured(
+                f"redis statedb replica reads need a sentinel URL and {STORAGE_BLOB!r} storage"
+            )
+        self._offload = offload.get_offload() if cooperative else None
+        if cooperative and self._offload is None:
+            logger.warning(
+                "[redis-statedb] Cooperative mode needs gevent or eventlet, serializing inline"
+            )
+        # Members (and scores) known to be in the sorted set, used to send
+        # only the difference on the next update. None until first load/update.
+        self._zset_synced: dict[str, float] | None = None
+        # Same for the shared sorted set written with ``catch_up``
+        self._log_synced: dict[str, float] = {}
+        self.journal_max_len = journal_max_len
+        # Entries currently in the journal stream
+        self._journal_len = 0
+        # Set when revokes were loaded from elsewhere than the journal, the
+        # next update has to write a snapshot for them to be stored.
+        self._journal_incomplete = False
+        # Digest of the blob last written or loaded, and the last loaded
+        # snapshot with its digest, to skip identical writes and loads.
+        self._blob_digest: bytes | None = None
+        self._snapshot: tuple[bytes, LimitedSet] | None = None
         self.redis_url = redis_url
         self.worker_name = worker_name
-        # Include worker name in key prefix for isolation
-        self.key_prefix = f"{key_prefix}{worker_name}:"
+        # Include worker name in key prefix for isolation, as a hash tag on
+        # clusters so that all keys of the worker share a slot.
+        self.key_prefix = (
+            f"{key_prefix}{{{worker_name}}}:" if cluster else f"{key_prefix}{worker_name}:"
+        )
+        # Fleet-wide sorted set of ``shared`` storage
+        self.shared_key = f"{key_prefix}revoked"
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.retry_policy = retry.RetryPolicy(max_retries, retry_delay, deadline=retry_deadline)
+        self.breaker = retry.CircuitBreaker(breaker_threshold, breaker_reset_timeout)
+        # time.monotonic() past which failed operations are not retried
+        self._deadline: float | None = None
+        self._retry = True
 
-        self.redis_client = redis.from_url(
-            redis_url,
-            decode_responses=False,
-            socket_connect_timeout=5,
-            socket_keepalive=True,
-            health_check_interval=30,
+        self.redis_client = self._create_client(redis_url)
+        self.replica_client: Any = (
+            self.sentinel.slave_for(self.sentinel_master) if replica_reads else None
         )
+        # EVALSHA, loading the script on first use
+        self._clock_max = self.redis_client.register_script(CLOCK_MAX_SCRIPT)
 
         logger.info(
-            "[redis-statedb] RedisStateDB initialized for worker=%s, prefix=%s",
+            "[redis-statedb] %s initialized for worker=%s, prefix=%s, storage=%s, codec=%s",
+            type(self).__name__,
             self.worker_name,
             self.key_prefix,
+            self.storage,
+            self.codec.name,
         )
 
+    @abc.abstractmethod
+    def _create_client(self, redis_url: str, **options: Any) -> Any:
+        """Return the client connecting to ``redis_url``.
+
+        Args:
+            **options: Connection options overriding :data:`CLIENT_OPTIONS`
+        """
+
+    @property
+    def _transactional(self) -> bool:
+        """Whether updates are sent as a ``MULTI`` transaction."""
+        return not self.cluster or self.cluster_transactions
+
     def _get_key(self, name: str) -> str:
         return f"{self.key_prefix}{name}"
 
-    def update(self, zrevoked: LimitedSet, clock: int | None) -> bool:
-        zrevoked_key = self._get_key("zrevoked")
-        zrevoked_data = self.compress(self._dumps(zrevoked))
-        clock_key = self._get_key("clock")
-        clock_data = clock
-        _success = False
-        try:
-            pipe = self.redis_client.pipeline()
-            pipe.set(zrevoked_key, zrevoked_data)
-            if clock_data is not None:
-                pipe.set(clock_key, clock_data)
-            pipe.execute()
-        except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
-            logger.error("[redis-statedb] Error syncing state to Redis: %s", exc)
+    @property
+    def _loads_blob_apart(self) -> bool:
+        """Whether boot loads read the blob on its own, after its digest."""
+        return self.storage == STORAGE_BLOB and (
+            self._snapshot is not None
+            or self.local_snapshot is not None
+            or self.replica_client is not None
+        )
+
+    def _queue_update(
+        self,
+        pipe: Any,
+        zrevoked: LimitedSet,
+        clock: int | None,
+        changes: RevokedChanges | None,
+    ) -> _PendingUpdate:
+        """Queue the commands of :meth:`RedisStateDB.update` on ``pipe``.
+
+        Raises:
+            TypeError: If the revoked tasks cannot be serialized
+        """
+        pending = _PendingUpdate()
+        if self.storage == STORAGE_ZSET:
+            pending.zset_synced = self._queue_zset_update(pipe, zrevoked)
+        elif self.storage == STORAGE_SHARED:
+            if self._zset_synced is None:
+                # Per-worker copies are superseded by the shared set.
+                pipe.delete(self._get_key("zrevoked"), self._get_key("zrevoked_digest"))
+            pending.zset_synced = self._queue_shared_update(pipe, zrevoked, self._zset_synced or {})
+        elif (
+            self.storage == STORAGE_JOURNAL
+            and changes is not None
+            and not self._journal_incomplete
+            and self._journal_len + len(changes) <= self.journal_max_len
+        ):
+            pending.journal_len = self._queue_journal_append(pipe, changes)
         else:
-            _success = True
-            logger.debug("[redis-statedb] Worker state synced to Redis successfully")
-        return _success
+            if self._offload is not None:
+                # Other greenlets keep revoking while the thread reads the set.
+                zrevoked = serialization.clone(zrevoked)
+            pending.blob_digest, blob = self._run(self._encode_zrevoked, zrevoked)
+            pending.blob = blob
+            if blob is None:
+                logger.debug("[redis-statedb] Revoked tasks unchanged, skipping write")
+            else:
+                pipe.set(self._get_key("zrevoked"), blob)
+                pipe.set(self._get_key("zrevoked_digest"), pending.blob_digest)
+            if self.storage == STORAGE_JOURNAL:
+                # The snapshot folds every journaled entry, start a new stream.
+                pipe.delete(self._get_key("journal"))
+                pending.journal_len = 0
+        if self.catch_up:
+            pending.log_synced = self._queue_shared_update(pipe, zrevoked, self._log_synced)
+            pipe.set(self._get_key("synced_at"), repr(time.time()))
+        if clock is not None:
+            pipe.set(self._get_key("clock"), clock)
+        return pending
+
+    def _update_done(self, pending: _PendingUpdate) -> None:
+        if pending.zset_synced is not None:
+            self._zset_synced = pending.zset_synced
+        if pending.log_synced is not None:
+            self._log_synced = pending.log_synced
+        if pending.journal_len is not None:
+            self._journal_len = pending.journal_len
+            if pending.journal_len == 0:
+                self._journal_incomplete = False
+        if pending.blob_digest is not None:
+            self._blob_digest = pending.blob_digest
+        if pending.blob is not None:
+            self._store_local(pending.blob)
+        logger.debug("[redis-statedb] Worker state synced to Redis successfully")
+
+    def _queue_zset_update(self, pipe: Any, zrevoked: LimitedSet) -> dict[str, float]:
+        """Queue the commands turning the stored sorted set into ``zrevoked``.
+
+        Returns:
+            The members and scores the sorted set holds once the pipeline runs.
+        """
+        zset_key = self._get_key("revoked")
+        current: dict[str, float] = zrevoked.as_dict()
+        synced = self._zset_synced
+        if synced is None:
+            # Nothing known about the stored set: drop any leftover blob so a
+            # later empty sorted set never falls back to stale blob data.
+            pipe.delete(self._get_key("zrevoked"))
+            synced = {}
+
+        if not current:
+            pipe.delete(zset_key)
+            return current
+
+        if removed := synced.keys() - current.keys():
+            # Expired and maxlen-evicted entries are always the oldest ones,
+            # a single range removal covers them however many there are.
+            oldest = min(current.values())
+            pipe.zremrangebyscore(zset_key, "-inf", f"({oldest!r}")
+            if discarded := [item for item in removed if synced[item] >= oldest]:
+                pipe.zrem(zset_key, *discarded)
+
+        if added := {item: ts for item, ts in current.items() if synced.get(item) != ts}:
+            pipe.zadd(zset_key, added)
+        return current
+
+    def _queue_shared_update(
+        self, pipe: Any, zrevoked: LimitedSet, synced: dict[str, float]
+    ) -> dict[str, float]:
+        """Queue the commands adding new members of ``zrevoked`` to the shared set.
+
+        Entries evicted locally stay in the shared set, other workers may
+        still need them; the set is trimmed by age and size instead.
+
+        Args:
+            zrevoked: Current revoked tasks
+            synced: Members and timestamps already sent
+
+        Returns:
+            The members and (monotonic) timestamps sent to the shared set.
+        """
+        current: dict[str, float] = zrevoked.as_dict()
+        offset = _wall_clock_offset()
+        if added := {
+            item: inserted + offset
+            for item, inserted in current.items()
+            if synced.get(item) != inserted
+        }:
+            # The first worker to store a revoke wins, others leave it alone.
+            pipe.zadd(self.shared_key, added, nx=True)
+        if zrevoked.expires:
+            pipe.zremrangebyscore(self.shared_key, "-inf", f"({time.time() - zrevoked.expires!r}")
+        if zrevoked.maxlen:
+            pipe.zremrangebyrank(self.shared_key, 0, -zrevoked.maxlen - 1)
+        return current
+
+    def _queue_journal_append(self, pipe: Any, changes: RevokedChanges) -> int:
+        """Queue one stream entry per change.
+
+        Returns:
+            The length of the journal stream once the pipeline runs.
+        """
+        journal_key = self._get_key("journal")
+        for item, inserted in changes.added.items():
+            pipe.xadd(journal_key, {"op": "add", "id": item, "ts": repr(inserted)})
+        for item in changes.removed:
+            pipe.xadd(journal_key, {"op": "del", "id": item})
+        return self._journal_len + len(changes)
+
+    def _retry_delay(self, retries: int, started: float, exc: Exception) -> float | None:
+        """Return the delay before retrying a failed operation, None to give up."""
+        delay = self.retry_policy.backoff(retries, started) if self._retry else None
+        if delay is not None and self._deadline is not None:
+            if time.monotonic() + delay >= self._deadline:
+                delay = None
+        if delay is None:
+            self.breaker.record_failure()
+        else:
+            logger.debug(
+                "[redis-statedb] Redis operation failed, retrying in %.2fs: %s", delay, exc
+            )
+        return delay
+
+    def _run(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Call ``func(*args)``, in a native thread in cooperative mode."""
+        if self._offload is None:
+            return func(*args)
+        result: _T = self._offload(func, *args)
+        return result
+
+    def _encode_zrevoked(self, zrevoked: LimitedSet) -> tuple[bytes, bytes | None]:
+        """Serialize and compress ``zrevoked``.
+
+        Returns:
+            Tuple of (payload digest, blob), the blob being None when blob
+            storage already holds the same payload
+
+        Raises:
+            TypeError: If the revoked tasks cannot be serialized
+        """
+        fmt, payload = self._serialize_zrevoked(zrevoked)
+        digest = _digest(fmt, payload)
+        if self.storage == STORAGE_BLOB and digest == self._blob_digest:
+            return digest, None
+        return digest, compression.encode(payload, self.codec, fmt)
+
+    def _dump_blob(self, zrevoked: LimitedSet) -> bytes:
+        """Serialize and compress ``zrevoked`` into a blob, unconditionally.
+
+        Raises:
+            TypeError: If the revoked tasks cannot be serialized
+        """
+        fmt, payload = self._serialize_zrevoked(zrevoked)
+        return compression.encode(payload, self.codec, fmt)
+
+    def _mark_unsynced(self) -> None:
+        """Note revokes added behind the storage bookkeeping.
+
+        The next update then writes the whole set instead of the changes
+        known to be missing (journal storage) or nothing (unchanged blob).
+        """
+        self._journal_incomplete = True
+        self._blob_digest = None
+
+    def _serialize_zrevoked(self, zrevoked: LimitedSet) -> tuple[int, bytes]:
+        """Return the payload format and uncompressed payload for ``zrevoked``."""
+        if SERIALIZERS[self.serializer] == compression.FORMAT_BINARY:
+            try:
+                return compression.FORMAT_BINARY, serialization.dumps(zrevoked)
+            except TypeError as exc:
+                if not self.allow_pickle:
+                    raise
+                logger.warning("[redis-statedb] Falling back to pickle serializer: %s", exc)
+        return compression.FORMAT_PICKLE, self._dumps(zrevoked)
 
     def _dumps(self, obj: Any) -> bytes:
         return pickle.dumps(obj, protocol=self.protocol)
 
+    def _queue_state_load(self, pipe: Any) -> None:
+        """Queue the reads of :meth:`RedisStateDB.get_state` on ``pipe``."""
+        # The blob is read in every mode: sorted set modes fall back to it
+        # while their set is still empty. Separate reads, cluster pipelines
+        # refuse MGET.
+        pipe.get(self._get_key("clock"))
+        pipe.get(self._get_key("zrevoked"))
+        if self.storage in (STORAGE_ZSET, STORAGE_SHARED):
+            pipe.zrange(self._zset_key, 0, -1, withscores=True)
+        elif self.storage == STORAGE_JOURNAL:
+            pipe.xrange(self._get_key("journal"))
+        if self.catch_up:
+            self._queue_catch_up(pipe)
+
+    def _queue_catch_up(self, pipe: Any) -> None:
+        pipe.eval(
+            CATCH_UP_SCRIPT,
+            2,
+            self.shared_key,
+            self._get_key("synced_at"),
+            CATCH_UP_MARGIN,
+        )
+
+    def _queue_clock_load(self, pipe: Any) -> None:
+        """Queue the reads of a boot load besides a blob loaded apart."""
+        pipe.get(self._get_key("clock"))
+        if self.catch_up:
+            self._queue_catch_up(pipe)
+
+    def _parse_clock(
+        self, zrevoked: LimitedSet | None, replies: list[Any]
+    ) -> tuple[LimitedSet | None, int]:
+        """Build the state from a blob loaded apart and the replies to :meth:`_queue_clock_load`."""
+        if self.catch_up and replies[1]:
+            zrevoked = self._catch_up(zrevoked, replies[1])
+        return zrevoked, int(replies[0]) if replies[0] else 0
+
+    def _replica_blob(self, reply: list[Any], digest: bytes) -> bytes | None:
+        """Return the blob of a replica's reply, None if it is not the current one.
+
+        Args:
+            reply: Blob and digest read from the replica
+            digest: Digest read from the master
+        """
+        value, replica_digest = reply
+        if replica_digest != digest:
+            logger.debug("[redis-statedb] Replica lags behind, loading revoked tasks from master")
+            return None
+        return value
+
+    def _parse_state(
+        self, replies: list[Any], into: LimitedSet | None = None
+    ) -> tuple[LimitedSet | None, int]:
+        """Build the state from the replies to :meth:`_queue_state_load`.
+
+        Revoked tasks are added to ``into`` when given, see
+        :meth:`RedisStateDB.get_state`.
+        """
+        caught_up = replies.pop() if self.catch_up else []
+        clock_value, value = replies[0], replies[1]
+        zrevoked: LimitedSet | None
+        if self.storage in (STORAGE_ZSET, STORAGE_SHARED):
+            zrevoked = self._parse_zset(replies[2], into)
+            if zrevoked is None:
+                # Nothing in the sorted set yet, roll forward from blob storage.
+                zrevoked = self._parse_blob(value, into)
+        elif self.storage == STORAGE_JOURNAL:
+            zrevoked = self._parse_journal(value, replies[2], into)
+        else:
+            zrevoked = self._parse_blob(value, into)
+        if caught_up:
+            zrevoked = self._catch_up(zrevoked, caught_up)
+        return zrevoked, int(clock_value) if clock_value else 0
+
+    def _catch_up(self, zrevoked: LimitedSet | None, reply: list[bytes]) -> LimitedSet:
+        """Add the revokes of a catch-up query missing from ``zrevoked``."""
+        if zrevoked is None:
+            zrevoked = LimitedSet()
+        offset = _wall_clock_offset()
+        missed = 0
+        for member, score in zip(reply[::2], reply[1::2]):
+            item = member.decode()
+            inserted = float(score) - offset
+            # Already in the shared set, nothing to send
+            self._log_synced[item] = inserted
+            if item not in zrevoked:
+                zrevoked.add(item, now=inserted)
+                missed += 1
+        if missed:
+            self._journal_incomplete = True
+            logger.info("[redis-statedb] Caught up on %d revokes from other workers", missed)
+        return zrevoked
+
+    def _parse_blob(
+        self, value: bytes | memoryview | None, into: LimitedSet | None = None
+    ) -> LimitedSet | None:
+        if value is None:
+            return None
+        zrevoked = self._loads_zrevoked(value, into)
+        # Loads into an existing set avoid copies, don't keep one either.
+        if zrevoked is not None and into is None and self._blob_digest is not None:
+            self._snapshot = (self._blob_digest, serialization.clone(zrevoked))
+        return zrevoked
+
+    def _load_cached(self, digest: bytes | None, into: LimitedSet | None) -> LimitedSet | None:
+        """Load the revoked tasks without downloading them, if possible.
+
+        Args:
+            digest: Digest stored in Redis next to the blob
+            into: Set to add the revoked tasks to, see :meth:`RedisStateDB.get_state`
+
+        Returns:
+            The revoked tasks when the last loaded snapshot or the local
+            snapshot holds the blob stored in Redis, else None
+        """
+        if digest is None:
+            return None
+        if self._snapshot is not None and self._snapshot[0] == digest:
+            logger.debug("[redis-statedb] Revoked tasks unchanged since last load")
+            return serialization.clone(self._snapshot[1])
+        if self.local_snapshot is not None:
+            return self._load_local(digest, into)
+        return None
+
+    def _load_fallback(self, into: LimitedSet | None) -> LimitedSet | None:
+        """Load the local snapshot as is, when Redis cannot be reached."""
+        if self.local_snapshot is None:
+            return None
+        zrevoked = self._load_local(None, into)
+        if zrevoked is not None:
+            logger.warning(
+                "[redis-statedb] Loaded revoked tasks from local snapshot %s, "
+                "it may miss the latest revokes",
+                self.local_snapshot.path,
+            )
+            # Unknown whether Redis holds the same, write it on next update.
+            self._blob_digest = None
+        return zrevoked
+
+    def _load_local(self, expected: bytes | None, into: LimitedSet | None) -> LimitedSet | None:
+        """Load the revoked tasks from the local snapshot.
+
+        Args:
+            expected: Digest the snapshot must have, None to accept any
+
+        Returns:
+            The revoked tasks, or None when the snapshot is missing, stale
+            or unreadable
+        """
+        assert self.local_snapshot is not None
+        try:
+            with self.local_snapshot.open() as local:
+                if local is None:
+                    return None
+                digest, blob = local
+                if expected is not None and digest != expected:
+                    logger.debug("[redis-statedb] Local snapshot is stale")
+                    return None
+                # Checked before loading, ``into`` may be the live set.
+                if not self._run(self._matches_digest, blob, digest):
+                    logger.warning(
+                        "[redis-statedb] Local snapshot %s does not match its digest, ignoring it",
+                        self.local_snapshot.path,
+                    )
+                    return None
+                zrevoked = self._parse_blob(blob, into)
+        except OSError as exc:
+            logger.warning(
+                "[redis-statedb] Failed to read local snapshot %s: %s",
+                self.local_snapshot.path,
+                exc,
+            )
+            return None
+        if zrevoked is not None:
+            logger.debug("[redis-statedb] Revoked tasks loaded from local snapshot")
+        return zrevoked
+
+    def _store_local(self, blob: bytes) -> None:
+        """Write ``blob``, holding the set with digest ``_blob_digest``, locally."""
+        if self.local_snapshot is None or self._blob_digest is None:
+            return
+        try:
+            self._run(self.local_snapshot.write, self._blob_digest, blob)
+        except OSError as exc:
+            logger.warning(
+                "[redis-statedb] Failed to write local snapshot %s: %s",
+                self.local_snapshot.path,
+                exc,
+            )
+
+    def _loads_zrevoked(
+        self, value: bytes | memoryview, into: LimitedSet | None = None
+    ) -> LimitedSet | None:
+        try:
+            if into is None:
+                # No copy of bytes, mapped local snapshots are only streamed.
+                digest, data = self._run(self._decode_zrevoked, bytes(value))
+            else:
+                digest = self._run(self._decode_zrevoked_into, value, into)
+                data = into
+        except Exception as exc:
+            logger.error(
+                "[redis-statedb] Failed to deserialize revoked tasks (corrupted data?): %s", exc
+            )
+            return None
+        # Loaded content is what Redis holds, an identical update can be skipped.
+        self._blob_digest = digest
+        logger.debug("[redis-statedb] Revoked tasks retrieved successfully")
+        return data
+
+    def _decode_zrevoked(self, value: bytes) -> tuple[bytes, LimitedSet]:
+        """Decompress and load a blob, returning its payload digest and content."""
+        fmt, payload = compression.decode(value)
+        if fmt == compression.FORMAT_BINARY:
+            data = serialization.loads(payload)
+        elif fmt == compression.FORMAT_PICKLE:
+            if not self.allow_pickle:
+                raise ValueError("pickle payloads are not allowed")
+            data = pickle.loads(payload)
+        else:
+            raise ValueError(f"Unsupported payload format {fmt}")
+        return _digest(fmt, payload), data
+
+    def _matches_digest(self, value: bytes | memoryview, digest: bytes) -> bool:
+        """Return whether the payload of a blob hashes to ``digest``, without loading it."""
+        try:
+            fmt, chunks = compression.decode_stream(value)
+            hasher = _hasher(fmt)
+            for _chunk in _hashed(chunks, hasher):
+                pass
+        except Exception as exc:
+            logger.error("[redis-statedb] Failed to decompress revoked tasks: %s", exc)
+            return False
+        return hasher.digest() == digest
+
+    def _decode_zrevoked_into(self, value: bytes | memoryview, into: LimitedSet) -> bytes:
+        """Decompress and load a blob into ``into`` as it streams in.
+
+        Neither the decompressed payload nor an intermediate set is ever
+        held in memory as a whole: pieces are decompressed and binary
+        payloads merged into ``into`` block by block.
+
+        Returns:
+            The payload digest
+        """
+        fmt, chunks = compression.decode_stream(value)
+        digest = _hasher(fmt)
+        chunks = _hashed(chunks, digest)
+        if fmt == compression.FORMAT_BINARY:
+            serialization.merge(into, serialization.iter_blocks(chunks))
+        elif fmt == compression.FORMAT_PICKLE:
+            if not self.allow_pickle:
+                raise ValueError("pickle payloads are not allowed")
+            into.update(pickle.load(serialization.ChunkReader(chunks)))
+            for _chunk in chunks:
+                pass  # hash whatever follows the pickle
+        else:
+            raise ValueError(f"Unsupported payload format {fmt}")
+        return digest.digest()
+
+    def _parse_journal(
+        self, value: bytes | None, entries: list[Any], into: LimitedSet | None = None
+    ) -> LimitedSet | None:
+        if value is None and not entries:
+            return None
+
+        zrevoked = self._loads_zrevoked(value, into) if value is not None else None
+        if zrevoked is None:
+            zrevoked = LimitedSet() if into is None else into
+        # Replay the tail in order, the last entry for a task id wins.
+        for _entry_id, fields in entries:
+            item = fields[b"id"].decode()
+            if fields[b"op"] == b"add":
+                zrevoked.add(item, now=float(fields[b"ts"]))
+            else:
+                zrevoked.discard(item)
+        self._journal_len = len(entries)
+        logger.debug("[redis-statedb] Replayed %d journal entries", len(entries))
+        return zrevoked
+
+    @property
+    def _zset_key(self) -> str:
+        if self.storage == STORAGE_SHARED:
+            return self.shared_key
+        return self._get_key("revoked")
+
+    def _parse_zset(
+        self, members: list[tuple[bytes, float]], into: LimitedSet | None = None
+    ) -> LimitedSet | None:
+        if not members:
+            return None
+
+        if self.storage == STORAGE_SHARED:
+            # Wall-clock scores back to this host's monotonic clock
+            offset = _wall_clock_offset()
+            data = {member.decode(): score - offset for member, score in members}
+        else:
+            data = {member.decode(): score for member, score in members}
+        if into is None:
+            # ZRANGE returns members by ascending score, i.e. oldest first.
+            zrevoked = serialization.rebuild(0, 0, 0, list(data), list(data.values()))
+        else:
+            serialization.merge(into, [(list(data), list(data.values()))])
+            zrevoked = into
+        self._zset_synced = data
+        logger.debug("[redis-statedb] Revoked tasks retrieved successfully")
+        return zrevoked
+
+
+class RedisStateDB(BaseRedisStateDB):
+    """Redis-based state database on a synchronous ``redis`` client.
+
+    See :class:`BaseRedisStateDB` for storage modes and settings.
+    """
+
+    cluster_transactions = hasattr(redis.cluster, "TransactionStrategy")
+
+    def _create_client(self, redis_url: str, **options: Any) -> Any:
+        if self.connection_pool is not None:
+            pool = self.connection_pool
+            if options:
+                # A pool of its own, the shared one keeps its options.
+                pool = type(pool)(
+                    connection_class=pool.connection_class,
+                    **{**pool.connection_kwargs, **options},
+                )
+            return redis.Redis(connection_pool=pool)
+        if self.sentinel_url is not None:
+            if self.sentinel is None:
+                self.sentinel = redis.sentinel.Sentinel(
+                    self.sentinel_url.sentinels,
+                    **self.sentinel_url.connection_kwargs,
+                    **CLIENT_OPTIONS,
+                )
+            return self.sentinel.master_for(self.sentinel_master, **options)
+        from_url = redis.RedisCluster.from_url if self.cluster else redis.from_url
+        return from_url(redis_url, **{**CLIENT_OPTIONS, **options})
+
+    @contextlib.contextmanager
+    def bounded(self, deadline: float, retry: bool = True) -> Iterator[None]:
+        """Give up the operations run inside at ``deadline`` (``time.monotonic()``).
+
+        They run on a client of their own, whose connections wait for Redis
+        no longer than the time left, and are not retried past the deadline,
+        nor at all unless ``retry``.
+        """
+        remaining = max(deadline - time.monotonic(), 0.001)
+        client = self.redis_client
+        self.redis_client = self._create_client(
+            self.redis_url, socket_timeout=remaining, socket_connect_timeout=remaining
+        )
+        self._deadline, self._retry = deadline, retry
+        try:
+            yield
+        finally:
+            bounded, self.redis_client = self.redis_client, client
+            self._deadline, self._retry = None, True
+            bounded.close()
+            if self.connection_pool is not None:
+                bounded.connection_pool.disconnect()
+
+    def update(
+        self,
+        zrevoked: LimitedSet,
+        clock: int | None,
+        changes: RevokedChanges | None = None,
+    ) -> bool:
+        """Write the revoked tasks and clock to Redis.
+
+        Args:
+            zrevoked: Current revoked tasks
+            clock: Clock value to store, or None to leave the stored clock alone
+            changes: Changes since the previous update. Journal storage appends
+                only these; without them a full snapshot is written.
+
+        Returns:
+            True if the state was written, False on Redis errors
+        """
+        try:
+            commands = _Commands()
+            pending = self._queue_update(commands, zrevoked, clock, changes)
+            self._call(lambda: commands.pipeline(self.redis_client, self._transactional).execute())
+        except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
+            logger.error("[redis-statedb] Error syncing state to Redis: %s", exc)
+            return False
+        except TypeError as exc:
+            logger.error("[redis-statedb] Cannot serialize revoked tasks: %s", exc)
+            return False
+        self._update_done(pending)
+        return True
+
+    def _call(self, operation: Callable[[], _T]) -> _T:
+        """Run a Redis operation, retrying it on connection errors and timeouts.
+
+        Raises:
+            redis.RedisError: The error of the last attempt, or
+                :class:`~celery_redis_statedb.retry.CircuitOpenError`
+        """
+        self.breaker.check()
+        started = time.monotonic()
+        retries = 0
+        while True:
+            try:
+                result = operation()
+            except retry.RETRY_ERRORS as exc:
+                delay = self._retry_delay(retries, started, exc)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                retries += 1
+            else:
+                self.breaker.record_success()
+                return result
+
     def get_zrevoked(self) -> LimitedSet | None:
+        if self.storage in (STORAGE_ZSET, STORAGE_SHARED):
+            zrevoked = self._get_zrevoked_zset()
+            if zrevoked is not None:
+                return zrevoked
+            # Nothing in the sorted set yet, roll forward from blob storage.
+        elif self.storage == STORAGE_JOURNAL:
+            return self._get_zrevoked_journal()
+        return self._get_zrevoked_blob()
+
+    def get_state(self, into: LimitedSet | None = None) -> tuple[LimitedSet | None, int]:
+        """Load the revoked tasks and the clock in a single round trip.
+
+        Used when merging at boot, where each round trip delays the moment
+        the worker starts consuming.
+
+        Args:
+            into: Set to add the revoked tasks to, instead of a new one.
+                Blobs are then decompressed and merged into it piece by
+                piece, never holding the decompressed payload or a second
+                copy of the set in memory.
+
+        Returns:
+            Tuple of (revoked tasks, i.e. ``into`` when given, or None when
+            nothing is stored, clock value or 0)
+        """
+        if self._loads_blob_apart:
+            # The conditional load avoids the transfer, or moves it to a replica.
+            zrevoked = self._get_zrevoked_blob(into)
+            try:
+                commands = _Commands()
+                self._queue_clock_load(commands)
+                replies = self._call(
+                    lambda: commands.pipeline(self.redis_client, transaction=False).execute()
+                )
+            except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
+                logger.error("[redis-statedb] Failed to get clock value: %s", exc)
+                return zrevoked, 0
+            return self._parse_clock(zrevoked, replies)
+
+        try:
+            commands = _Commands()
+            self._queue_state_load(commands)
+            replies = self._call(
+                lambda: commands.pipeline(self.redis_client, transaction=False).execute()
+            )
+        except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
+            logger.error("[redis-statedb] Failed to get worker state: %s", exc)
+            return None, 0
+        return self._parse_state(replies, into)
+
+    def _get_zrevoked_blob(self, into: LimitedSet | None = None) -> LimitedSet | None:
         zrevoked_key = self._get_key("zrevoked")
 
         try:
-            value = self.redis_client.get(zrevoked_key)
+            value = None
+            if self._loads_blob_apart:
+                digest = self._call(lambda: self.redis_client.get(self._get_key("zrevoked_digest")))
+                zrevoked = self._load_cached(digest, into)
+                if zrevoked is not None:
+                    return zrevoked
+                if self.replica_client is not None and digest is not None:
+                    value = self._get_replica_blob(digest)
             if value is None:
-                return None
-            data = pickle.loads(self.decompress(value))
-            logger.debug("[redis-statedb] Revoked tasks retrieved successfully")
-            return data
+                value = self._call(lambda: self.redis_client.get(zrevoked_key))
+        except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
+            logger.error("[redis-statedb] Failed to get revoked tasks: %s", exc)
+            return self._load_fallback(into)
+        zrevoked = self._parse_blob(value, into)
+        if zrevoked is not None and value is not None:
+            self._store_local(value)
+        return zrevoked
+
+    def _get_replica_blob(self, digest: bytes) -> bytes | None:
+        """Read the blob from a replica, None unless it holds the current one.
+
+        A single attempt, errors of replicas do not count against the
+        circuit breaker of the master.
+        """
+        try:
+            reply = self.replica_client.mget(
+                self._get_key("zrevoked"), self._get_key("zrevoked_digest")
+            )
+        except redis.RedisError as exc:
+            logger.warning("[redis-statedb] Failed to load revoked tasks from replica: %s", exc)
+            return None
+        return self._replica_blob(reply, digest)
+
+    def _get_zrevoked_journal(self) -> LimitedSet | None:
+        try:
+            commands = _Commands()
+            commands.get(self._get_key("zrevoked"))
+            commands.xrange(self._get_key("journal"))
+            value, entries = self._call(
+                lambda: commands.pipeline(self.redis_client, transaction=False).execute()
+            )
         except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
             logger.error("[redis-statedb] Failed to get revoked tasks: %s", exc)
             return None
-        except Exception as exc:
-            logger.error(
-                "[redis-statedb] Failed to deserialize revoked tasks (corrupted data?): %s", exc
+        return self._parse_journal(value, entries)
+
+    def _get_zrevoked_zset(self) -> LimitedSet | None:
+        try:
+            members = self._call(
+                lambda: self.redis_client.zrange(self._zset_key, 0, -1, withscores=True)
             )
+        except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
+            logger.error("[redis-statedb] Failed to get revoked tasks: %s", exc)
             return None
+        return self._parse_zset(members)
 
     def get_clock(self) -> int:
         clock_key = self._get_key("clock")
 
         try:
-            value = self.redis_client.get(clock_key)
+            value = self._call(lambda: self.redis_client.get(clock_key))
             return int(value) if value else 0
         except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
             logger.error("[redis-statedb] Failed to get clock value: %s", exc)
             return 0
 
+    def set_clock_max(self, value: int) -> int:
+        """Store ``value`` as clock unless the stored clock is already ahead.
+
+        Compare and store happen atomically on the server, so two processes
+        writing the same clock can never move it backwards.
+
+        Returns:
+            The stored clock value, or ``value`` on Redis errors
+        """
+        try:
+            stored = int(
+                self._call(
+                    lambda: self._clock_max(
+                        keys=[self._get_key("clock")], args=[value], client=self.redis_client
+                    )
+                )
+            )
+        except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
+            logger.error("[redis-statedb] Failed to set clock value: %s", exc)
+            return value
+        logger.debug("[redis-statedb] Set clock value to %d", stored)
+        return stored
+
     def set_clock(self, value: int) -> None:
         clock_key = self._get_key("clock")
 
         try:
-            self.redis_client.set(clock_key, value)
+            self._call(lambda: self.redis_client.set(clock_key, value))
             logger.debug("[redis-statedb] Set clock value to %d", value)
         except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
             logger.error("[redis-statedb] Failed to set clock value: %s", exc)
@@ -141,21 +1259,45 @@ class RedisStateDB:
     def close(self) -> None:
         try:
             self.redis_client.close()
+            if self.replica_client is not None:
+                self.replica_client.close()
             logger.info("[redis-statedb] Closed Redis connection")
         except Exception as exc:
             logger.error("[redis-statedb] Error closing Redis connection: %s", exc)
 
     def ping(self) -> bool:
         try:
-            result: bool = self.redis_client.ping()
+            result: bool = self._call(self.redis_client.ping)
             return result
         except (redis.ConnectionError, redis.TimeoutError, redis.RedisError) as exc:
             logger.error("[redis-statedb] Error testing redis connection: %s", exc)
             return False
 
 
-class RedisPersistent:
-    """Redis-based persistent state manager for Celery workers."""
+class BaseRedisPersistent:
+    """Redis-based persistent state manager for Celery workers.
+
+    Changes to ``state.revoked`` are tracked so that syncs with an unchanged
+    revoked set only write the clock. With journal storage the individual
+    changes are recorded too, and each sync only appends those.
+
+    With a ``local_wal`` file, a save that cannot reach Redis appends the
+    revoked tasks and the clock to it (see :mod:`celery_redis_statedb.wal`)
+    and the next merge replays them into Redis.
+
+    With a ``shutdown_timeout``, saves pick the cheapest way of storing the
+    state that completes in time: a sync to Redis when the last one took
+    less than the time left, else the write-ahead log, else nothing. The
+    timeout runs from :meth:`begin_shutdown`, called when the worker is
+    told to shut down, or from the save.
+
+    This base class keeps the worker state side; :class:`RedisPersistent`
+    and :class:`~celery_redis_statedb.asyncio.AsyncRedisPersistent` do the
+    I/O through their state database.
+    """
+
+    #: State database class created for the worker
+    db_class: type[BaseRedisStateDB]
 
     def __init__(
         self,
@@ -164,6 +1306,10 @@ class RedisPersistent:
         state: Any,
         redis_url: str,
         clock: Any | None = None,
+        storage: str = STORAGE_BLOB,
+        local_wal: str | None = None,
+        shutdown_timeout: float = 0.0,
+        **db_options: Any,
     ) -> None:
         """Initialize Redis persistent state.
 
@@ -171,6 +1317,13 @@ class RedisPersistent:
             state: Worker state object
             redis_url: Redis connection URL
             clock: Optional logical clock
+            storage: Storage mode for revoked tasks (``blob``, ``zset``, ``journal``
+                or ``shared``)
+            local_wal: Path of a file receiving the state that could not be
+                saved to Redis at shutdown, replayed at the next merge
+            shutdown_timeout: Seconds the save at shutdown may take from
+                :meth:`begin_shutdown` (``0`` for no limit)
+            **db_options: Extra keyword arguments for the state database
 
         Raises:
             AttributeError: If state._worker_name is not set
@@ -181,11 +1334,28 @@ class RedisPersistent:
         self.key_prefix = key_prefix
         self.worker_name = worker_name
 
-        self.redis_db = RedisStateDB(
+        self.redis_db = self.db_class(
             redis_url=self.redis_url,
             worker_name=self.worker_name,
             key_prefix=self.key_prefix,
+            storage=storage,
+            **db_options,
         )
+        self.tracker = RevokedTracker.for_set(self._revoked_tasks)
+        self.tracker.record_changes = storage == STORAGE_JOURNAL
+        # Tracker generation last written to Redis, None until the first sync
+        self._synced_generation: int | None = None
+        # Whether the last write of the revoked tasks failed
+        self._sync_failed = False
+        self.wal = wal.WriteAheadLog(local_wal) if local_wal else None
+        # Set once replayed records are merged, the log is removed after the
+        # next successful sync.
+        self._wal_replayed = False
+        self.shutdown_timeout = shutdown_timeout
+        # time.monotonic() of begin_shutdown, and duration of the last sync
+        # writing revoked tasks, to tell whether a save can sync in time.
+        self._shutdown_at: float | None = None
+        self._sync_duration = 0.0
 
         logger.info(
             "[redis-statedb] Initializing persistent state for worker=%s from %s key_prefix=%s",
@@ -193,49 +1363,388 @@ class RedisPersistent:
             self.redis_url,
             self.key_prefix,
         )
-        # Load existing state from Redis
-        self.merge()
+
+    def _merge_revoked(self, zrevoked: LimitedSet | None) -> None:
+        revoked = self._revoked_tasks
+        with self.tracker.lock:
+            # Changes recorded when loading in place are the load's own, else
+            # they were made meanwhile, e.g. during a background load.
+            pending = self.tracker.drain() if zrevoked is not revoked else RevokedChanges()
+            if zrevoked is not None and zrevoked is not revoked:
+                serialization.merge_set(revoked, zrevoked)
+            if zrevoked:
+                # Merged behind the tracker, count it as a change so the next
+                # sync stores it in the configured storage mode.
+                self.tracker.touch()
+            # purge expired items at boot
+            revoked.purge()
+            # What was just loaded is already stored, don't journal it again,
+            # only the changes made before the merge, as the merge left them.
+            self.tracker.drain()
+            evicted = pending.added.keys() - revoked._data.keys()
+            for item in evicted:
+                del pending.added[item]
+            pending.removed -= revoked._data.keys()
+            pending.removed |= evicted
+            self.tracker.requeue(pending)
+
+    def _begin_sync(self) -> tuple[int, RevokedChanges | None, LimitedSet] | None:
+        """Purge the revoked tasks and return what a sync has to write.
+
+        The revoked tasks are copied: with prefork and threads pools syncs
+        run on the timer thread while the consumer keeps revoking.
+
+        Returns:
+            Tuple of (tracker generation, changes to journal, copy of the
+            revoked tasks), or None if the revoked tasks did not change since
+            the last sync.
+        """
+        with self.tracker.lock:
+            self._revoked_tasks.purge()
+            generation = self.tracker.generation
+            if generation == self._synced_generation:
+                logger.debug("[redis-statedb] Revoked tasks unchanged since last sync")
+                return None
+            changes = self.tracker.drain() if self.tracker.record_changes else None
+            return generation, changes, serialization.clone(self._revoked_tasks)
+
+    def _end_sync(
+        self,
+        generation: int,
+        changes: RevokedChanges | None,
+        success: bool,
+        duration: float = 0.0,
+    ) -> None:
+        self._sync_failed = not success
+        if success:
+            self._synced_generation = generation
+            self._sync_duration = duration
+            if self._wal_replayed:
+                self._clear_wal()
+        elif changes:
+            self.tracker.requeue(changes)
+
+    def _replay_wal(self) -> bool:
+        """Merge the records of the write-ahead log into the worker state.
+
+        Returns:
+            True if records were merged and have to be synced to Redis
+        """
+        if self.wal is None or not self.wal.exists():
+            return False
+        records = 0
+        clock_value = 0
+        try:
+            with self.tracker.lock:
+                for record_clock, blob in self.wal.read():
+                    self.db._run(self.db._decode_zrevoked_into, blob, self._revoked_tasks)
+                    clock_value = max(clock_value, record_clock)
+                    records += 1
+        except Exception as exc:
+            # Kept for inspection, it is appended to and replayed again.
+            logger.error(
+                "[redis-statedb] Failed to replay write-ahead log %s after %d records: %s",
+                self.wal.path,
+                records,
+                exc,
+            )
+        else:
+            self._wal_replayed = True
+        if not records:
+            return False
+        # Replayed behind the tracker and the storage bookkeeping
+        self.tracker.touch()
+        self.db._mark_unsynced()
+        if self.clock:
+            self.clock.adjust(clock_value)
+        logger.info(
+            "[redis-statedb] Replaying %d records of write-ahead log %s", records, self.wal.path
+        )
+        return True
+
+    def _write_wal(self) -> bool:
+        """Append the revoked tasks and clock to the write-ahead log.
+
+        Returns:
+            True if the state was written
+        """
+        assert self.wal is not None
+        try:
+            blob = self.db._dump_blob(self._revoked_tasks)
+            self.wal.append(self.clock.forward() if self.clock else 0, blob)
+        except (OSError, TypeError) as exc:
+            logger.error(
+                "[redis-statedb] Failed to write worker state to write-ahead log %s: %s",
+                self.wal.path,
+                exc,
+            )
+            return False
+        logger.warning(
+            "[redis-statedb] Worker state not saved to Redis, written to %s "
+            "and replayed at next start",
+            self.wal.path,
+        )
+        return True
+
+    def _clear_wal(self) -> None:
+        assert self.wal is not None
+        try:
+            self.wal.clear()
+        except OSError as exc:
+            logger.error(
+                "[redis-statedb] Failed to remove write-ahead log %s: %s", self.wal.path, exc
+            )
+            return
+        self._wal_replayed = False
+        logger.info("[redis-statedb] Write-ahead log replayed into Redis")
+
+    def begin_shutdown(self, **kwargs: Any) -> None:
+        """Start the shutdown timeout, e.g. from the ``worker_shutting_down`` signal."""
+        if self._shutdown_at is None:
+            self._shutdown_at = time.monotonic()
+
+    def _save_deadline(self) -> float | None:
+        """Return the ``time.monotonic()`` a save has to complete by, None for no limit."""
+        if self.shutdown_timeout <= 0:
+            return None
+        started = time.monotonic() if self._shutdown_at is None else self._shutdown_at
+        return started + self.shutdown_timeout
+
+    def _sync_deadline(self, deadline: float | None) -> float | None:
+        """Return the deadline of the sync of a save, leaving time for the write-ahead log.
+
+        After a failed sync Redis is only tried for :data:`PROBE_TIMEOUT`
+        seconds, a dead server must not hold up the shutdown.
+        """
+        if self.wal is None:
+            return deadline
+        now = time.monotonic()
+        if deadline is not None:
+            deadline -= max(deadline - now, 0.0) * WAL_RESERVE
+        if self._sync_failed:
+            probe = now + PROBE_TIMEOUT
+            deadline = probe if deadline is None else min(deadline, probe)
+        return deadline
+
+    def _should_sync(self, deadline: float | None) -> bool:
+        """Return whether a save syncs to Redis rather than using the write-ahead log.
+
+        A sync is expected to take as long as the last one writing revoked
+        tasks, and next to nothing when they did not change since (only
+        the clock is written then). Without a log Redis is the only option.
+        """
+        if deadline is None or self.wal is None:
+            return True
+        remaining = deadline - time.monotonic()
+        unchanged = self.tracker.generation == self._synced_generation
+        expected = 0.0 if unchanged else self._sync_duration
+        if remaining > expected:
+            return True
+        logger.warning(
+            "[redis-statedb] %.2f seconds left to save worker state, "
+            "the last sync took %.2f seconds, not syncing to Redis",
+            remaining,
+            expected,
+        )
+        return False
+
+    def _save_locally(self, deadline: float | None) -> str:
+        """Save the state to the write-ahead log, if there is one and time left."""
+        if deadline is not None and time.monotonic() >= deadline:
+            logger.warning("[redis-statedb] No time left to save worker state")
+            return SAVE_SKIPPED
+        if self.wal is None:
+            return SAVE_FAILED
+        return SAVE_WAL if self._write_wal() else SAVE_FAILED
+
+    def _report_save(self, outcome: str, started: float) -> None:
+        log = logger.info if outcome == SAVE_SYNCED else logger.warning
+        log(
+            "[redis-statedb] Shutdown save %s in %.2f seconds",
+            outcome,
+            time.monotonic() - started,
+        )
+
+    @property
+    def db(self) -> BaseRedisStateDB:
+        return self.redis_db
+
+    @property
+    def _revoked_tasks(self) -> LimitedSet:
+        return self.state.revoked
+
+
+class RedisPersistent(BaseRedisPersistent):
+    """Redis-based persistent state manager for Celery workers.
+
+    Existing state is merged into the worker state when created, unless
+    ``merge=False`` is passed, e.g. to call :meth:`merge_in_background`
+    instead. See :class:`BaseRedisPersistent` for the other arguments.
+
+    Attributes:
+        loaded: Set once existing state has been merged. Syncs are skipped
+            until then, so that a partly loaded set never overwrites the
+            state stored in Redis.
+        load_done: Set once the merge ended, whether it succeeded
+            (:attr:`loaded` is set) or failed.
+    """
+
+    db_class = RedisStateDB
+    redis_db: RedisStateDB
+
+    def __init__(self, *args: Any, merge: bool = True, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.loaded = threading.Event()
+        self.load_done = threading.Event()
+        if merge:
+            # Load existing state from Redis
+            self.merge()
 
     def merge(self) -> None:
-        """Merge existing Redis state into worker state."""
-        self._merge_with(self.db)
+        """Merge existing Redis state into worker state.
 
-    def _merge_with(self, db: RedisStateDB) -> None:
-        self._merge_revoked(db)
-        self._merge_clock(db)
+        Records of the write-ahead log are merged too and synced to Redis.
+        """
+        self._merge(self._revoked_tasks)
+
+    def _merge(self, into: LimitedSet) -> None:
+        try:
+            self._merge_with(self.db, into)
+            if self._replay_wal():
+                self._sync_with(self.db)
+            self.loaded.set()
+        finally:
+            self.load_done.set()
+
+    def merge_in_background(self) -> threading.Thread:
+        """Merge existing Redis state from a daemon thread.
+
+        Wait for :attr:`load_done` before relying on the worker state. The
+        state is loaded into a set of its own, only merged into the worker's
+        once complete, while the worker may already use it.
+        """
+        thread = threading.Thread(
+            target=self._background_merge, name="redis-statedb-load", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _background_merge(self) -> None:
+        start = time.monotonic()
+        revoked = self._revoked_tasks
+        try:
+            # Streamed into a set of its own, the worker may use its set meanwhile.
+            self._merge(
+                LimitedSet(maxlen=revoked.maxlen, expires=revoked.expires, minlen=revoked.minlen)
+            )
+        except Exception as exc:
+            logger.error(
+                "[redis-statedb] Failed to load worker state, it will not be saved: %s", exc
+            )
+            return
+        logger.info("[redis-statedb] Worker state loaded in %.2f seconds", time.monotonic() - start)
 
-    def _merge_revoked(self, db: RedisStateDB) -> None:
-        if zrevoked := db.get_zrevoked():
-            self._revoked_tasks.update(zrevoked)
-        # purge expired items at boot
-        self._revoked_tasks.purge()
+    def _merge_with(self, db: RedisStateDB, into: LimitedSet) -> None:
+        # Revoked tasks and clock in one round trip
+        zrevoked, clock_value = db.get_state(into=into)
+        self._merge_revoked(zrevoked)
+        self._merge_clock(db, clock_value)
 
-    def _merge_clock(self, db: RedisStateDB) -> None:
+    def _merge_clock(self, db: RedisStateDB, clock_value: int) -> None:
         if self.clock:
-            clock_value = db.get_clock()
             new_value = self.clock.adjust(clock_value)
-            db.set_clock(new_value)
+            stored = db.set_clock_max(new_value)
+            if stored > new_value:
+                # Written by another process since it was read.
+                self.clock.adjust(stored)
 
     def sync(self) -> None:
         """Synchronize current state to Redis."""
+        if not self.loaded.is_set():
+            logger.warning("[redis-statedb] Worker state still loading, skipping sync")
+            return
         self._sync_with(self.db)
 
     def _sync_with(self, db: RedisStateDB) -> RedisStateDB:
-        self._revoked_tasks.purge()
-        self.db.update(
-            zrevoked=self._revoked_tasks,
+        pending = self._begin_sync()
+        if pending is None:
+            if self.clock:
+                db.set_clock(self.clock.forward())
+            return db
+
+        generation, changes, zrevoked = pending
+        started = time.monotonic()
+        success = db.update(
+            zrevoked=zrevoked,
             clock=self.clock.forward() if self.clock else 0,
+            changes=changes,
         )
+        self._end_sync(generation, changes, success, time.monotonic() - started)
         return db
 
-    def save(self) -> None:
-        """Save state and close connections."""
+    def save(self, deadline: float | None = None) -> str:
+        """Save state and close connections.
+
+        With a write-ahead log, state that cannot be written to Redis is
+        appended to it. Redis is tried even when the last sync failed, it
+        may be back: the attempt is not retried then, waits on Redis for
+        :data:`PROBE_TIMEOUT` seconds at most, and fails right away while
+        the circuit breaker is open.
+
+        With a deadline, Redis is only tried when a sync is expected to
+        complete in time, and given up at the deadline (see
+        :meth:`RedisStateDB.bounded`). The state is then written to the
+        write-ahead log instead, if there is one and time left. No thread
+        is started, saves run from ``atexit`` where none can be.
+
+        Args:
+            deadline: ``time.monotonic()`` to return by. Defaults to
+                ``shutdown_timeout`` seconds after :meth:`begin_shutdown`,
+                or after this call if it was not called.
+
+        Returns:
+            How the state was saved, one of :data:`SAVE_SYNCED`,
+            :data:`SAVE_WAL`, :data:`SAVE_SKIPPED` or :data:`SAVE_FAILED`
+        """
+        started = time.monotonic()
+        if deadline is None:
+            deadline = self._save_deadline()
         try:
             logger.info("[redis-statedb] Saving worker state to Redis")
-            self.sync()
-            self.close()
+            outcome = self._save(deadline)
         except Exception as exc:
             logger.error("[redis-statedb] Failed to save state: %s", exc)
+            outcome = SAVE_FAILED
+        self.close()
+        self._report_save(outcome, started)
+        return outcome
+
+    def _save(self, deadline: float | None) -> str:
+        if not self.loaded.is_set():
+            logger.warning("[redis-statedb] Worker state still loading, not saving it")
+            return SAVE_SKIPPED
+        sync_deadline = self._sync_deadline(deadline)
+        try:
+            if self._should_sync(sync_deadline) and self._sync_before(sync_deadline):
+                return SAVE_SYNCED
+        except Exception as exc:
+            logger.error("[redis-statedb] Failed to save state to Redis: %s", exc)
+        return self._save_locally(deadline)
+
+    def _sync_before(self, deadline: float | None) -> bool:
+        """Sync to Redis, giving up at ``deadline``.
+
+        Returns:
+            True if the state was written to Redis
+        """
+        if deadline is None:
+            self.sync()
+        elif time.monotonic() >= deadline:
+            return False
+        else:
+            with self.redis_db.bounded(deadline, retry=not self._sync_failed):
+                self.sync()
+        return not self._sync_failed
 
     def close(self) -> None:
         """Close Redis connection."""
@@ -247,7 +1756,3 @@ class RedisPersistent:
     @property
     def db(self) -> RedisStateDB:
         return self.redis_db
-
-    @property
-    def _revoked_tasks(self) -> LimitedSet:
-        return self.state.revoked
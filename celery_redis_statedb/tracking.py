@@ -0,0 +1,207 @@
+import logging
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any
+
+from celery.utils.collections import LimitedSet  # type: ignore[attr-defined]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RevokedChanges:
+    """Changes made to the revoked set since the last drain.
+
+    Attributes:
+        added: Task ids added (or re-added) with their insertion timestamp
+        removed: Task ids discarded, expired or evicted
+    """
+
+    added: dict[Any, float] = field(default_factory=dict)
+    removed: set[Any] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed)
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed)
+
+
+class RevokedTracker:
+    """Change tracker for the worker's revoked ``LimitedSet``.
+
+    Celery modules keep direct references to ``state.revoked`` (e.g.
+    ``celery.worker.request.revoked_tasks``), so the set cannot be replaced
+    by a subclass instance. Instead the mutating methods are wrapped on the
+    instance itself and every effective change bumps :attr:`generation`.
+
+    The persistence layer compares the generation with the one it last
+    synced to skip writes when nothing changed. When :attr:`record_changes`
+    is enabled the individual additions and removals are collected as well,
+    for storage modes that only write deltas (see :meth:`drain`).
+
+    The wrapped methods hold :attr:`lock`, so that code changing the set's
+    internals from another thread, such as the background load, can keep
+    the worker's revokes out while it does.
+
+    Attributes:
+        revoked: The tracked ``LimitedSet``
+        generation: Counter increased on every change of the set
+        record_changes: Whether to collect individual changes for :meth:`drain`
+        lock: Held by every change of the set, and while changes are drained
+        on_change: Called after every addition or discard, e.g. to schedule a
+            write, but not for entries popped when the set is purged: a
+            write purges too and would schedule the next one. Runs in the
+            thread changing the set, so it must be cheap.
+    """
+
+    #: Instance attribute holding the tracker on the tracked set.
+    attr_name = "_redis_statedb_tracker"
+
+    def __init__(self, revoked: LimitedSet) -> None:
+        self.revoked = revoked
+        self.generation = 0
+        self.record_changes = False
+        self.on_change: Callable[[], None] | None = None
+        self._changes = RevokedChanges()
+        # Reentrant: add() purges through the wrapped pop().
+        self.lock = threading.RLock()
+        self._install()
+
+    @classmethod
+    def for_set(cls, revoked: LimitedSet) -> "RevokedTracker":
+        """Return the tracker attached to ``revoked``, installing one if needed."""
+        tracker = revoked.__dict__.get(cls.attr_name)
+        if tracker is None:
+            tracker = cls(revoked)
+        return tracker
+
+    def drain(self) -> RevokedChanges:
+        """Return the changes recorded so far and start a new batch."""
+        with self.lock:
+            changes, self._changes = self._changes, RevokedChanges()
+        return changes
+
+    def touch(self) -> None:
+        """Count a change made to the set's internals, bypassing its methods."""
+        self.generation += 1
+
+    def requeue(self, changes: RevokedChanges) -> None:
+        """Put back changes that could not be written, under any newer ones."""
+        with self.lock:
+            pending = self._changes
+            for item, inserted in changes.added.items():
+                if item not in pending.added and item not in pending.removed:
+                    pending.added[item] = inserted
+            pending.removed |= changes.removed - pending.added.keys()
+
+    def _install(self) -> None:
+        revoked = self.revoked
+        self._wrap("add", self._wrap_add)
+        self._wrap("update", self._wrap_update)
+        self._wrap("clear", self._wrap_clear)
+        for name in ("discard", "pop_value"):
+            self._wrap(name, self._wrap_discard)
+        # purge() pops through the instance, so expired and evicted entries
+        # are recorded by the wrapped pop as well.
+        self._wrap("pop", self._wrap_pop)
+        # Pops one entry at a time, the heap must not be replaced meanwhile.
+        self._wrap("purge", self._wrap_locked)
+        revoked.__dict__[self.attr_name] = self
+        logger.debug("[redis-statedb] Tracking changes of revoked tasks")
+
+    def uninstall(self) -> None:
+        """Restore the original methods of the tracked set."""
+        for name in ("add", "update", "clear", "discard", "pop_value", "pop", "purge"):
+            self.revoked.__dict__.pop(name, None)
+        self.revoked.__dict__.pop(self.attr_name, None)
+
+    def _wrap(self, name: str, wrapper: Callable[[Callable[..., Any]], Callable[..., Any]]) -> None:
+        self.revoked.__dict__[name] = wraps(getattr(self.revoked, name))(
+            wrapper(getattr(self.revoked, name))
+        )
+
+    def _added(self, item: Any) -> None:
+        self.generation += 1
+        if self.record_changes and (entry := self.revoked._data.get(item)) is not None:
+            self._changes.added[item] = entry[0]
+            self._changes.removed.discard(item)
+        if self.on_change is not None:
+            self.on_change()
+
+    def _removed(self, item: Any, notify: bool = True) -> None:
+        self.generation += 1
+        if self.record_changes:
+            self._changes.added.pop(item, None)
+            self._changes.removed.add(item)
+        if notify and self.on_change is not None:
+            self.on_change()
+
+    def _wrap_locked(self, method: Callable[..., Any]) -> Callable[..., Any]:
+        def locked(*args: Any, **kwargs: Any) -> Any:
+            with self.lock:
+                return method(*args, **kwargs)
+
+        return locked
+
+    def _wrap_add(self, method: Callable[..., Any]) -> Callable[..., Any]:
+        def tracked(item: Any, *args: Any, **kwargs: Any) -> Any:
+            with self.lock:
+                try:
+                    return method(item, *args, **kwargs)
+                finally:
+                    self._added(item)
+
+        return tracked
+
+    def _wrap_update(self, method: Callable[..., Any]) -> Callable[..., Any]:
+        def tracked(other: Any) -> Any:
+            with self.lock:
+                try:
+                    return method(other)
+                finally:
+                    # Dicts and iterables go through the wrapped add(), only the
+                    # LimitedSet fast path copies entries behind our back.
+                    if isinstance(other, LimitedSet):
+                        for item in other._data:
+                            self._added(item)
+
+        return tracked
+
+    def _wrap_clear(self, method: Callable[..., Any]) -> Callable[..., Any]:
+        def tracked() -> Any:
+            with self.lock:
+                items = list(self.revoked._data)
+                try:
+                    return method()
+                finally:
+                    for item in items:
+                        self._removed(item)
+
+        return tracked
+
+    def _wrap_discard(self, method: Callable[..., Any]) -> Callable[..., Any]:
+        def tracked(item: Any) -> Any:
+            with self.lock:
+                present = item in self.revoked
+                try:
+                    return method(item)
+                finally:
+                    if present:
+                        self._removed(item)
+
+        return tracked
+
+    def _wrap_pop(self, method: Callable[..., Any]) -> Callable[..., Any]:
+        def tracked(*args: Any, **kwargs: Any) -> Any:
+            with self.lock:
+                size = len(self.revoked)
+                item = method(*args, **kwargs)
+                if len(self.revoked) != size:
+                    # Expired or evicted, stored with the next write anyway.
+                    self._removed(item, notify=False)
+                return item
+
+        return tracked
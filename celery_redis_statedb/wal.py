@@ -0,0 +1,85 @@
+"""Local write-ahead log of worker state that could not be saved to Redis.
+
+When Redis cannot be reached at shutdown, the persistent state appends the
+revoked tasks and the clock to a :class:`WriteAheadLog` instead of losing
+them, and replays the log into Redis at the next boot. Each record holds a
+blob as stored in Redis (same codec and serializer), so appending one only
+costs encoding the set and a local write.
+
+Records are framed with a length and a CRC-32, so a record torn by a crash
+while it was appended is detected and skipped with whatever follows it.
+"""
+
+import contextlib
+import logging
+import os
+import struct
+import zlib
+from collections.abc import Iterator
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CRSW"
+#: magic, clock, blob length, CRC-32 of the blob
+RECORD = struct.Struct(">4sQQI")
+
+
+class WriteAheadLog:
+    """Append-only file of (clock, revoked tasks blob) records.
+
+    Attributes:
+        path: Path of the log file
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def exists(self) -> bool:
+        """Return whether the log holds records to replay."""
+        return os.path.exists(self.path)
+
+    def append(self, clock: int, blob: bytes) -> None:
+        """Append a record and flush it to disk.
+
+        Raises:
+            OSError: If the file cannot be written
+        """
+        with open(self.path, "ab") as file:
+            file.write(RECORD.pack(MAGIC, clock, len(blob), zlib.crc32(blob)))
+            file.write(blob)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def read(self) -> Iterator[tuple[int, bytes]]:
+        """Yield the (clock, blob) of each record, oldest first.
+
+        Raises:
+            OSError: If the file exists but cannot be read
+        """
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with file:
+            while header := file.read(RECORD.size):
+                blob = b""
+                if len(header) == RECORD.size:
+                    magic, clock, length, crc = RECORD.unpack(header)
+                    if magic == MAGIC:
+                        blob = file.read(length)
+                if not blob or len(blob) != length or zlib.crc32(blob) != crc:
+                    logger.warning(
+                        "[redis-statedb] Skipping torn or corrupted records at the end of %s",
+                        self.path,
+                    )
+                    return
+                yield clock, blob
+
+    def clear(self) -> None:
+        """Remove the log, once its records are stored in Redis.
+
+        Raises:
+            OSError: If the file exists but cannot be removed
+        """
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
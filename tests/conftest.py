@@ -3,6 +3,7 @@
 from unittest.mock import Mock, patch
 
 import pytest
+import redis
 from celery import Celery
 from celery.utils.collections import LimitedSet  # type: ignore[attr-defined]
 from fakeredis import FakeRedis
@@ -17,6 +18,21 @@ def fake_redis():
     return FakeRedis(decode_responses=False)
 
 
+@pytest.fixture
+def fake_cluster(fake_redis):
+    """Create a RedisCluster client whose only node is ``fake_redis``."""
+    from redis.cluster import PRIMARY, REDIS_CLUSTER_HASH_SLOTS, ClusterNode, NodesManager
+
+    def initialize(nodes, *args, **kwargs):
+        node = ClusterNode("localhost", 7000, PRIMARY, redis_connection=fake_redis)
+        nodes.nodes_cache = {node.name: node}
+        nodes.slots_cache = {slot: [node] for slot in range(REDIS_CLUSTER_HASH_SLOTS)}
+        nodes.default_node = node
+
+    with patch.object(NodesManager, "initialize", initialize):
+        return redis.RedisCluster.from_url("redis://localhost:7000/0")
+
+
 @pytest.fixture
 def mock_state():
     """Create a mock worker state."""
@@ -32,15 +48,35 @@ def mock_clock():
 
 
 @pytest.fixture
-def redis_db(fake_redis):
+def make_db(fake_redis):
+    """Return a factory of RedisStateDB instances connected to fake Redis.
+
+    Keyword arguments are passed on to RedisStateDB, over the test worker
+    name and key prefix. A client given first replaces ``fake_redis``, e.g.
+    a second FakeRedis or a fake cluster.
+    """
+
+    def make(client=None, **options) -> RedisStateDB:
+        client = fake_redis if client is None else client
+        options = {
+            "redis_url": "redis://localhost:6379/0",
+            "worker_name": "test-worker",
+            "key_prefix": "test:",
+            **options,
+        }
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=client),
+            patch("celery_redis_statedb.state.redis.RedisCluster.from_url", return_value=client),
+        ):
+            return RedisStateDB(**options)
+
+    return make
+
+
+@pytest.fixture
+def redis_db(make_db):
     """Create a RedisStateDB instance with fake Redis."""
-    with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
-        db = RedisStateDB(
-            redis_url="redis://localhost:6379/0",
-            worker_name="test-worker",
-            key_prefix="test:",
-        )
-        return db
+    return make_db()
 
 
 @pytest.fixture
@@ -53,7 +89,7 @@ def mock_worker():
     worker.state.revoked = LimitedSet(maxlen=100)
     worker.app = Mock()
     worker.app.clock = LamportClock()
-    worker.app.conf = Mock()
+    worker.app.conf = Mock(spec=[])
     worker._persistence = None
     return worker
 
@@ -0,0 +1,292 @@
+"""Unit tests for the asyncio state database and persistent state."""
+
+import asyncio
+import os
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from celery.utils.collections import LimitedSet  # type: ignore[attr-defined]
+from fakeredis import FakeAsyncRedis, FakeServer
+from kombu.clocks import LamportClock  # type: ignore[import-untyped]
+
+from celery_redis_statedb.asyncio import AsyncRedisPersistent, AsyncRedisStateDB
+from celery_redis_statedb.state import STORAGE_MODES, RedisStateDB
+
+
+@pytest.fixture
+def fake_server():
+    """Create a fake Redis server shared by sync and async clients."""
+    return FakeServer()
+
+
+@pytest.fixture
+def fake_async_redis(fake_server):
+    """Create a fake asyncio Redis client."""
+    return FakeAsyncRedis(server=fake_server, decode_responses=False)
+
+
+def make_db(client, worker_name: str = "test-worker", **options) -> AsyncRedisStateDB:
+    with patch("celery_redis_statedb.asyncio.aioredis.from_url", return_value=client):
+        return AsyncRedisStateDB(
+            redis_url="redis://localhost:6379/0",
+            worker_name=worker_name,
+            key_prefix="test:",
+            **options,
+        )
+
+
+def make_state(*items: str) -> Mock:
+    state = Mock()
+    state.revoked = LimitedSet(maxlen=100)
+    for item in items:
+        state.revoked.add(item)
+    return state
+
+
+class TestAsyncRedisStateDB:
+    """Test AsyncRedisStateDB against the synchronous implementation."""
+
+    @pytest.mark.asyncio
+    async def test_ping_and_close(self, fake_async_redis) -> None:
+        db = make_db(fake_async_redis)
+        assert await db.ping() is True
+        await db.close()
+
+    @pytest.mark.asyncio
+    async def test_clock(self, fake_async_redis) -> None:
+        db = make_db(fake_async_redis)
+        assert await db.get_clock() == 0
+        await db.set_clock(10)
+        assert await db.get_clock() == 10
+        assert await db.set_clock_max(5) == 10
+        assert await db.set_clock_max(20) == 20
+        assert await db.get_clock() == 20
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("storage", STORAGE_MODES)
+    async def test_round_trip(self, fake_async_redis, storage: str) -> None:
+        db = make_db(fake_async_redis, storage=storage)
+        revoked = LimitedSet(maxlen=100)
+        revoked.add("task-1")
+        revoked.add("task-2")
+
+        assert await db.update(zrevoked=revoked, clock=42) is True
+
+        loaded = await make_db(fake_async_redis, storage=storage).get_zrevoked()
+        assert set(loaded) == {"task-1", "task-2"}
+        zrevoked, clock = await make_db(fake_async_redis, storage=storage).get_state()
+        assert set(zrevoked) == {"task-1", "task-2"}
+        assert clock == 42
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("storage", STORAGE_MODES)
+    async def test_readable_by_sync_db(self, fake_server, fake_async_redis, storage: str) -> None:
+        """Both classes read and write the same keys and formats."""
+        from fakeredis import FakeRedis
+
+        revoked = LimitedSet(maxlen=100)
+        revoked.add("task-1")
+        assert await make_db(fake_async_redis, storage=storage).update(revoked, clock=7)
+
+        with patch(
+            "celery_redis_statedb.state.redis.from_url",
+            return_value=FakeRedis(server=fake_server, decode_responses=False),
+        ):
+            sync_db = RedisStateDB(
+                "redis://localhost:6379/0", "test-worker", "test:", storage=storage
+            )
+        zrevoked, clock = sync_db.get_state()
+        assert set(zrevoked) == {"task-1"}
+        assert clock == 7
+
+    @pytest.mark.asyncio
+    async def test_get_state_unchanged_blob(self, fake_async_redis) -> None:
+        db = make_db(fake_async_redis)
+        revoked = LimitedSet(maxlen=100)
+        revoked.add("task-1")
+        await db.update(revoked, clock=3)
+
+        first, _ = await db.get_state()
+        with patch.object(fake_async_redis, "get", wraps=fake_async_redis.get) as get:
+            second, clock = await db.get_state()
+        assert set(second) == set(first) == {"task-1"}
+        assert clock == 3
+        # Digest only (the clock is read in a pipeline), the blob itself is
+        # not transferred again.
+        assert [call.args[0] for call in get.call_args_list] == [db._get_key("zrevoked_digest")]
+
+    @pytest.mark.asyncio
+    async def test_replica_reads(self, fake_server, fake_async_redis) -> None:
+        """Test that a current replica serves the blob and a lagging one is skipped."""
+        revoked = LimitedSet(maxlen=100)
+        revoked.add("task-1")
+        await make_db(fake_async_redis).update(revoked, clock=3)
+        lagging = FakeAsyncRedis(decode_responses=False)
+        for replica, from_replica in [
+            (FakeAsyncRedis(server=fake_server, decode_responses=False), True),
+            (lagging, False),
+        ]:
+            sentinel = Mock()
+            sentinel.master_for.return_value = fake_async_redis
+            sentinel.slave_for.return_value = replica
+            with patch(
+                "celery_redis_statedb.asyncio.aioredis.sentinel.Sentinel", return_value=sentinel
+            ):
+                db = AsyncRedisStateDB(
+                    redis_url="sentinel://sentinel-1?master_name=mymaster",
+                    worker_name="test-worker",
+                    key_prefix="test:",
+                    replica_reads=True,
+                )
+            with patch.object(fake_async_redis, "get", wraps=fake_async_redis.get) as get:
+                zrevoked, clock = await db.get_state()
+            assert list(zrevoked) == ["task-1"]
+            assert clock == 3
+            assert (db._get_key("zrevoked") not in {c.args[0] for c in get.call_args_list}) is (
+                from_replica
+            )
+            await db.close()
+
+    @pytest.mark.asyncio
+    async def test_errors(self, fake_async_redis) -> None:
+        import redis
+
+        db = make_db(fake_async_redis)
+        with patch.object(fake_async_redis, "pipeline", side_effect=redis.ConnectionError("down")):
+            assert await db.update(LimitedSet(maxlen=10), clock=1) is False
+            assert await db.get_state() == (None, 0)
+        with patch.object(fake_async_redis, "get", side_effect=redis.ConnectionError("down")):
+            assert await db.get_clock() == 0
+            assert await db.get_zrevoked() is None
+
+    @pytest.mark.asyncio
+    async def test_retries(self, fake_async_redis) -> None:
+        import redis
+
+        db = make_db(fake_async_redis, retry_delay=0.0)
+        revoked = LimitedSet(maxlen=10)
+        revoked.add("task-1")
+        pipeline = fake_async_redis.pipeline
+        attempts = []
+
+        def flaky_pipeline(*args, **kwargs):
+            attempts.append(args)
+            if len(attempts) == 1:
+                raise redis.ConnectionError("reset")
+            return pipeline(*args, **kwargs)
+
+        with patch.object(fake_async_redis, "pipeline", side_effect=flaky_pipeline):
+            assert await db.update(revoked, clock=2) is True
+        assert list(await db.get_zrevoked()) == ["task-1"]
+
+
+class TestAsyncRedisPersistent:
+    """Test AsyncRedisPersistent."""
+
+    def make_persistent(self, client, state, worker_name="test-worker", **options):
+        with patch("celery_redis_statedb.asyncio.aioredis.from_url", return_value=client):
+            return AsyncRedisPersistent(
+                worker_name=worker_name,
+                key_prefix="test:",
+                state=state,
+                redis_url="redis://localhost:6379/0",
+                clock=LamportClock(),
+                **options,
+            )
+
+    @pytest.mark.asyncio
+    async def test_init_does_not_load(self, fake_async_redis) -> None:
+        state = make_state("task-1")
+        persistent = self.make_persistent(fake_async_redis, state)
+        await persistent.merge()
+        await persistent.save()
+
+        state = make_state()
+        self.make_persistent(fake_async_redis, state)
+        assert "task-1" not in state.revoked
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("storage", STORAGE_MODES)
+    async def test_sync_and_merge(self, fake_async_redis, storage: str) -> None:
+        state = make_state()
+        persistent = self.make_persistent(fake_async_redis, state, storage=storage)
+        await persistent.merge()
+        state.revoked.add("task-1")
+        state.revoked.add("task-2")
+        await persistent.sync()
+
+        restored = make_state()
+        other = self.make_persistent(fake_async_redis, restored, storage=storage)
+        await other.merge()
+        assert set(restored.revoked) == {"task-1", "task-2"}
+        assert other.clock.value >= persistent.clock.value
+
+    @pytest.mark.asyncio
+    async def test_save_redis_down_replayed_from_wal(self, fake_async_redis, tmp_path) -> None:
+        wal_path = str(tmp_path / "worker.wal")
+        state = make_state()
+        persistent = self.make_persistent(fake_async_redis, state, local_wal=wal_path)
+        await persistent.merge()
+        state.revoked.add("task-1")
+        with patch.object(persistent.redis_db, "update", return_value=False):
+            await persistent.save()
+
+        restored = make_state()
+        await self.make_persistent(fake_async_redis, restored, local_wal=wal_path).merge()
+        assert set(restored.revoked) == {"task-1"}
+        assert not os.path.exists(wal_path)
+
+    @pytest.mark.asyncio
+    async def test_save_hung_sync_bounded(self, fake_async_redis, tmp_path) -> None:
+        """A sync still running at the deadline is cancelled for the log."""
+        state = make_state()
+        persistent = self.make_persistent(
+            fake_async_redis, state, local_wal=str(tmp_path / "worker.wal")
+        )
+        await persistent.merge()
+        state.revoked.add("task-1")
+
+        async def hang(**kwargs) -> bool:
+            await asyncio.sleep(5)
+            return True
+
+        with patch.object(persistent.redis_db, "update", side_effect=hang):
+            outcome = await persistent.save(deadline=time.monotonic() + 0.1)
+
+        assert outcome == "wal"
+        assert len(list(persistent.wal.read())) == 1
+        other = self.make_persistent(fake_async_redis, make_state())
+        await other.merge()
+        assert await other.save() == "synced"
+
+    @pytest.mark.asyncio
+    async def test_save_before_merge_skipped(self, fake_async_redis) -> None:
+        """The stored state is not overwritten by a set it was not merged into."""
+        persistent = self.make_persistent(fake_async_redis, make_state("task-1"))
+        await persistent.merge()
+        await persistent.sync()
+
+        other = self.make_persistent(fake_async_redis, make_state())
+        await other.sync()
+        assert await other.save() == "skipped"
+
+        zrevoked, _clock = await make_db(fake_async_redis).get_state()
+        assert set(zrevoked) == {"task-1"}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_workers(self, fake_async_redis) -> None:
+        """The state of many workers is saved and loaded concurrently."""
+        names = [f"worker-{i}" for i in range(10)]
+        persistents = [
+            self.make_persistent(fake_async_redis, make_state(f"task-{name}"), name)
+            for name in names
+        ]
+        await asyncio.gather(*(persistent.merge() for persistent in persistents))
+        await asyncio.gather(*(persistent.sync() for persistent in persistents))
+
+        dbs = [make_db(fake_async_redis, name) for name in names]
+        states = await asyncio.gather(*(db.get_state() for db in dbs))
+        for name, (zrevoked, clock) in zip(names, states, strict=True):
+            assert set(zrevoked) == {f"task-{name}"}
+            assert clock > 0
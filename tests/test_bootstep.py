@@ -1,5 +1,7 @@
 """Unit tests for Celery bootstep."""
 
+import threading
+import time
 from typing import TYPE_CHECKING
 from unittest.mock import Mock, patch
 
@@ -7,6 +9,7 @@ import pytest
 from celery.utils.collections import LimitedSet  # type: ignore[attr-defined]
 from fakeredis import FakeRedis
 
+from celery_redis_statedb import compression, serialization
 from celery_redis_statedb.bootstep import RedisStatePersistence
 from celery_redis_statedb.state import RedisPersistent
 
@@ -85,6 +88,143 @@ class TestRedisPersistent:
             assert "task-1" in mock_state.revoked
             assert "task-2" in mock_state.revoked
 
+    def test_merge_in_place_rolls_forward(
+        self, mock_state: Mock, mock_clock: LamportClock, fake_redis: FakeRedis
+    ) -> None:
+        """Test that revokes loaded in place are written by the first sync."""
+        existing_revoked = LimitedSet(maxlen=100)
+        existing_revoked.add("task-1", now=10.0)
+        fake_redis.set(
+            "celery:worker:state:test-worker:zrevoked",
+            compression.encode(
+                serialization.dumps(existing_revoked),
+                compression.get_codec("zlib"),
+                compression.FORMAT_BINARY,
+            ),
+        )
+        revoked = mock_state.revoked
+
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = RedisPersistent(
+                worker_name="test-worker",
+                key_prefix="celery:worker:state:",
+                state=mock_state,
+                redis_url="redis://localhost:6379/0",
+                clock=mock_clock,
+                storage="zset",
+            )
+            persistent.sync()
+
+        assert mock_state.revoked is revoked
+        assert revoked.as_dict() == {"task-1": 10.0}
+        assert fake_redis.zrange("celery:worker:state:test-worker:revoked", 0, -1) == [b"task-1"]
+
+    def test_merge_in_background(
+        self, mock_state: Mock, mock_clock: LamportClock, fake_redis: FakeRedis
+    ) -> None:
+        """Test that syncs wait for a background merge to complete."""
+        existing_revoked = LimitedSet(maxlen=100)
+        existing_revoked.add("task-1", now=10.0)
+        fake_redis.set(
+            "celery:worker:state:test-worker:zrevoked",
+            compression.encode(
+                serialization.dumps(existing_revoked),
+                compression.get_codec("zlib"),
+                compression.FORMAT_BINARY,
+            ),
+        )
+
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = RedisPersistent(
+                worker_name="test-worker",
+                key_prefix="celery:worker:state:",
+                state=mock_state,
+                redis_url="redis://localhost:6379/0",
+                clock=mock_clock,
+                merge=False,
+            )
+            assert not persistent.loaded.is_set()
+            assert "task-1" not in mock_state.revoked
+
+            # A sync before the load must not overwrite the stored state
+            mock_state.revoked.add("task-2")
+            with patch.object(persistent.db, "update") as update:
+                persistent.sync()
+            update.assert_not_called()
+
+            persistent.merge_in_background().join(timeout=5)
+            assert persistent.loaded.is_set()
+            assert "task-1" in mock_state.revoked
+            assert "task-2" in mock_state.revoked
+            # Streamed in, no copy of the loaded set is kept
+            assert persistent.db._snapshot is None
+
+    def test_merge_in_background_error(
+        self, mock_state: Mock, mock_clock: LamportClock, fake_redis: FakeRedis
+    ) -> None:
+        """Test that a failed background merge is logged and keeps syncs off."""
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = RedisPersistent(
+                worker_name="test-worker",
+                key_prefix="celery:worker:state:",
+                state=mock_state,
+                redis_url="redis://localhost:6379/0",
+                clock=mock_clock,
+                merge=False,
+            )
+            with (
+                patch.object(persistent, "_merge_with", side_effect=RuntimeError("boom")),
+                patch("celery_redis_statedb.state.logger") as logger,
+            ):
+                persistent.merge_in_background().join(timeout=5)
+
+            assert not persistent.loaded.is_set()
+            assert persistent.load_done.is_set()
+            logger.error.assert_called_once()
+
+    def test_merge_in_background_keeps_revokes(
+        self, mock_state: Mock, mock_clock: LamportClock, fake_redis: FakeRedis
+    ) -> None:
+        """Test that tasks revoked during a background load are journaled."""
+        journal_key = "celery:worker:state:test-worker:journal"
+        fake_redis.xadd(journal_key, {"op": "add", "id": "task-1", "ts": "10.0"})
+
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = RedisPersistent(
+                worker_name="test-worker",
+                key_prefix="celery:worker:state:",
+                state=mock_state,
+                redis_url="redis://localhost:6379/0",
+                clock=mock_clock,
+                storage="journal",
+                merge=False,
+            )
+            get_state = persistent.db.get_state
+            loading, release = threading.Event(), threading.Event()
+
+            def slow_get_state(into: LimitedSet | None = None) -> tuple[LimitedSet | None, int]:
+                assert into is not None
+                assert into is not mock_state.revoked
+                loading.set()
+                release.wait(5)
+                return get_state(into)
+
+            with patch.object(persistent.db, "get_state", side_effect=slow_get_state):
+                thread = persistent.merge_in_background()
+                assert loading.wait(5)
+                mock_state.revoked.add("task-2")
+                release.set()
+                thread.join(timeout=5)
+
+            assert persistent.loaded.is_set()
+            assert "task-1" in mock_state.revoked
+            persistent.sync()
+
+        assert [fields[b"id"] for _, fields in fake_redis.xrange(journal_key)] == [
+            b"task-1",
+            b"task-2",
+        ]
+
     def test_merge_with_clock(
         self, mock_state: Mock, mock_clock: LamportClock, fake_redis: FakeRedis
     ) -> None:
@@ -107,11 +247,30 @@ class TestRedisPersistent:
             adjusted_value = int(fake_redis.get(clock_key))
             assert adjusted_value == 101
 
+    def test_merge_clock_written_concurrently(
+        self, mock_state: Mock, mock_clock: LamportClock, fake_redis: FakeRedis
+    ) -> None:
+        """Test that a clock stored ahead between load and store is kept and adopted."""
+        clock_key = "celery:worker:state:test-worker:clock"
+        fake_redis.set(clock_key, 100)
+
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            with patch(
+                "celery_redis_statedb.state.RedisStateDB.set_clock_max", return_value=500
+            ) as set_clock_max:
+                RedisPersistent(
+                    worker_name="test-worker",
+                    key_prefix="celery:worker:state:",
+                    state=mock_state,
+                    redis_url="redis://localhost:6379/0",
+                    clock=mock_clock,
+                )
+
+            set_clock_max.assert_called_once_with(101)
+            assert mock_clock.value == 501
+
     def test_sync(self, mock_state: Mock, mock_clock: LamportClock, fake_redis: FakeRedis) -> None:
         """Test syncing state to Redis using blob storage."""
-        import zlib
-
-        from kombu.serialization import pickle
 
         with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
             persistent = RedisPersistent(
@@ -135,7 +294,7 @@ class TestRedisPersistent:
             assert stored_data is not None
 
             # Decompress and verify contents
-            revoked_set = pickle.loads(zlib.decompress(stored_data))
+            revoked_set = serialization.loads(compression.decode(stored_data)[1])
             assert "task-1" in revoked_set
             assert "task-2" in revoked_set
 
@@ -164,11 +323,116 @@ class TestRedisPersistent:
             # Clock value should be greater than 0 after forward() is called
             assert int(clock_value) > 0
 
+    def test_sync_skips_unchanged_revoked(
+        self, mock_state: Mock, mock_clock: LamportClock, fake_redis: FakeRedis
+    ) -> None:
+        """Test that a sync without new revokes only writes the clock."""
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = RedisPersistent(
+                worker_name="test-worker",
+                key_prefix="celery:worker:state:",
+                state=mock_state,
+                redis_url="redis://localhost:6379/0",
+                clock=mock_clock,
+            )
+            mock_state.revoked.add("task-1")
+            persistent.sync()
+
+            with patch.object(persistent.redis_db, "update") as mock_update:
+                persistent.sync()
+                mock_update.assert_not_called()
+
+            # Clock is still moved forward
+            clock_key = "celery:worker:state:test-worker:clock"
+            assert int(fake_redis.get(clock_key)) == mock_clock.value
+
+            mock_state.revoked.add("task-2")
+            with patch.object(persistent.redis_db, "update") as mock_update:
+                persistent.sync()
+                mock_update.assert_called_once()
+
+    def test_sync_retries_after_failed_update(
+        self, mock_state: Mock, mock_clock: LamportClock, fake_redis: FakeRedis
+    ) -> None:
+        """Test that a failed write keeps the revoked set marked dirty."""
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = RedisPersistent(
+                worker_name="test-worker",
+                key_prefix="celery:worker:state:",
+                state=mock_state,
+                redis_url="redis://localhost:6379/0",
+                clock=mock_clock,
+            )
+            mock_state.revoked.add("task-1")
+
+            with patch.object(persistent.redis_db, "update", return_value=False):
+                persistent.sync()
+
+            with patch.object(persistent.redis_db, "update") as mock_update:
+                persistent.sync()
+                mock_update.assert_called_once()
+
+    def test_sync_journal_appends_changes(
+        self, mock_state: Mock, mock_clock: LamportClock, fake_redis: FakeRedis
+    ) -> None:
+        """Test that journal storage only appends what changed since the last sync."""
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = RedisPersistent(
+                worker_name="test-worker",
+                key_prefix="celery:worker:state:",
+                state=mock_state,
+                redis_url="redis://localhost:6379/0",
+                clock=mock_clock,
+                storage="journal",
+            )
+            mock_state.revoked.add("task-1")
+            persistent.sync()
+            mock_state.revoked.add("task-2")
+            persistent.sync()
+
+            journal_key = "celery:worker:state:test-worker:journal"
+            entries = fake_redis.xrange(journal_key)
+            assert [fields[b"id"] for _, fields in entries] == [b"task-1", b"task-2"]
+
+            # A restarted worker gets both back from the journal
+            mock_state.revoked.clear()
+            persistent.merge()
+            assert "task-1" in mock_state.revoked
+            assert "task-2" in mock_state.revoked
+            # Loaded entries are not journaled again
+            persistent.sync()
+            assert len(fake_redis.xrange(journal_key)) == 2
+
+    def test_sync_revokes_during_sync(
+        self, mock_state: Mock, mock_clock: LamportClock, fake_redis: FakeRedis
+    ) -> None:
+        """Test that syncs write a copy, revokes made meanwhile are written next."""
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = RedisPersistent(
+                worker_name="test-worker",
+                key_prefix="celery:worker:state:",
+                state=mock_state,
+                redis_url="redis://localhost:6379/0",
+                clock=mock_clock,
+            )
+            update = persistent.db.update
+
+            def revoking_update(zrevoked: LimitedSet, **kwargs) -> bool:
+                assert zrevoked is not mock_state.revoked
+                mock_state.revoked.add("task-2")  # consumer thread revoking meanwhile
+                return update(zrevoked=zrevoked, **kwargs)
+
+            mock_state.revoked.add("task-1")
+            with patch.object(persistent.db, "update", side_effect=revoking_update):
+                persistent.sync()
+            assert set(persistent.db.get_zrevoked()) == {"task-1"}
+
+            # Written by the next sync
+            persistent.sync()
+            assert set(persistent.db.get_zrevoked()) == {"task-1", "task-2"}
+
     def test_save(self, mock_state: Mock, mock_clock: LamportClock, fake_redis: FakeRedis) -> None:
         """Test saving state."""
-        import zlib
-
-        from kombu.serialization import pickle
 
         with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
             persistent = RedisPersistent(
@@ -190,9 +454,146 @@ class TestRedisPersistent:
             stored_data = fake_redis.get(zrevoked_key)
             assert stored_data is not None
 
-            revoked_set = pickle.loads(zlib.decompress(stored_data))
+            revoked_set = serialization.loads(compression.decode(stored_data)[1])
             assert "task-1" in revoked_set
 
+    @pytest.mark.parametrize("storage", ["blob", "zset", "journal", "shared"])
+    def test_save_redis_down_replayed_from_wal(
+        self, mock_state: Mock, fake_redis: FakeRedis, tmp_path, storage: str
+    ) -> None:
+        """Test that state not saved to Redis at shutdown is replayed at next boot."""
+        import redis as redis_module
+        from kombu.clocks import LamportClock
+
+        wal_path = tmp_path / "worker.wal"
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = RedisPersistent(
+                worker_name="test-worker",
+                key_prefix="celery:worker:state:",
+                state=mock_state,
+                redis_url="redis://localhost:6379/0",
+                clock=LamportClock(),
+                storage=storage,
+                local_wal=str(wal_path),
+            )
+            mock_state.revoked.add("task-1")
+            persistent.sync()
+            mock_state.revoked.add("task-2")
+            with patch.object(
+                persistent.redis_db.redis_client,
+                "pipeline",
+                side_effect=redis_module.ConnectionError("down"),
+            ):
+                persistent.sync()
+                persistent.save()
+            assert wal_path.exists()
+
+            state = Mock()
+            state.revoked = LimitedSet(maxlen=100)
+            clock = LamportClock()
+            restarted = RedisPersistent(
+                worker_name="test-worker",
+                key_prefix="celery:worker:state:",
+                state=state,
+                redis_url="redis://localhost:6379/0",
+                clock=clock,
+                storage=storage,
+                local_wal=str(wal_path),
+            )
+            assert sorted(state.revoked) == ["task-1", "task-2"]
+            assert clock.value > persistent.clock.value
+            assert not wal_path.exists()
+
+            # Replayed revokes are in Redis for the next worker
+            state.revoked.clear()
+            restarted.merge()
+            assert sorted(state.revoked) == ["task-1", "task-2"]
+
+    def test_save_tries_redis_after_failed_sync(
+        self, mock_state: Mock, mock_clock: LamportClock, fake_redis: FakeRedis, tmp_path
+    ) -> None:
+        """Test that shutdown saves to Redis when it is back after a failed sync."""
+        wal_path = tmp_path / "worker.wal"
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = RedisPersistent(
+                worker_name="test-worker",
+                key_prefix="celery:worker:state:",
+                state=mock_state,
+                redis_url="redis://localhost:6379/0",
+                clock=mock_clock,
+                local_wal=str(wal_path),
+            )
+            mock_state.revoked.add("task-1")
+            with patch.object(persistent.redis_db, "update", return_value=False):
+                persistent.sync()
+
+            assert persistent.save() == "synced"
+            assert not wal_path.exists()
+            assert fake_redis.get("celery:worker:state:test-worker:zrevoked") is not None
+
+    def test_save_after_failed_sync_not_retried(
+        self, mock_state: Mock, mock_clock: LamportClock, fake_redis: FakeRedis, tmp_path
+    ) -> None:
+        """Test that Redis still down after a failed sync is tried once, then the log used."""
+        import redis
+
+        wal_path = tmp_path / "worker.wal"
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = RedisPersistent(
+                worker_name="test-worker",
+                key_prefix="celery:worker:state:",
+                state=mock_state,
+                redis_url="redis://localhost:6379/0",
+                clock=mock_clock,
+                local_wal=str(wal_path),
+            )
+            mock_state.revoked.add("task-1")
+            with patch.object(persistent.redis_db, "update", return_value=False):
+                persistent.sync()
+
+            with (
+                patch.object(fake_redis, "pipeline", side_effect=redis.ConnectionError("down")),
+                patch("celery_redis_statedb.state.time.sleep") as sleep,
+            ):
+                assert persistent.save() == "wal"
+            sleep.assert_not_called()
+            assert wal_path.exists()
+
+    def test_wal_kept_until_synced(
+        self, mock_state: Mock, mock_clock: LamportClock, fake_redis: FakeRedis, tmp_path
+    ) -> None:
+        """Test that replayed records stay in the log until Redis accepted them."""
+        from celery_redis_statedb.wal import WriteAheadLog
+
+        wal_path = tmp_path / "worker.wal"
+        revoked = LimitedSet(maxlen=100)
+        revoked.add("task-1")
+        blob = compression.encode(
+            serialization.dumps(revoked), compression.get_codec("zlib"), compression.FORMAT_BINARY
+        )
+        WriteAheadLog(str(wal_path)).append(5, blob)
+        # Torn record of a crash while appending
+        with open(wal_path, "ab") as file:
+            file.write(b"CRSW\x00")
+
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            with patch("celery_redis_statedb.state.RedisStateDB.update", return_value=False):
+                persistent = RedisPersistent(
+                    worker_name="test-worker",
+                    key_prefix="celery:worker:state:",
+                    state=mock_state,
+                    redis_url="redis://localhost:6379/0",
+                    clock=mock_clock,
+                    local_wal=str(wal_path),
+                )
+            assert "task-1" in mock_state.revoked
+            assert mock_clock.value >= 5
+            assert wal_path.exists()
+
+            persistent.sync()
+            assert not wal_path.exists()
+            assert fake_redis.get("celery:worker:state:test-worker:zrevoked") is not None
+
     def test_close(self, mock_state: Mock, mock_clock: LamportClock, fake_redis: FakeRedis) -> None:
         """Test closing connection."""
         with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
@@ -212,8 +613,8 @@ class TestRedisPersistent:
     ) -> None:
         """Test that merge errors don't crash initialization."""
         with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
-            with patch("celery_redis_statedb.state.RedisStateDB.get_zrevoked") as mock_get:
-                mock_get.return_value = None  # Return None instead of raising
+            with patch("celery_redis_statedb.state.RedisStateDB.get_state") as mock_get:
+                mock_get.return_value = (None, 0)  # Return nothing instead of raising
 
                 # Should not raise
                 persistent = RedisPersistent(
@@ -243,6 +644,139 @@ class TestRedisPersistent:
                 # save() should handle errors gracefully
                 persistent.save()  # Should not raise
 
+    def make_persistent(self, mock_state: Mock, mock_clock: "LamportClock", **options):
+        return RedisPersistent(
+            worker_name="test-worker",
+            key_prefix="celery:worker:state:",
+            state=mock_state,
+            redis_url="redis://localhost:6379/0",
+            clock=mock_clock,
+            **options,
+        )
+
+    def test_save_within_shutdown_timeout(
+        self, mock_state: Mock, mock_clock: "LamportClock", fake_redis: FakeRedis, tmp_path
+    ) -> None:
+        """Test that a sync expected to complete in time writes to Redis."""
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = self.make_persistent(
+                mock_state, mock_clock, local_wal=str(tmp_path / "worker.wal"), shutdown_timeout=5
+            )
+            mock_state.revoked.add("task-1")
+
+            assert persistent.save() == "synced"
+        assert fake_redis.get("celery:worker:state:test-worker:zrevoked") is not None
+        assert not (tmp_path / "worker.wal").exists()
+
+    def test_save_slow_sync_written_to_wal(
+        self, mock_state: Mock, mock_clock: "LamportClock", fake_redis: FakeRedis, tmp_path
+    ) -> None:
+        """Test that Redis is not tried when the last sync took longer than the time left."""
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = self.make_persistent(
+                mock_state, mock_clock, local_wal=str(tmp_path / "worker.wal"), shutdown_timeout=1
+            )
+            mock_state.revoked.add("task-1")
+            persistent.sync()
+            persistent._sync_duration = 2.0
+            mock_state.revoked.add("task-2")
+
+            with patch.object(persistent.redis_db, "update") as update:
+                assert persistent.save() == "wal"
+            update.assert_not_called()
+            assert len(list(persistent.wal.read())) == 1
+
+    def test_save_unchanged_syncs_clock(
+        self, mock_state: Mock, mock_clock: "LamportClock", fake_redis: FakeRedis, tmp_path
+    ) -> None:
+        """Test that a slow last sync does not matter when there is only the clock to write."""
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = self.make_persistent(
+                mock_state, mock_clock, local_wal=str(tmp_path / "worker.wal"), shutdown_timeout=1
+            )
+            mock_state.revoked.add("task-1")
+            persistent.sync()
+            persistent._sync_duration = 2.0
+
+            assert persistent.save() == "synced"
+
+    def test_save_hung_sync_bounded(
+        self, mock_state: Mock, mock_clock: "LamportClock", fake_redis: FakeRedis, tmp_path
+    ) -> None:
+        """Test that a sync to a server not replying is given up at the deadline, in line."""
+        import socket
+        import threading
+
+        # Accepts connections (in its backlog) and never replies.
+        server = socket.create_server(("127.0.0.1", 0))
+        port = server.getsockname()[1]
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = RedisPersistent(
+                worker_name="test-worker",
+                key_prefix="celery:worker:state:",
+                state=mock_state,
+                redis_url=f"redis://127.0.0.1:{port}/0",
+                clock=mock_clock,
+                local_wal=str(tmp_path / "worker.wal"),
+            )
+        mock_state.revoked.add("task-1")
+
+        try:
+            with patch.object(threading.Thread, "start") as start_thread:
+                started = time.monotonic()
+                assert persistent.save(deadline=time.monotonic() + 0.5) == "wal"
+                assert time.monotonic() - started < 1.5
+        finally:
+            server.close()
+        start_thread.assert_not_called()
+        assert len(list(persistent.wal.read())) == 1
+        # The worker's own client is left alone
+        assert persistent.redis_db.redis_client is fake_redis
+
+    def test_save_sync_error_written_to_wal(
+        self, mock_state: Mock, mock_clock: "LamportClock", fake_redis: FakeRedis, tmp_path
+    ) -> None:
+        """Test that the log receives the state when the sync raises."""
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = self.make_persistent(
+                mock_state, mock_clock, local_wal=str(tmp_path / "worker.wal"), shutdown_timeout=5
+            )
+            mock_state.revoked.add("task-1")
+
+            with patch.object(persistent.redis_db, "update", side_effect=RuntimeError("bug")):
+                assert persistent.save() == "wal"
+        assert len(list(persistent.wal.read())) == 1
+
+    def test_save_no_time_left(
+        self, mock_state: Mock, mock_clock: "LamportClock", fake_redis: FakeRedis, tmp_path
+    ) -> None:
+        """Test that nothing is written once the deadline passed."""
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = self.make_persistent(
+                mock_state, mock_clock, local_wal=str(tmp_path / "worker.wal")
+            )
+            mock_state.revoked.add("task-1")
+
+            with patch.object(persistent.redis_db, "update") as update:
+                assert persistent.save(deadline=time.monotonic() - 1) == "skipped"
+            update.assert_not_called()
+            assert not (tmp_path / "worker.wal").exists()
+
+    def test_shutdown_timeout_from_begin_shutdown(
+        self, mock_state: Mock, mock_clock: "LamportClock", fake_redis: FakeRedis
+    ) -> None:
+        """Test that the shutdown timeout runs from the shutdown request."""
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            persistent = self.make_persistent(mock_state, mock_clock, shutdown_timeout=10)
+        assert persistent._save_deadline() is not None
+
+        with patch("celery_redis_statedb.state.time.monotonic", return_value=100.0):
+            persistent.begin_shutdown(sig="SIGTERM", how="Warm", exitcode=0)
+        persistent.begin_shutdown()
+
+        assert persistent._save_deadline() == 110.0
+        assert self.make_persistent(mock_state, mock_clock)._save_deadline() is None
+
 
 class TestRedisStatePersistence:
     """Test RedisStatePersistence bootstep."""
@@ -329,13 +863,16 @@ class TestRedisStatePersistence:
         worker.app.clock = Mock()
         worker.app.clock.adjust = Mock(return_value=100)
         worker.app.clock.forward = Mock(return_value=101)
-        worker.app.conf = Mock()
+        worker.app.conf = Mock(spec=[])
         worker._redis_persistence = None
 
         # Set default config values
         worker.app.conf.redis_state_key_prefix = "celery:worker:state:"
 
-        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
             bootstep = RedisStatePersistence(worker, redis_statedb="redis://localhost:6379/0")
             bootstep.create(worker)
 
@@ -352,13 +889,16 @@ class TestRedisStatePersistence:
         worker.app.clock = Mock()
         worker.app.clock.adjust = Mock(return_value=100)
         worker.app.clock.forward = Mock(return_value=101)
-        worker.app.conf = Mock()
+        worker.app.conf = Mock(spec=[])
         worker._redis_persistence = None
 
         # Set custom config values
         worker.app.conf.redis_state_key_prefix = "myapp:worker:state:"
 
-        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
             bootstep = RedisStatePersistence(worker, redis_statedb="redis://localhost:6379/0")
             bootstep.create(worker)
 
@@ -381,13 +921,16 @@ class TestRedisStatePersistence:
         worker.app.clock = Mock()
         worker.app.clock.adjust = Mock(return_value=100)
         worker.app.clock.forward = Mock(return_value=101)
-        worker.app.conf = Mock()
+        worker.app.conf = Mock(spec=[])
         worker._redis_persistence = None
 
         # Set both env var and app.conf - env var should win
         worker.app.conf.redis_state_key_prefix = "appconf:worker:state:"
 
-        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
             with patch.dict(os.environ, {"CELERY_REDIS_STATE_KEY_PREFIX": "envvar:worker:state:"}):
                 bootstep = RedisStatePersistence(worker, redis_statedb="redis://localhost:6379/0")
                 bootstep.create(worker)
@@ -410,14 +953,17 @@ class TestRedisStatePersistence:
         worker.app.clock = Mock()
         worker.app.clock.adjust = Mock(return_value=100)
         worker.app.clock.forward = Mock(return_value=101)
-        worker.app.conf = Mock()
+        worker.app.conf = Mock(spec=[])
         worker._redis_persistence = None
 
         worker.app.conf.redis_state_key_prefix = "celery:worker:state:"
 
-        with patch(
-            "celery_redis_statedb.state.redis.from_url", return_value=fake_redis
-        ) as mock_from_url:
+        with (
+            patch(
+                "celery_redis_statedb.state.redis.from_url", return_value=fake_redis
+            ) as mock_from_url,
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
             # Pass redis_statedb which should take precedence
             bootstep = RedisStatePersistence(worker, redis_statedb="redis://localhost:6379/1")
             bootstep.create(worker)
@@ -449,7 +995,7 @@ class TestRedisStatePersistence:
         worker.app.clock = Mock()
         worker.app.clock.adjust = Mock(return_value=100)
         worker.app.clock.forward = Mock(return_value=101)
-        worker.app.conf = Mock()
+        worker.app.conf = Mock(spec=[])
         worker._redis_persistence = None
 
         worker.app.conf.redis_state_key_prefix = "celery:worker:state:"
@@ -469,14 +1015,17 @@ class TestRedisStatePersistence:
         worker.hostname = "test-worker@hostname"
         worker.state = Mock()
         worker.app = Mock()
-        worker.app.conf = Mock()
+        worker.app.conf = Mock(spec=[])
         worker._redis_persistence = None
 
         worker.app.conf.redis_state_key_prefix = "celery:worker:state:"
 
-        with patch(
-            "celery_redis_statedb.bootstep.RedisPersistent",
-            side_effect=Exception("Connection failed"),
+        with (
+            patch(
+                "celery_redis_statedb.state.RedisPersistent",
+                side_effect=Exception("Connection failed"),
+            ),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
         ):
             bootstep = RedisStatePersistence(worker, redis_statedb="redis://localhost:6379/0")
 
@@ -485,3 +1034,461 @@ class TestRedisStatePersistence:
 
             # Persistence should be None after error
             assert worker._redis_persistence is None
+
+    def test_start_schedules_periodic_sync(self, mock_worker: Mock, fake_redis: FakeRedis) -> None:
+        """Test that start registers a repeating sync on the worker timer."""
+        mock_worker.app.conf.redis_state_sync_interval = 30
+
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+            bootstep.start(mock_worker)
+
+            mock_worker.timer.call_repeatedly.assert_called_once_with(
+                30.0, mock_worker._redis_persistence.sync
+            )
+
+            bootstep.stop(mock_worker)
+            mock_worker.timer.call_repeatedly.return_value.cancel.assert_called_once()
+
+    def test_start_sync_interval_from_env_var(
+        self, mock_worker: Mock, fake_redis: FakeRedis
+    ) -> None:
+        """Test that the sync interval can be set from the environment."""
+        import os
+
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            with patch.dict(os.environ, {"CELERY_REDIS_STATE_SYNC_INTERVAL": "5"}):
+                bootstep = RedisStatePersistence(
+                    mock_worker, redis_statedb="redis://localhost:6379/0"
+                )
+                bootstep.create(mock_worker)
+                bootstep.start(mock_worker)
+
+                assert mock_worker.timer.call_repeatedly.call_args[0][0] == 5.0
+
+    def test_start_periodic_sync_disabled(self, mock_worker: Mock, fake_redis: FakeRedis) -> None:
+        """Test that a zero interval keeps the atexit-only behavior."""
+        mock_worker.app.conf.redis_state_sync_interval = 0
+
+        with patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+            bootstep.start(mock_worker)
+
+            mock_worker.timer.call_repeatedly.assert_not_called()
+
+    def test_start_disabled(self, mock_worker: Mock) -> None:
+        """Test that start does nothing when the bootstep is disabled."""
+        bootstep = RedisStatePersistence(mock_worker)
+        bootstep.create(mock_worker)
+        bootstep.start(mock_worker)
+
+        mock_worker.timer.call_repeatedly.assert_not_called()
+
+    def test_create_with_zset_storage(self, mock_worker: Mock, fake_redis: FakeRedis) -> None:
+        """Test that the storage mode is read from app.conf."""
+        mock_worker.app.conf.redis_state_storage = "zset"
+
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+
+            assert mock_worker._redis_persistence.db.storage == "zset"
+
+    def test_create_codec_cli_option_wins(self, mock_worker: Mock, fake_redis: FakeRedis) -> None:
+        """Test that --redis-statedb-codec takes precedence over app.conf."""
+        mock_worker.app.conf.redis_state_codec = "zlib"
+
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(
+                mock_worker,
+                redis_statedb="redis://localhost:6379/0",
+                redis_statedb_codec="none",
+            )
+            bootstep.create(mock_worker)
+
+            assert mock_worker._redis_persistence.db.codec.name == "none"
+
+    def test_create_with_pickle_serializer(self, mock_worker: Mock, fake_redis: FakeRedis) -> None:
+        """Test that the serializer is read from app.conf."""
+        mock_worker.app.conf.redis_state_serializer = "pickle"
+
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+
+            assert mock_worker._redis_persistence.db.serializer == "pickle"
+
+    def test_create_allow_pickle_from_env(
+        self, mock_worker: Mock, fake_redis: FakeRedis, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that pickle loading can be disabled from the environment."""
+        monkeypatch.setenv("CELERY_REDIS_STATE_ALLOW_PICKLE", "false")
+
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+
+            assert mock_worker._redis_persistence.db.allow_pickle is False
+
+    def test_create_with_catch_up(self, mock_worker: Mock, fake_redis: FakeRedis) -> None:
+        """Test that catch-up is read from app.conf."""
+        mock_worker.app.conf.redis_state_catch_up = True
+
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+
+            assert mock_worker._redis_persistence.db.catch_up is True
+
+    def test_create_cooperative_on_green_pool(
+        self, mock_worker: Mock, fake_redis: FakeRedis
+    ) -> None:
+        """Test that cooperative mode is enabled on gevent pools by default."""
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.offload.detect_environment", return_value="gevent"),
+            patch(
+                "celery_redis_statedb.offload.get_offload",
+                return_value=lambda func, *args: func(*args),
+            ) as get_offload,
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+
+            assert mock_worker._redis_persistence.db._offload is get_offload.return_value
+
+    def test_create_cooperative_disabled_from_env(
+        self, mock_worker: Mock, fake_redis: FakeRedis, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that cooperative mode can be disabled on green pools."""
+        monkeypatch.setenv("CELERY_REDIS_STATE_COOPERATIVE", "false")
+
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.offload.detect_environment", return_value="gevent"),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+
+            assert mock_worker._redis_persistence.db._offload is None
+
+    def test_create_with_local_snapshot(
+        self, mock_worker: Mock, fake_redis: FakeRedis, tmp_path
+    ) -> None:
+        """Test that the local snapshot path is expanded with the worker name."""
+        mock_worker.hostname = "worker1@host"
+        mock_worker.app.conf.redis_state_local_snapshot = str(tmp_path / "%n.snapshot")
+
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+
+            local_snapshot = mock_worker._redis_persistence.db.local_snapshot
+            assert local_snapshot.path == str(tmp_path / "worker1.snapshot")
+
+    def test_create_with_retry_settings(self, mock_worker: Mock, fake_redis: FakeRedis) -> None:
+        """Test that retry and circuit breaker settings reach the state database."""
+        import os
+
+        mock_worker.app.conf.redis_state_max_retries = 5
+        mock_worker.app.conf.redis_state_breaker_threshold = 2
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch.dict(os.environ, {"CELERY_REDIS_STATE_RETRY_DEADLINE": "1.5"}),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+
+            db = mock_worker._redis_persistence.db
+            assert db.retry_policy.max_retries == 5
+            assert db.retry_policy.deadline == 1.5
+            assert db.breaker.threshold == 2
+
+    def test_create_with_cluster(self, mock_worker: Mock, fake_redis: FakeRedis) -> None:
+        """Test that cluster mode connects with RedisCluster and hash-tags the keys."""
+        mock_worker.hostname = "worker1@host"
+        mock_worker.app.conf.redis_state_cluster = "true"
+        with (
+            patch(
+                "celery_redis_statedb.state.redis.RedisCluster.from_url", return_value=fake_redis
+            ),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:7000/0")
+            bootstep.create(mock_worker)
+
+            db = mock_worker._redis_persistence.db
+            assert db.cluster
+            assert db.key_prefix == "celery:worker:state:{worker1@host}:"
+
+    def test_create_with_sentinel(self, mock_worker: Mock, fake_redis: FakeRedis) -> None:
+        """Test that the Sentinel master name and replica reads reach the state database."""
+        import os
+
+        sentinel = Mock()
+        sentinel.master_for.return_value = fake_redis
+        mock_worker.app.conf.redis_state_sentinel_master = "mymaster"
+        with (
+            patch("celery_redis_statedb.state.redis.sentinel.Sentinel", return_value=sentinel),
+            patch.dict(os.environ, {"CELERY_REDIS_STATE_REPLICA_READS": "true"}),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="sentinel://sentinel-1")
+            bootstep.create(mock_worker)
+
+            db = mock_worker._redis_persistence.db
+            assert db.sentinel_master == "mymaster"
+            assert db.replica_client is sentinel.slave_for.return_value
+            sentinel.slave_for.assert_called_once_with("mymaster")
+
+    def test_create_with_shared_pool(self, mock_worker: Mock, fake_redis: FakeRedis) -> None:
+        """Test that the state database takes its connections from the pool registry."""
+        import os
+
+        with (
+            patch("celery_redis_statedb.pools.get_pool") as get_pool,
+            patch("celery_redis_statedb.state.redis.Redis", return_value=fake_redis),
+            patch.dict(os.environ, {"CELERY_REDIS_STATE_SHARED_POOL": "1"}),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+
+            get_pool.assert_called_once_with("redis://localhost:6379/0", app=mock_worker.app)
+            db = mock_worker._redis_persistence.db
+            assert db.connection_pool is get_pool.return_value
+
+    def test_create_with_shared_pool_and_sentinel(self, mock_worker: Mock) -> None:
+        from celery.exceptions import ImproperlyConfigured
+
+        mock_worker.app.conf.redis_state_shared_pool = True
+        bootstep = RedisStatePersistence(mock_worker, redis_statedb="sentinel://sentinel-1")
+
+        with pytest.raises(ImproperlyConfigured, match="shared_pool"):
+            bootstep.create(mock_worker)
+
+    def test_create_with_local_wal(
+        self, mock_worker: Mock, fake_redis: FakeRedis, tmp_path
+    ) -> None:
+        """Test that the write-ahead log path is read from the environment."""
+        import os
+
+        mock_worker.hostname = "worker1@host"
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch.dict(os.environ, {"CELERY_REDIS_STATE_LOCAL_WAL": str(tmp_path / "%h.wal")}),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+
+            wal = mock_worker._redis_persistence.wal
+            assert wal.path == str(tmp_path / "host.wal")
+
+    def test_create_with_shutdown_timeout(self, mock_worker: Mock, fake_redis: FakeRedis) -> None:
+        """Test that the shutdown timeout starts on the worker_shutting_down signal."""
+        from celery.signals import worker_shutting_down
+
+        mock_worker.app.conf.redis_state_shutdown_timeout = 25
+
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+        persistence = mock_worker._redis_persistence
+        assert persistence.shutdown_timeout == 25.0
+
+        try:
+            worker_shutting_down.send(
+                sender=mock_worker.hostname, sig="SIGTERM", how="Warm", exitcode=0
+            )
+            assert persistence._shutdown_at is not None
+        finally:
+            worker_shutting_down.disconnect(persistence.begin_shutdown)
+
+    def test_start_write_behind_coalesces_revokes(
+        self, mock_worker: Mock, fake_redis: FakeRedis
+    ) -> None:
+        """Test that a burst of revokes schedules a single sync within the flush delay."""
+        mock_worker.app.conf.redis_state_flush_delay = 0.5
+
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+            bootstep.start(mock_worker)
+            persistence = mock_worker._redis_persistence
+
+            for i in range(1000):
+                mock_worker.state.revoked.add(f"task-{i}")
+
+            mock_worker.timer.call_after.assert_called_once()
+            delay, flush = mock_worker.timer.call_after.call_args[0]
+            assert delay == 0.5
+
+            flush()
+            stored = persistence.db.get_zrevoked()
+            assert len(stored) == 100  # maxlen of the worker's set
+
+            # The next revoke starts a new window
+            mock_worker.state.revoked.add("task-late")
+            assert mock_worker.timer.call_after.call_count == 2
+
+            bootstep.stop(mock_worker)
+            mock_worker.timer.call_after.return_value.cancel.assert_called_once()
+            assert persistence.tracker.on_change is None
+
+    def test_start_write_behind_expiry_not_flushed(
+        self, mock_worker: Mock, fake_redis: FakeRedis
+    ) -> None:
+        """Test that a flush only expiring revokes does not schedule another flush."""
+        mock_worker.app.conf.redis_state_flush_delay = 0.5
+        mock_worker.state.revoked = LimitedSet(maxlen=100, expires=10)
+
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+            bootstep.start(mock_worker)
+
+            mock_worker.state.revoked.add("task-old", now=time.monotonic() - 60)
+            mock_worker.state.revoked.add("task-new")
+            mock_worker.timer.call_after.assert_called_once()
+
+            _delay, flush = mock_worker.timer.call_after.call_args[0]
+            flush()
+
+            assert list(mock_worker.state.revoked) == ["task-new"]
+            mock_worker.timer.call_after.assert_called_once()
+
+    def test_start_write_behind_disabled_by_default(
+        self, mock_worker: Mock, fake_redis: FakeRedis
+    ) -> None:
+        """Test that revokes are not written behind unless a flush delay is set."""
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+            bootstep.start(mock_worker)
+
+            mock_worker.state.revoked.add("task-1")
+
+            mock_worker.timer.call_after.assert_not_called()
+
+    def test_create_background_load(self, mock_worker: Mock, fake_redis: FakeRedis) -> None:
+        """Test that the state is loaded in the background and start waits for it."""
+        mock_worker.app.conf.redis_state_background_load = True
+        mock_worker.app.conf.redis_state_load_timeout = 7
+
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch.object(RedisPersistent, "merge_in_background") as merge_in_background,
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+            persistence = mock_worker._redis_persistence
+
+            merge_in_background.assert_called_once_with()
+            assert not persistence.loaded.is_set()
+
+            with patch.object(persistence.load_done, "wait", return_value=True) as wait:
+                bootstep.start(mock_worker)
+            wait.assert_called_once_with(7.0)
+
+    def test_start_load_timeout(self, mock_worker: Mock, fake_redis: FakeRedis) -> None:
+        """Test that the worker starts without the state once the load timeout expires."""
+        import os
+
+        mock_worker.app.conf.redis_state_sync_interval = 30
+
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch.dict(
+                os.environ,
+                {
+                    "CELERY_REDIS_STATE_BACKGROUND_LOAD": "true",
+                    "CELERY_REDIS_STATE_LOAD_TIMEOUT": "0",
+                },
+            ),
+            patch.object(RedisPersistent, "merge_in_background"),
+            patch("celery_redis_statedb.bootstep.logger") as logger,
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+            bootstep.start(mock_worker)
+
+            logger.warning.assert_called_once()
+            mock_worker.timer.call_repeatedly.assert_called_once()
+
+    def test_start_load_failed(self, mock_worker: Mock, fake_redis: FakeRedis) -> None:
+        """Test that a failed background load does not hold the start up."""
+        mock_worker.app.conf.redis_state_background_load = True
+        mock_worker.app.conf.redis_state_load_timeout = 30
+
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch.object(RedisPersistent, "_merge_with", side_effect=RuntimeError("boom")),
+            patch("celery_redis_statedb.bootstep.logger") as logger,
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+            started = time.monotonic()
+            bootstep.start(mock_worker)
+
+            assert time.monotonic() - started < 5
+            assert not mock_worker._redis_persistence.loaded.is_set()
+            logger.warning.assert_called_once()
+            assert "failed to load" in logger.warning.call_args[0][0]
+
+    def test_create_loads_in_line_by_default(
+        self, mock_worker: Mock, fake_redis: FakeRedis
+    ) -> None:
+        """Test that the state is loaded while the step is created by default."""
+        with (
+            patch("celery_redis_statedb.state.redis.from_url", return_value=fake_redis),
+            patch("celery_redis_statedb.bootstep.atexit.register"),
+        ):
+            bootstep = RedisStatePersistence(mock_worker, redis_statedb="redis://localhost:6379/0")
+            bootstep.create(mock_worker)
+
+            assert mock_worker._redis_persistence.loaded.is_set()
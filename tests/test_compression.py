@@ -0,0 +1,97 @@
+"""Unit tests for blob compression codecs."""
+
+import zlib
+
+import pytest
+from celery.exceptions import ImproperlyConfigured
+
+from celery_redis_statedb import compression
+
+
+class TestCompression:
+    """Test codec registry and blob header handling."""
+
+    @pytest.mark.parametrize("name", ["none", "zlib", "zstd", "lz4"])
+    def test_round_trip(self, name: str) -> None:
+        """Test that every codec reads back what it wrote."""
+        if name == "zstd":
+            pytest.importorskip("zstandard")
+        elif name == "lz4":
+            pytest.importorskip("lz4")
+        codec = compression.get_codec(name)
+        payload = b"revoked-task-id" * 100
+
+        blob = compression.encode(payload, codec, compression.FORMAT_PICKLE)
+
+        assert blob.startswith(compression.MAGIC)
+        assert compression.decode(blob) == (compression.FORMAT_PICKLE, payload)
+
+    @pytest.mark.parametrize("name", ["none", "zlib", "zstd", "lz4"])
+    def test_decode_stream(self, name: str) -> None:
+        """Test that every codec decompresses piece by piece."""
+        if name == "zstd":
+            pytest.importorskip("zstandard")
+        elif name == "lz4":
+            pytest.importorskip("lz4")
+        payload = bytes(range(256)) * 4096
+        blob = compression.encode(payload, compression.get_codec(name), 7)
+
+        fmt, chunks = compression.decode_stream(blob)
+        pieces = list(chunks)
+
+        assert fmt == 7
+        assert b"".join(pieces) == payload
+        if name == "none":
+            assert len(pieces) == len(payload) // compression.STREAM_CHUNK_SIZE
+
+    def test_decode_stream_legacy_blob(self) -> None:
+        """Test that headerless blobs stream as zlib-compressed pickles."""
+        fmt, chunks = compression.decode_stream(zlib.compress(b"legacy payload"))
+
+        assert (fmt, b"".join(chunks)) == (compression.FORMAT_PICKLE, b"legacy payload")
+
+    def test_decode_legacy_blob(self) -> None:
+        """Test that headerless blobs are read as zlib-compressed pickles."""
+        payload = b"legacy payload"
+
+        assert compression.decode(zlib.compress(payload)) == (compression.FORMAT_PICKLE, payload)
+
+    def test_decode_detects_codec(self) -> None:
+        """Test that the codec comes from the header, not the configuration."""
+        blob = compression.encode(b"payload", compression.get_codec("none"), 7)
+
+        assert compression.decode(blob) == (7, b"payload")
+
+    def test_decode_unknown_codec(self) -> None:
+        """Test that an unknown codec id is rejected."""
+        blob = compression.HEADER.pack(compression.MAGIC, compression.HEADER_VERSION, 250, 1)
+
+        with pytest.raises(ValueError, match="codec"):
+            compression.decode(blob + b"data")
+
+    def test_decode_unknown_header_version(self) -> None:
+        """Test that blobs from a newer header layout are rejected."""
+        blob = compression.HEADER.pack(compression.MAGIC, 99, 1, 1)
+
+        with pytest.raises(ValueError, match="version"):
+            compression.decode(blob + zlib.compress(b"data"))
+
+    def test_get_codec_unknown(self) -> None:
+        """Test that selecting an unknown codec fails."""
+        with pytest.raises(ImproperlyConfigured):
+            compression.get_codec("brotli")
+
+    def test_get_codec_missing_package(self) -> None:
+        """Test that a codec whose package is missing fails at configuration time."""
+
+        def _load_missing():
+            raise ImportError("No module named 'missing'")
+
+        codec = compression.Codec("missing", 200, _load_missing, requires="missing")
+        compression.register_codec(codec)
+        try:
+            with pytest.raises(ImproperlyConfigured, match="missing"):
+                compression.get_codec("missing")
+        finally:
+            compression._codecs_by_name.pop("missing")
+            compression._codecs_by_id.pop(200)
@@ -25,13 +25,14 @@ class TestInstallRedisStateDB:
         # Verify Redis StateDB was added
         assert RedisStatePersistence in celery_app.steps["worker"]
 
-        # Verify CLI options were added (--redis-statedb and --migrate-statedb)
-        assert len(celery_app.user_options["worker"]) == 2
+        # Verify CLI options were added
+        assert len(celery_app.user_options["worker"]) == 3
         options = list(celery_app.user_options["worker"])
         assert all(isinstance(opt, Option) for opt in options)
         option_names = {opt.opts[0] for opt in options}
         assert "--redis-statedb" in option_names
         assert "--migrate-statedb" in option_names
+        assert "--redis-statedb-codec" in option_names
 
     def test_install_cli_option_parameters(self, celery_app: Celery) -> None:
         """Test that the CLI options have correct parameters."""
@@ -54,6 +55,11 @@ class TestInstallRedisStateDB:
         assert migrate_opt.default is None
         assert "Path to file-based statedb" in migrate_opt.help
 
+        # Find --redis-statedb-codec option
+        codec_opt = next(opt for opt in options if "--redis-statedb-codec" in opt.opts)
+        assert codec_opt.type.name == "text"
+        assert codec_opt.default is None
+
     def test_install_idempotent(self, celery_app: Celery) -> None:
         """Test that installing multiple times is safe."""
         # Install twice
@@ -108,3 +114,37 @@ class TestInstallRedisStateDB:
 
         with pytest.raises(Exception, match="Add failed"):
             install_redis_statedb(celery_app)
+
+
+class TestLazyImports:
+    """Test that the package defers loading redis and the state layer."""
+
+    def test_install_does_not_import_state(self) -> None:
+        """Test that importing the package and installing it loads neither redis nor migration."""
+        import subprocess
+        import sys
+
+        code = (
+            "import sys\n"
+            "from celery import Celery\n"
+            "import celery_redis_statedb\n"
+            "celery_redis_statedb.install_redis_statedb(Celery('app'))\n"
+            "modules = ('redis', 'celery_redis_statedb.state', 'celery_redis_statedb.migration')\n"
+            "print(sorted(name for name in modules if name in sys.modules))\n"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+
+        assert result.stdout.strip() == "[]"
+
+    def test_lazy_attributes(self) -> None:
+        import celery_redis_statedb
+        from celery_redis_statedb.migration import StateDBMigrator
+        from celery_redis_statedb.state import RedisStateDB
+
+        assert celery_redis_statedb.RedisStateDB is RedisStateDB
+        assert celery_redis_statedb.StateDBMigrator is StateDBMigrator
+        assert set(celery_redis_statedb.__all__) <= set(dir(celery_redis_statedb))
+        with pytest.raises(AttributeError, match="no attribute 'missing'"):
+            celery_redis_statedb.missing  # noqa: B018
@@ -0,0 +1,106 @@
+"""Unit tests for the registry of Redis connection pools."""
+
+import time
+from collections.abc import Iterator
+from unittest.mock import Mock, patch
+
+import pytest
+import redis
+from celery import Celery
+from celery.exceptions import ImproperlyConfigured
+from celery.utils.collections import LimitedSet  # type: ignore[attr-defined]
+from fakeredis import FakeRedis
+
+from celery_redis_statedb import pools
+from celery_redis_statedb.state import CLIENT_OPTIONS
+
+
+@pytest.fixture(autouse=True)
+def clear_pools() -> Iterator[None]:
+    yield
+    pools.clear()
+
+
+class TestGetPool:
+    """Test get_pool."""
+
+    def test_pool_shared_by_url_and_options(self) -> None:
+        pool = pools.get_pool("redis://localhost:6379/0")
+
+        assert pools.get_pool("redis://localhost:6379/0") is pool
+        assert pools.get_pool("redis://localhost:6379/0", **CLIENT_OPTIONS) is pool
+        assert pools.get_pool("redis://localhost:6379/1") is not pool
+        assert pools.get_pool("redis://localhost:6379/0", socket_timeout=1.0) is not pool
+        assert pool.connection_kwargs["socket_timeout"] == CLIENT_OPTIONS["socket_timeout"]
+
+    def test_clear(self) -> None:
+        pool = pools.get_pool("redis://localhost:6379/0")
+
+        with patch.object(pool, "disconnect") as disconnect:
+            pools.clear()
+
+        disconnect.assert_called_once()
+        assert pools.get_pool("redis://localhost:6379/0") is not pool
+
+    def test_reuses_result_backend_pool(self) -> None:
+        """Test that the pool of a Redis result backend with the same URL is reused."""
+        app = Celery(set_as_current=False, backend="redis://localhost:6379/1")
+
+        pool = pools.get_pool("redis://localhost:6379/1", app=app)
+
+        assert pool is app.backend.client.connection_pool
+        assert pools.get_pool("redis://localhost:6379/0", app=app) is not pool
+
+    def test_ignores_other_backends(self) -> None:
+        app = Celery(set_as_current=False, backend="cache+memory://")
+
+        assert pools.backend_pool(app, "redis://localhost:6379/0") is None
+
+
+class TestRedisStateDBConnectionPool:
+    """Test RedisStateDB instances sharing a connection pool."""
+
+    def test_databases_share_pool(self, make_db) -> None:
+        pool = FakeRedis().connection_pool
+        revoked = LimitedSet(maxlen=100)
+        revoked.add("task-1")
+
+        first = make_db(connection_pool=pool, worker_name="worker-1")
+        second = make_db(connection_pool=pool, worker_name="worker-2")
+
+        assert first.update(revoked, clock=3)
+        assert second.update(LimitedSet(maxlen=100), clock=4)
+        zrevoked, clock = make_db(connection_pool=pool, worker_name="worker-1").get_state()
+        assert zrevoked is not None
+        assert list(zrevoked) == ["task-1"]
+        assert clock == 3
+        assert first.redis_client.connection_pool is second.redis_client.connection_pool is pool
+
+    def test_close_keeps_pool_open(self, make_db) -> None:
+        pool = FakeRedis().connection_pool
+        db = make_db(connection_pool=pool, worker_name="worker-1")
+
+        with patch.object(pool, "disconnect") as disconnect:
+            db.close()
+
+        disconnect.assert_not_called()
+
+    def test_bounded_keeps_pool_options(self, make_db) -> None:
+        """Test that bounded operations use a pool of their own, leaving the shared one alone."""
+        pool = pools.get_pool("redis://localhost:6379/0")
+        db = make_db(connection_pool=pool, worker_name="worker-1")
+
+        with db.bounded(time.monotonic() + 2):
+            bounded_pool = db.redis_client.connection_pool
+            assert bounded_pool is not pool
+            assert 0 < bounded_pool.connection_kwargs["socket_timeout"] <= 2
+        assert db.redis_client.connection_pool is pool
+        assert pool.connection_kwargs["socket_timeout"] == CLIENT_OPTIONS["socket_timeout"]
+
+    @pytest.mark.parametrize(
+        "options",
+        [{"cluster": True}, {"redis_url": "sentinel://sentinel-1?master_name=mymaster"}],
+    )
+    def test_rejects_cluster_and_sentinel(self, make_db, options: dict) -> None:
+        with pytest.raises(ImproperlyConfigured, match="connection pools"):
+            make_db(connection_pool=Mock(spec=redis.ConnectionPool), **options)
@@ -0,0 +1,160 @@
+"""Unit tests for the retry policy and circuit breaker of Redis operations."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+import redis
+from celery.utils.collections import LimitedSet  # type: ignore[attr-defined]
+
+from celery_redis_statedb.retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+class TestRetryPolicy:
+    """Test RetryPolicy backoff."""
+
+    def test_backoff_grows_exponentially(self) -> None:
+        """Test that delays stay below an exponentially growing, capped bound."""
+        policy = RetryPolicy(max_retries=10, delay=0.1, max_delay=0.5, deadline=0)
+
+        with patch("celery_redis_statedb.retry.random.uniform", side_effect=lambda a, b: b):
+            delays = [policy.backoff(retries, started=0.0) for retries in range(5)]
+
+        assert delays == pytest.approx([0.1, 0.2, 0.4, 0.5, 0.5])
+
+    def test_backoff_jitter(self) -> None:
+        """Test that delays are randomized below their bound."""
+        policy = RetryPolicy(max_retries=10, delay=1.0, max_delay=1.0, deadline=0)
+
+        delays = {policy.backoff(0, started=0.0) for _ in range(20)}
+
+        assert len(delays) > 1
+        assert all(0 <= delay <= 1.0 for delay in delays)
+
+    def test_gives_up_after_max_retries(self) -> None:
+        policy = RetryPolicy(max_retries=2, delay=0.0)
+
+        assert policy.backoff(1, started=time.monotonic()) is not None
+        assert policy.backoff(2, started=time.monotonic()) is None
+
+    def test_gives_up_at_deadline(self) -> None:
+        """Test that no retry is scheduled past the operation's deadline."""
+        policy = RetryPolicy(max_retries=10, delay=0.1, deadline=5.0)
+
+        with patch("celery_redis_statedb.retry.time.monotonic", return_value=105.0):
+            assert policy.backoff(0, started=100.0) is None
+            assert policy.backoff(0, started=104.0) is not None
+
+
+class TestCircuitBreaker:
+    """Test CircuitBreaker states."""
+
+    def test_opens_after_threshold(self) -> None:
+        breaker = CircuitBreaker(threshold=3, reset_timeout=30.0)
+
+        for _ in range(2):
+            breaker.record_failure()
+            breaker.check()
+        breaker.record_failure()
+
+        assert breaker.is_open
+        with pytest.raises(CircuitOpenError):
+            breaker.check()
+
+    def test_success_resets_failures(self) -> None:
+        breaker = CircuitBreaker(threshold=2)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert not breaker.is_open
+
+    def test_half_open_after_reset_timeout(self) -> None:
+        """Test that Redis is tried again after the reset timeout."""
+        breaker = CircuitBreaker(threshold=1, reset_timeout=30.0)
+        with patch("celery_redis_statedb.retry.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        assert breaker.failures == 1
+
+        with patch("celery_redis_statedb.retry.time.monotonic", return_value=131.0):
+            breaker.check()
+            # The trial fails, open again
+            breaker.record_failure()
+            assert breaker.is_open
+        with patch("celery_redis_statedb.retry.time.monotonic", return_value=162.0):
+            breaker.check()
+            breaker.record_success()
+        assert not breaker.is_open
+
+    def test_disabled(self) -> None:
+        breaker = CircuitBreaker(threshold=0)
+
+        for _ in range(100):
+            breaker.record_failure()
+
+        assert not breaker.is_open
+
+
+class TestRedisStateDBRetry:
+    """Test retries and circuit breaking of RedisStateDB operations."""
+
+    def test_transient_error_retried(self, make_db, fake_redis) -> None:
+        db = make_db(retry_delay=0.0)
+
+        with patch.object(
+            fake_redis, "get", side_effect=[redis.ConnectionError("reset"), b"5"]
+        ) as get:
+            assert db.get_clock() == 5
+        assert get.call_count == 2
+
+    def test_pipeline_commands_queued_on_retry(self, make_db, fake_redis) -> None:
+        """Test that a retried pipeline sends its commands again."""
+        db = make_db(retry_delay=0.0)
+        revoked = LimitedSet(maxlen=10)
+        revoked.add("task-1")
+        pipeline = fake_redis.pipeline
+        attempts = []
+
+        def flaky_pipeline(*args, **kwargs):
+            attempts.append(args)
+            if len(attempts) == 1:
+                raise redis.TimeoutError("timeout")
+            return pipeline(*args, **kwargs)
+
+        with patch.object(fake_redis, "pipeline", side_effect=flaky_pipeline):
+            assert db.update(revoked, clock=3)
+
+        assert len(attempts) == 2
+        assert list(db.get_zrevoked()) == ["task-1"]
+        assert db.get_clock() == 3
+
+    def test_gives_up_after_max_retries(self, make_db, fake_redis) -> None:
+        db = make_db(retry_delay=0.0, max_retries=2)
+
+        with patch.object(fake_redis, "get", side_effect=redis.ConnectionError("down")) as get:
+            assert db.get_clock() == 0
+        assert get.call_count == 3
+
+    def test_other_errors_not_retried(self, make_db, fake_redis) -> None:
+        db = make_db(retry_delay=0.0)
+
+        with patch.object(fake_redis, "get", side_effect=redis.ResponseError("WRONGTYPE")) as get:
+            assert db.get_clock() == 0
+        assert get.call_count == 1
+        assert db.breaker.failures == 0
+
+    def test_circuit_fails_fast(self, make_db, fake_redis) -> None:
+        """Test that operations stop reaching Redis once the circuit opened."""
+        db = make_db(retry_delay=0.0, max_retries=0, breaker_threshold=2)
+
+        with patch.object(fake_redis, "get", side_effect=redis.ConnectionError("down")) as get:
+            for _ in range(5):
+                assert db.get_clock() == 0
+        assert get.call_count == 2
+        assert not db.ping()
+
+        later = time.monotonic() + db.breaker.reset_timeout
+        with patch("celery_redis_statedb.retry.time.monotonic", return_value=later):
+            assert db.ping()
+        assert not db.breaker.is_open
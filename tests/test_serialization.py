@@ -0,0 +1,239 @@
+"""Unit tests for the compact binary serializer."""
+
+import pickle
+import random
+import time
+import uuid
+
+import pytest
+from celery.utils.collections import LimitedSet  # type: ignore[attr-defined]
+
+from celery_redis_statedb import serialization
+
+
+class TestSerialization:
+    """Test binary serialization of revoked task sets."""
+
+    def test_round_trip_uuids(self) -> None:
+        """Test that UUID task ids and timestamps survive a round trip."""
+        revoked = LimitedSet(maxlen=1000, expires=3600)
+        for i in range(100):
+            revoked.add(str(uuid.uuid4()), now=1000.0 + i * 0.25)
+
+        result = serialization.loads(serialization.dumps(revoked))
+
+        assert result.maxlen == 1000
+        assert result.expires == 3600
+        assert result.as_dict() == revoked.as_dict()
+
+    def test_round_trip_mixed_ids(self) -> None:
+        """Test that non-UUID ids fall back to length-prefixed strings."""
+        revoked = LimitedSet(maxlen=100)
+        ids = [
+            str(uuid.uuid4()),
+            "custom-task-id",
+            str(uuid.uuid4()).upper(),  # not canonical, kept as string
+            "ünïcode",
+            "",
+            str(uuid.uuid4()),
+        ]
+        for i, item in enumerate(ids):
+            revoked.add(item, now=10.0 + i)
+
+        result = serialization.loads(serialization.dumps(revoked))
+
+        assert result.as_dict() == revoked.as_dict()
+        assert list(result) == ids
+
+    def test_round_trip_multiple_blocks(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test sets spanning several blocks."""
+        monkeypatch.setattr(serialization, "BLOCK_SIZE", 7)
+        revoked = LimitedSet()
+        for i in range(50):
+            revoked.add(str(uuid.uuid4()) if i % 3 else f"task-{i}", now=float(i + 1))
+
+        result = serialization.loads(serialization.dumps(revoked))
+
+        assert result.as_dict() == revoked.as_dict()
+
+    def test_round_trip_empty(self) -> None:
+        """Test serializing an empty set."""
+        revoked = LimitedSet(maxlen=10, minlen=2)
+
+        result = serialization.loads(serialization.dumps(revoked))
+
+        assert len(result) == 0
+        assert result.maxlen == 10
+        assert result.minlen == 2
+
+    def test_uuid_ids_are_packed(self) -> None:
+        """Test that UUID ids take 16 bytes instead of their string form."""
+        revoked = LimitedSet()
+        for i in range(100):
+            revoked.add(str(uuid.uuid4()), now=float(i + 1))
+
+        payload = serialization.dumps(revoked)
+
+        # 1 kind byte + 16 bytes id + 8 bytes timestamp per entry
+        assert len(payload) < 100 * 26 + 100
+
+    def test_non_string_items_rejected(self) -> None:
+        """Test that items the format cannot hold raise TypeError."""
+        revoked = LimitedSet()
+        revoked.add(42)
+
+        with pytest.raises(TypeError):
+            serialization.dumps(revoked)
+
+
+def chunked(payload: bytes, size: int) -> list[bytes]:
+    return [payload[i : i + size] for i in range(0, len(payload), size)]
+
+
+class TestStreaming:
+    """Test decoding payloads arriving in pieces and merging them in place."""
+
+    @pytest.mark.parametrize("size", [1, 100, 1 << 20])
+    def test_iter_blocks(self, size: int, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that blocks are decoded whatever the chunk boundaries."""
+        monkeypatch.setattr(serialization, "BLOCK_SIZE", 7)
+        revoked = LimitedSet()
+        for i in range(50):
+            revoked.add(str(uuid.uuid4()) if i % 3 else f"task-{i}", now=float(i + 1))
+
+        blocks = list(serialization.iter_blocks(chunked(serialization.dumps(revoked), size)))
+
+        assert len(blocks) == 8
+        assert {
+            item: stamp for items, stamps in blocks for item, stamp in zip(items, stamps)
+        } == revoked.as_dict()
+
+    def test_iter_blocks_truncated(self) -> None:
+        """Test that a truncated payload is an error, not a partial set."""
+        revoked = LimitedSet()
+        revoked.add(str(uuid.uuid4()), now=1.0)
+        payload = serialization.dumps(revoked)
+
+        with pytest.raises(ValueError, match="Truncated"):
+            list(serialization.iter_blocks([payload[:-1]]))
+        with pytest.raises(ValueError, match="Truncated"):
+            list(serialization.iter_blocks([payload[:10]]))
+
+    def test_merge(self) -> None:
+        """Test that merged entries replace existing ones and keep a valid heap."""
+        target = LimitedSet(maxlen=3)
+        target.add("task-1", now=5.0)
+        target.add("task-9", now=9.0)
+
+        count = serialization.merge(
+            target, [(["task-1", "task-2"], [1.0, 2.0]), (["task-3"], [3.0])]
+        )
+        target.purge(now=10.0)
+
+        assert count == 3
+        assert target.as_dict() == {"task-2": 2.0, "task-3": 3.0, "task-9": 9.0}
+        assert target.pop() == "task-2"
+
+    def test_chunk_reader_pickle(self) -> None:
+        """Test that pickles can be loaded from chunks."""
+        revoked = LimitedSet(maxlen=100)
+        for i in range(100):
+            revoked.add(f"task-{i}\n", now=float(i + 1))
+        reader = serialization.ChunkReader(chunked(pickle.dumps(revoked, protocol=2), 3))
+
+        assert pickle.load(reader).as_dict() == revoked.as_dict()
+        assert reader.read() == b""
+
+
+class TestMergeSet:
+    """Test the bulk equivalent of LimitedSet.update() and purge()."""
+
+    @pytest.mark.parametrize(
+        ("maxlen", "expires", "minlen"),
+        [(0, 0, 0), (50, 0, 0), (0, 30, 0), (50, 30, 0), (50, 30, 45), (200, 100, 10)],
+    )
+    def test_matches_update_and_purge(self, maxlen: int, expires: float, minlen: int) -> None:
+        """Test that the result equals update() followed by purge()."""
+        rng = random.Random(maxlen + expires + minlen)
+        # update() purges at the current time, keep the entries around it.
+        now = time.monotonic()
+        start = now - 70.0
+        target = LimitedSet(maxlen=maxlen, expires=expires, minlen=minlen)
+        other = LimitedSet()
+        for i in range(60):
+            target.add(f"task-{rng.randrange(100)}", now=start + i)
+            other.add(f"task-{rng.randrange(100)}", now=start + i + 0.5)
+        expected = LimitedSet(maxlen=maxlen, expires=expires, minlen=minlen)
+        expected._data.update(target._data)
+        expected._refresh_heap()
+
+        expected.update(other)
+        expected.purge(now=now)
+        serialization.merge_set(target, other, now=now)
+
+        assert target.as_dict() == expected.as_dict()
+        assert sorted(target._heap) == target._heap
+        assert [target.pop() for _ in range(len(target))] == [
+            expected.pop() for _ in range(len(expected))
+        ]
+
+    def test_merge_purges(self) -> None:
+        """Test that streamed blocks are evicted and expired in the same pass."""
+        target = LimitedSet(maxlen=3, expires=10)
+
+        serialization.merge(
+            target, [(["a", "b"], [1.0, 2.0]), (["c", "d", "e"], [3.0, 4.0, 5.0])], now=13.5
+        )
+
+        assert target.as_dict() == {"d": 4.0, "e": 5.0}
+        assert target._heap == [(4.0, "d"), (5.0, "e")]
+
+
+class TestRebuild:
+    """Test bulk construction of ``LimitedSet`` instances."""
+
+    def test_rebuild_matches_update(self) -> None:
+        """Test that a rebuilt set behaves like one filled with update()."""
+        items = [f"task-{i}" for i in range(20)]
+        stamps = [float(i + 1) for i in range(20)]
+        expected = LimitedSet(maxlen=100, expires=10)
+        expected.update(dict(zip(items, stamps)))
+
+        result = serialization.rebuild(100, 10, 0, items, stamps)
+
+        assert result.as_dict() == expected.as_dict()
+        assert result._heap == sorted(expected._data.values())
+        result.purge(now=15.0)
+        expected.purge(now=15.0)
+        assert result.as_dict() == expected.as_dict()
+
+    def test_rebuild_unordered_input(self) -> None:
+        """Test that entries are ordered by insertion time whatever the input order."""
+        result = serialization.rebuild(0, 0, 0, ["b", "c", "a"], [2.0, 3.0, 1.0])
+
+        assert result.pop() == "a"
+        assert result.pop() == "b"
+
+    def test_rebuild_applies_maxlen(self) -> None:
+        """Test that the oldest entries beyond maxlen are dropped."""
+        items = [f"task-{i}" for i in range(10)]
+
+        result = serialization.rebuild(4, 0, 0, items, [float(i) for i in range(10)])
+
+        assert sorted(result) == ["task-6", "task-7", "task-8", "task-9"]
+        assert len(result._heap) == 4
+
+    def test_clone(self) -> None:
+        """Test that a clone is independent of the original set."""
+        revoked = LimitedSet(maxlen=10, expires=5)
+        revoked.add("task-1", now=1.0)
+        revoked.add("task-2", now=2.0)
+
+        copy = serialization.clone(revoked)
+        copy.add("task-3", now=3.0)
+
+        assert copy.maxlen == 10
+        assert copy.expires == 5
+        assert sorted(copy) == ["task-1", "task-2", "task-3"]
+        assert sorted(revoked) == ["task-1", "task-2"]
+        assert copy.pop() == "task-1"
@@ -1,12 +1,18 @@
 """Unit tests for Redis state database with simplified blob-based implementation."""
 
+import threading
+import time
 import zlib
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import patch
 
+import pytest
 from celery.utils.collections import LimitedSet  # type: ignore[attr-defined]
 from kombu.serialization import pickle
 
-from celery_redis_statedb.state import RedisStateDB
+from celery_redis_statedb import compression, serialization
+from celery_redis_statedb.state import BaseRedisStateDB, RedisStateDB
+from celery_redis_statedb.tracking import RevokedChanges
 
 
 class TestRedisStateDB:
@@ -43,7 +49,7 @@ class TestRedisStateDB:
         assert stored_data is not None
 
         # Decompress and verify revoked set
-        restored_set = pickle.loads(zlib.decompress(stored_data))
+        restored_set = serialization.loads(compression.decode(stored_data)[1])
         assert "task-1" in restored_set
         assert "task-2" in restored_set
         assert "task-3" in restored_set
@@ -140,6 +146,31 @@ class TestRedisStateDB:
 class TestRedisStateDBErrors:
     """Test error handling in RedisStateDB."""
 
+    def test_subclass_requires_create_client(self) -> None:
+        """Test that subclasses without a client fail at instantiation."""
+
+        class NoClientStateDB(BaseRedisStateDB):
+            pass
+
+        with pytest.raises(TypeError, match="_create_client"):
+            NoClientStateDB(redis_url="redis://localhost:6379/0", worker_name="test-worker")
+
+    def test_init_does_not_connect(self) -> None:
+        """Test that the connection is only opened by the first command."""
+        import redis as redis_module
+
+        with patch(
+            "redis.connection.AbstractConnection.connect",
+            side_effect=redis_module.ConnectionError("refused"),
+        ) as connect:
+            db = RedisStateDB(
+                redis_url="redis://127.0.0.1:1/0", worker_name="test-worker", max_retries=0
+            )
+            connect.assert_not_called()
+
+            assert db.get_clock() == 0
+        connect.assert_called()
+
     def test_get_zrevoked_redis_error(self, redis_db: RedisStateDB) -> None:
         """Test get_zrevoked returns None on Redis error."""
         import redis as redis_module
@@ -206,3 +237,1072 @@ class TestRedisStateDBErrors:
         # Should return None on decompression/unpickling error
         result = redis_db.get_zrevoked()
         assert result is None
+
+
+class TestRedisStateDBZset:
+    """Test RedisStateDB with sorted set storage."""
+
+    @pytest.fixture
+    def redis_db(self, make_db) -> RedisStateDB:
+        return make_db(storage="zset")
+
+    def test_invalid_storage(self, make_db) -> None:
+        """Test that an unknown storage mode is rejected."""
+        import pytest
+        from celery.exceptions import ImproperlyConfigured
+
+        with pytest.raises(ImproperlyConfigured):
+            make_db(storage="unknown")
+
+    def test_update_writes_members(self, redis_db: RedisStateDB) -> None:
+        """Test that revoked tasks are stored as scored sorted set members."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1", now=10.0)
+        revoked_set.add("task-2", now=20.0)
+
+        assert redis_db.update(zrevoked=revoked_set, clock=42) is True
+
+        zset_key = redis_db._get_key("revoked")
+        members = redis_db.redis_client.zrange(zset_key, 0, -1, withscores=True)
+        assert members == [(b"task-1", 10.0), (b"task-2", 20.0)]
+        assert redis_db.redis_client.get(redis_db._get_key("zrevoked")) is None
+        assert redis_db.get_clock() == 42
+
+    def test_update_sends_only_additions(self, redis_db: RedisStateDB) -> None:
+        """Test that a second update only adds the new members."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1", now=10.0)
+        redis_db.update(zrevoked=revoked_set, clock=1)
+
+        revoked_set.add("task-2", now=20.0)
+        pipe = redis_db.redis_client.pipeline()
+        with patch.object(redis_db.redis_client, "pipeline", return_value=pipe):
+            with patch.object(pipe, "zadd", wraps=pipe.zadd) as mock_zadd:
+                redis_db.update(zrevoked=revoked_set, clock=2)
+
+        mock_zadd.assert_called_once_with(redis_db._get_key("revoked"), {"task-2": 20.0})
+
+    def test_update_removes_expired_members(self, redis_db: RedisStateDB) -> None:
+        """Test that evicted members are removed from the sorted set."""
+        revoked_set = LimitedSet(maxlen=2)
+        revoked_set.add("task-1", now=10.0)
+        revoked_set.add("task-2", now=20.0)
+        redis_db.update(zrevoked=revoked_set, clock=1)
+
+        # maxlen evicts the oldest entry
+        revoked_set.add("task-3", now=30.0)
+        redis_db.update(zrevoked=revoked_set, clock=2)
+
+        zset_key = redis_db._get_key("revoked")
+        assert redis_db.redis_client.zrange(zset_key, 0, -1) == [b"task-2", b"task-3"]
+
+    def test_update_removes_discarded_members(self, redis_db: RedisStateDB) -> None:
+        """Test that members discarded out of order are removed too."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1", now=10.0)
+        revoked_set.add("task-2", now=20.0)
+        revoked_set.add("task-3", now=30.0)
+        redis_db.update(zrevoked=revoked_set, clock=1)
+
+        revoked_set.discard("task-2")
+        redis_db.update(zrevoked=revoked_set, clock=2)
+
+        zset_key = redis_db._get_key("revoked")
+        assert redis_db.redis_client.zrange(zset_key, 0, -1) == [b"task-1", b"task-3"]
+
+    def test_update_empty_set_deletes_key(self, redis_db: RedisStateDB) -> None:
+        """Test that an empty revoked set removes the sorted set."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1", now=10.0)
+        redis_db.update(zrevoked=revoked_set, clock=1)
+
+        redis_db.update(zrevoked=LimitedSet(maxlen=100), clock=2)
+
+        assert redis_db.redis_client.exists(redis_db._get_key("revoked")) == 0
+
+    def test_get_zrevoked_round_trip(self, redis_db: RedisStateDB) -> None:
+        """Test rebuilding the LimitedSet from the sorted set."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1", now=10.0)
+        revoked_set.add("task-2", now=20.0)
+        redis_db.update(zrevoked=revoked_set, clock=1)
+
+        result = redis_db.get_zrevoked()
+        assert result is not None
+        assert result.as_dict() == {"task-1": 10.0, "task-2": 20.0}
+
+    def test_get_zrevoked_falls_back_to_blob(self, redis_db: RedisStateDB) -> None:
+        """Test that existing blob data is read when the sorted set is empty."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        redis_db.redis_client.set(
+            redis_db._get_key("zrevoked"), zlib.compress(pickle.dumps(revoked_set))
+        )
+
+        result = redis_db.get_zrevoked()
+        assert result is not None
+        assert "task-1" in result
+
+        # First sorted set write replaces the blob
+        redis_db.update(zrevoked=result, clock=1)
+        assert redis_db.redis_client.get(redis_db._get_key("zrevoked")) is None
+        assert redis_db.get_zrevoked() == result
+
+    def test_get_zrevoked_empty(self, redis_db: RedisStateDB) -> None:
+        """Test getting revoked tasks when Redis is empty."""
+        assert redis_db.get_zrevoked() is None
+
+    def test_get_zrevoked_redis_error(self, redis_db: RedisStateDB) -> None:
+        """Test get_zrevoked returns None on Redis error."""
+        import redis as redis_module
+
+        with patch.object(
+            redis_db.redis_client, "zrange", side_effect=redis_module.RedisError("error")
+        ):
+            assert redis_db.get_zrevoked() is None
+
+
+class TestRedisStateDBJournal:
+    """Test RedisStateDB with journal storage."""
+
+    @pytest.fixture
+    def redis_db(self, make_db) -> RedisStateDB:
+        return make_db(storage="journal", journal_max_len=5)
+
+    def test_update_without_changes_writes_snapshot(self, redis_db: RedisStateDB) -> None:
+        """Test that a full update writes the snapshot and resets the stream."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        redis_db.redis_client.xadd(redis_db._get_key("journal"), {"op": "add"})
+
+        assert redis_db.update(zrevoked=revoked_set, clock=1) is True
+
+        assert redis_db.redis_client.get(redis_db._get_key("zrevoked"))
+        assert redis_db.redis_client.exists(redis_db._get_key("journal")) == 0
+
+    def test_update_appends_changes(self, redis_db: RedisStateDB) -> None:
+        """Test that changes are appended to the stream, one entry each."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1", now=10.0)
+        changes = RevokedChanges(added={"task-1": 10.0}, removed={"task-0"})
+
+        assert redis_db.update(zrevoked=revoked_set, clock=1, changes=changes) is True
+
+        entries = redis_db.redis_client.xrange(redis_db._get_key("journal"))
+        assert [fields for _, fields in entries] == [
+            {b"op": b"add", b"id": b"task-1", b"ts": b"10.0"},
+            {b"op": b"del", b"id": b"task-0"},
+        ]
+        assert redis_db.redis_client.get(redis_db._get_key("zrevoked")) is None
+
+    def test_update_compacts_long_journal(self, redis_db: RedisStateDB) -> None:
+        """Test that the stream is folded into the snapshot past journal_max_len."""
+        revoked_set = LimitedSet(maxlen=100)
+        for i in range(6):
+            revoked_set.add(f"task-{i}", now=float(i + 1))
+            changes = RevokedChanges(added={f"task-{i}": float(i + 1)})
+            redis_db.update(zrevoked=revoked_set, clock=i, changes=changes)
+
+        # The 6th entry exceeds journal_max_len=5
+        assert redis_db.redis_client.exists(redis_db._get_key("journal")) == 0
+        assert redis_db.get_zrevoked() == revoked_set
+
+    def test_get_zrevoked_replays_journal(self, redis_db: RedisStateDB) -> None:
+        """Test loading snapshot plus journal tail."""
+        snapshot = LimitedSet(maxlen=100)
+        snapshot.add("task-1", now=10.0)
+        snapshot.add("task-2", now=20.0)
+        redis_db.update(zrevoked=snapshot, clock=1)
+
+        changes = RevokedChanges(added={"task-3": 30.0}, removed={"task-1"})
+        redis_db.update(zrevoked=snapshot, clock=2, changes=changes)
+
+        result = redis_db.get_zrevoked()
+        assert result is not None
+        assert result.as_dict() == {"task-2": 20.0, "task-3": 30.0}
+        assert redis_db._journal_len == 2
+
+    def test_get_zrevoked_journal_only(self, redis_db: RedisStateDB) -> None:
+        """Test loading when only the stream exists."""
+        changes = RevokedChanges(added={"task-1": 10.0})
+        redis_db.update(zrevoked=LimitedSet(), clock=1, changes=changes)
+
+        result = redis_db.get_zrevoked()
+        assert result is not None
+        assert result.as_dict() == {"task-1": 10.0}
+
+    def test_get_zrevoked_empty(self, redis_db: RedisStateDB) -> None:
+        """Test getting revoked tasks when Redis is empty."""
+        assert redis_db.get_zrevoked() is None
+
+    def test_update_redis_error_keeps_journal_len(self, redis_db: RedisStateDB) -> None:
+        """Test that a failed append does not count towards the stream length."""
+        import redis as redis_module
+
+        changes = RevokedChanges(added={"task-1": 10.0})
+        with patch.object(
+            redis_db.redis_client, "pipeline", side_effect=redis_module.RedisError("err")
+        ):
+            assert redis_db.update(LimitedSet(), clock=1, changes=changes) is False
+        assert redis_db._journal_len == 0
+
+
+class TestRedisStateDBCodec:
+    """Test RedisStateDB blob codecs."""
+
+    def test_update_writes_codec_header(self, make_db) -> None:
+        """Test that written blobs name the configured codec."""
+        db = make_db(codec="none")
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        db.update(zrevoked=revoked_set, clock=1)
+
+        stored_data = db.redis_client.get(db._get_key("zrevoked"))
+        header = compression.HEADER.unpack_from(stored_data)
+        assert header[2] == compression.get_codec("none").codec_id
+
+    def test_get_zrevoked_reads_other_codec(self, make_db) -> None:
+        """Test that a blob written with one codec is read by a differently configured DB."""
+        writer = make_db(codec="none")
+        reader = make_db(codec="zlib")
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1", now=10.0)
+        writer.update(zrevoked=revoked_set, clock=1)
+
+        assert reader.get_zrevoked() == revoked_set
+
+    def test_binary_serializer_round_trip(self, make_db) -> None:
+        """Test that the binary serializer is written and read back."""
+        db = make_db(serializer="binary")
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1", now=10.0)
+        db.update(zrevoked=revoked_set, clock=1)
+
+        stored_data = db.redis_client.get(db._get_key("zrevoked"))
+        assert compression.decode(stored_data)[0] == compression.FORMAT_BINARY
+        assert db.get_zrevoked() == revoked_set
+
+    def test_binary_serializer_falls_back_to_pickle(self, make_db) -> None:
+        """Test that sets the binary format cannot hold are pickled."""
+        db = make_db(serializer="binary")
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add(42)
+        db.update(zrevoked=revoked_set, clock=1)
+
+        stored_data = db.redis_client.get(db._get_key("zrevoked"))
+        assert compression.decode(stored_data)[0] == compression.FORMAT_PICKLE
+        assert 42 in db.get_zrevoked()
+
+    def test_invalid_serializer(self, make_db) -> None:
+        """Test that an unknown serializer is rejected."""
+        import pytest
+        from celery.exceptions import ImproperlyConfigured
+
+        with pytest.raises(ImproperlyConfigured):
+            make_db(serializer="json")
+
+    def test_pickle_not_allowed_ignores_pickle_blob(self, make_db) -> None:
+        """Test that pickled blobs are not loaded when pickle is not allowed."""
+        writer = make_db(serializer="pickle")
+        reader = make_db(allow_pickle=False)
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        writer.update(zrevoked=revoked_set, clock=1)
+
+        with patch("celery_redis_statedb.state.pickle.loads") as loads:
+            assert reader.get_zrevoked() is None
+        loads.assert_not_called()
+
+    def test_pickle_not_allowed_rejects_pickle_serializer(self, make_db) -> None:
+        """Test that the pickle serializer requires pickle to be allowed."""
+        import pytest
+        from celery.exceptions import ImproperlyConfigured
+
+        with pytest.raises(ImproperlyConfigured):
+            make_db(serializer="pickle", allow_pickle=False)
+
+    def test_pickle_not_allowed_no_fallback(self, make_db) -> None:
+        """Test that sets the binary format cannot hold are not written as pickle."""
+        db = make_db(allow_pickle=False)
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add(42)
+
+        assert db.update(zrevoked=revoked_set, clock=1) is False
+        assert db.redis_client.get(db._get_key("zrevoked")) is None
+
+
+class TestRedisStateDBDigest:
+    """Test content digest short-circuits of blob writes and loads."""
+
+    def test_update_writes_digest(self, redis_db: RedisStateDB) -> None:
+        """Test that the payload digest is stored next to the blob."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+
+        redis_db.update(zrevoked=revoked_set, clock=1)
+
+        stored = redis_db.redis_client.get(redis_db._get_key("zrevoked_digest"))
+        assert stored is not None
+        assert stored == redis_db._blob_digest
+
+    def test_update_skips_identical_blob(self, redis_db: RedisStateDB) -> None:
+        """Test that an unchanged payload is neither compressed nor written."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        redis_db.update(zrevoked=revoked_set, clock=1)
+        redis_db.redis_client.delete(redis_db._get_key("zrevoked"))
+
+        with patch("celery_redis_statedb.state.compression.encode") as encode:
+            assert redis_db.update(zrevoked=revoked_set, clock=2) is True
+
+        encode.assert_not_called()
+        assert redis_db.redis_client.get(redis_db._get_key("zrevoked")) is None
+        assert redis_db.get_clock() == 2
+
+    def test_update_writes_changed_blob(self, redis_db: RedisStateDB) -> None:
+        """Test that a changed payload is written."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        redis_db.update(zrevoked=revoked_set, clock=1)
+        first_digest = redis_db._blob_digest
+
+        revoked_set.add("task-2")
+        redis_db.update(zrevoked=revoked_set, clock=2)
+
+        assert redis_db._blob_digest != first_digest
+        assert "task-2" in redis_db.get_zrevoked()
+
+    def test_failed_update_does_not_record_digest(self, redis_db: RedisStateDB) -> None:
+        """Test that a payload is only considered written once Redis accepted it."""
+        import redis
+
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        with patch.object(
+            redis_db.redis_client, "pipeline", side_effect=redis.ConnectionError("down")
+        ):
+            redis_db.update(zrevoked=revoked_set, clock=1)
+
+        assert redis_db._blob_digest is None
+
+    def test_get_zrevoked_records_digest(self, redis_db: RedisStateDB) -> None:
+        """Test that an update identical to the loaded blob is skipped."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        redis_db.update(zrevoked=revoked_set, clock=1)
+        redis_db._blob_digest = None
+
+        loaded = redis_db.get_zrevoked()
+
+        with patch("celery_redis_statedb.state.compression.encode") as encode:
+            redis_db.update(zrevoked=loaded, clock=2)
+        encode.assert_not_called()
+
+    def test_get_zrevoked_unchanged_skips_download(self, redis_db: RedisStateDB) -> None:
+        """Test that a second load with the same remote digest uses the cached snapshot."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        redis_db.update(zrevoked=revoked_set, clock=1)
+        first = redis_db.get_zrevoked()
+
+        with patch("celery_redis_statedb.state.compression.decode") as decode:
+            second = redis_db.get_zrevoked()
+
+        decode.assert_not_called()
+        assert second == first
+        assert second is not first
+        second.add("task-2")
+        assert "task-2" not in redis_db.get_zrevoked()
+
+    def test_get_zrevoked_changed_downloads(self, redis_db: RedisStateDB) -> None:
+        """Test that a changed remote digest loads the new blob."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        redis_db.update(zrevoked=revoked_set, clock=1)
+        redis_db.get_zrevoked()
+
+        revoked_set.add("task-2")
+        redis_db.update(zrevoked=revoked_set, clock=2)
+
+        assert "task-2" in redis_db.get_zrevoked()
+
+    def test_journal_compaction_not_skipped(self, make_db) -> None:
+        """Test that compaction always rewrites the snapshot with the stream."""
+        db = make_db(storage="journal", journal_max_len=5)
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        db.update(zrevoked=revoked_set, clock=1)
+        db.redis_client.delete(db._get_key("zrevoked"))
+
+        db.update(zrevoked=revoked_set, clock=2)
+
+        assert db.redis_client.get(db._get_key("zrevoked"))
+
+
+class TestRedisStateDBGetState:
+    """Test loading revoked tasks and clock together."""
+
+    def test_get_state_blob(self, redis_db: RedisStateDB) -> None:
+        """Test that blob state is read with a single MGET."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        redis_db.update(zrevoked=revoked_set, clock=42)
+
+        with patch.object(redis_db.redis_client, "get", side_effect=AssertionError):
+            zrevoked, clock = redis_db.get_state()
+
+        assert "task-1" in zrevoked
+        assert clock == 42
+
+    def test_get_state_empty(self, redis_db: RedisStateDB) -> None:
+        """Test loading state from an empty Redis."""
+        assert redis_db.get_state() == (None, 0)
+
+    def test_get_state_zset(self, make_db) -> None:
+        """Test loading sorted set state and clock."""
+        db = make_db(storage="zset")
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1", now=10.0)
+        db.update(zrevoked=revoked_set, clock=7)
+
+        zrevoked, clock = db.get_state()
+
+        assert zrevoked.as_dict() == {"task-1": 10.0}
+        assert clock == 7
+
+    def test_get_state_zset_falls_back_to_blob(self, make_db) -> None:
+        """Test that an empty sorted set rolls forward from blob storage."""
+        db = make_db(storage="zset")
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        db.redis_client.set(
+            db._get_key("zrevoked"),
+            compression.encode(
+                serialization.dumps(revoked_set), db.codec, compression.FORMAT_BINARY
+            ),
+        )
+
+        zrevoked, clock = db.get_state()
+
+        assert "task-1" in zrevoked
+        assert clock == 0
+
+    def test_get_state_journal(self, make_db) -> None:
+        """Test loading snapshot, journal and clock in one pipeline."""
+        db = make_db(storage="journal", journal_max_len=5)
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1", now=1.0)
+        db.update(zrevoked=revoked_set, clock=3)
+        db.update(zrevoked=revoked_set, clock=4, changes=RevokedChanges(added={"task-2": 2.0}))
+
+        zrevoked, clock = db.get_state()
+
+        assert zrevoked.as_dict() == {"task-1": 1.0, "task-2": 2.0}
+        assert clock == 4
+        assert db._journal_len == 1
+
+    def test_get_state_redis_error(self, redis_db: RedisStateDB) -> None:
+        """Test get_state returns no state on Redis error."""
+        import redis as redis_module
+
+        with patch.object(
+            redis_db.redis_client, "pipeline", side_effect=redis_module.RedisError("error")
+        ):
+            assert redis_db.get_state() == (None, 0)
+
+    def test_set_clock_max_raises_clock(self, redis_db: RedisStateDB) -> None:
+        """Test that a larger clock is stored."""
+        redis_db.set_clock(10)
+
+        assert redis_db.set_clock_max(20) == 20
+        assert redis_db.get_clock() == 20
+
+    def test_set_clock_max_keeps_larger_clock(self, redis_db: RedisStateDB) -> None:
+        """Test that the stored clock never moves backwards."""
+        redis_db.set_clock(30)
+
+        assert redis_db.set_clock_max(20) == 30
+        assert redis_db.get_clock() == 30
+
+    def test_set_clock_max_empty(self, redis_db: RedisStateDB) -> None:
+        """Test storing the clock when none is stored yet."""
+        assert redis_db.set_clock_max(5) == 5
+        assert redis_db.get_clock() == 5
+
+    def test_set_clock_max_redis_error(self, redis_db: RedisStateDB) -> None:
+        """Test that Redis errors return the requested value."""
+        import redis as redis_module
+
+        with patch.object(redis_db, "_clock_max", side_effect=redis_module.RedisError("error")):
+            assert redis_db.set_clock_max(5) == 5
+
+
+class TestRedisStateDBShared:
+    """Test the fleet-wide shared storage mode."""
+
+    @pytest.fixture
+    def redis_db(self, make_db) -> RedisStateDB:
+        return make_db(storage="shared")
+
+    def test_update_writes_shared_set(self, redis_db: RedisStateDB) -> None:
+        """Test that revokes go to the shared set with wall-clock scores."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+
+        assert redis_db.update(zrevoked=revoked_set, clock=5) is True
+
+        client = redis_db.redis_client
+        score = client.zscore("test:revoked", "task-1")
+        assert abs(score - time.time()) < 5
+        assert client.get("test:test-worker:clock") == b"5"
+        assert client.exists("test:test-worker:zrevoked") == 0
+
+    def test_workers_share_revokes(self, redis_db: RedisStateDB, make_db) -> None:
+        """Test that a revoke stored by one worker is loaded by another."""
+        other = make_db(worker_name="other-worker", storage="shared")
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        redis_db.update(zrevoked=revoked_set, clock=1)
+
+        loaded = other.get_zrevoked()
+
+        assert "task-1" in loaded
+        # Timestamps come back on the local monotonic clock
+        assert abs(loaded.as_dict()["task-1"] - revoked_set.as_dict()["task-1"]) < 1
+
+    def test_broadcast_revoke_stored_once(
+        self, make_db, redis_db: RedisStateDB, fake_redis
+    ) -> None:
+        """Test that the same revoke from several workers keeps the first score."""
+        other = make_db(worker_name="other-worker", storage="shared")
+        first = LimitedSet(maxlen=100)
+        first.add("task-1", now=time.monotonic() - 10)
+        second = LimitedSet(maxlen=100)
+        second.add("task-1")
+
+        redis_db.update(zrevoked=first, clock=1)
+        score = fake_redis.zscore("test:revoked", "task-1")
+        other.update(zrevoked=second, clock=1)
+
+        assert fake_redis.zcard("test:revoked") == 1
+        assert fake_redis.zscore("test:revoked", "task-1") == score
+
+    def test_update_sends_only_additions(self, redis_db: RedisStateDB) -> None:
+        """Test that members already sent are not sent again."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        redis_db.update(zrevoked=revoked_set, clock=1)
+        revoked_set.add("task-2")
+
+        with patch.object(redis_db.redis_client, "pipeline") as pipeline:
+            redis_db.update(zrevoked=revoked_set, clock=2)
+
+        pipe = pipeline.return_value
+        added = pipe.zadd.call_args.args[1]
+        assert list(added) == ["task-2"]
+
+    def test_local_eviction_keeps_shared_member(self, redis_db: RedisStateDB) -> None:
+        """Test that members dropped locally stay in the shared set."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        redis_db.update(zrevoked=revoked_set, clock=1)
+
+        revoked_set.discard("task-1")
+        redis_db.update(zrevoked=revoked_set, clock=2)
+
+        assert redis_db.redis_client.zscore("test:revoked", "task-1") is not None
+
+    def test_update_trims_by_age(self, redis_db: RedisStateDB) -> None:
+        """Test that members older than expires are removed from the shared set."""
+        redis_db.redis_client.zadd("test:revoked", {"old": time.time() - 100})
+        revoked_set = LimitedSet(maxlen=100, expires=50)
+        revoked_set.add("task-1")
+
+        redis_db.update(zrevoked=revoked_set, clock=1)
+
+        assert redis_db.redis_client.zrange("test:revoked", 0, -1) == [b"task-1"]
+
+    def test_update_trims_by_size(self, redis_db: RedisStateDB) -> None:
+        """Test that the shared set keeps at most maxlen newest members."""
+        now = time.time()
+        redis_db.redis_client.zadd("test:revoked", {f"old-{i}": now - 100 + i for i in range(5)})
+        revoked_set = LimitedSet(maxlen=3)
+        revoked_set.add("task-1")
+
+        redis_db.update(zrevoked=revoked_set, clock=1)
+
+        assert redis_db.redis_client.zrange("test:revoked", 0, -1) == [
+            b"old-3",
+            b"old-4",
+            b"task-1",
+        ]
+
+    def test_get_state_shared(self, redis_db: RedisStateDB, make_db) -> None:
+        """Test loading the shared set with the worker's own clock."""
+        other = make_db(worker_name="other-worker", storage="shared")
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        other.update(zrevoked=revoked_set, clock=9)
+        redis_db.set_clock(3)
+
+        zrevoked, clock = redis_db.get_state()
+
+        assert "task-1" in zrevoked
+        assert clock == 3
+
+    def test_get_zrevoked_falls_back_to_worker_blob(self, redis_db: RedisStateDB, make_db) -> None:
+        """Test that switching to shared storage keeps the worker's blob."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        make_db().update(zrevoked=revoked_set, clock=1)
+
+        assert "task-1" in redis_db.get_zrevoked()
+
+
+class TestRedisStateDBCatchUp:
+    """Test catching up on revokes stored by other workers."""
+
+    def test_update_writes_shared_log(self, make_db, fake_redis) -> None:
+        """Test that updates also add revokes to the shared set and record the time."""
+        db = make_db(worker_name="worker-1", catch_up=True)
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+
+        db.update(zrevoked=revoked_set, clock=1)
+
+        assert fake_redis.zscore("test:revoked", "task-1") is not None
+        assert abs(float(fake_redis.get("test:worker-1:synced_at")) - time.time()) < 5
+        assert fake_redis.get("test:worker-1:zrevoked") is not None
+
+    @pytest.mark.parametrize("storage", ["blob", "zset", "journal"])
+    def test_get_state_catches_up(self, make_db, fake_redis, storage: str) -> None:
+        """Test that revokes stored by others after the last update are loaded."""
+        db = make_db(worker_name="worker-1", storage=storage, catch_up=True)
+        own = LimitedSet(maxlen=100)
+        own.add("task-1")
+        db.update(zrevoked=own, clock=1)
+        # Older than the last update (minus margin): already seen or expired
+        fake_redis.zadd("test:revoked", {"task-old": time.time() - 1000})
+
+        other = make_db(worker_name="worker-2", storage=storage, catch_up=True)
+        theirs = LimitedSet(maxlen=100)
+        theirs.add("task-2")
+        other.update(zrevoked=theirs, clock=1)
+
+        restarted = make_db(worker_name="worker-1", storage=storage, catch_up=True)
+        zrevoked, clock = restarted.get_state()
+
+        assert sorted(zrevoked) == ["task-1", "task-2"]
+        assert clock == 1
+
+    def test_get_state_catches_up_with_local_snapshot(self, make_db, tmp_path) -> None:
+        """Test that loading the blob apart from the clock still catches up."""
+        path = str(tmp_path / "worker-1.snapshot")
+        own = LimitedSet(maxlen=100)
+        own.add("task-1")
+        make_db(worker_name="worker-1", local_snapshot=path, catch_up=True).update(
+            zrevoked=own, clock=4
+        )
+        theirs = LimitedSet(maxlen=100)
+        theirs.add("task-2")
+        make_db(worker_name="worker-2", catch_up=True).update(zrevoked=theirs, clock=1)
+
+        restarted = make_db(worker_name="worker-1", local_snapshot=path, catch_up=True)
+        zrevoked, clock = restarted.get_state(into=LimitedSet(maxlen=100))
+
+        assert sorted(zrevoked) == ["task-1", "task-2"]
+        assert clock == 4
+
+    def test_get_state_new_worker_loads_log(self, make_db, fake_redis) -> None:
+        """Test that a worker without a previous update loads the whole shared set."""
+        fake_redis.zadd("test:revoked", {"task-old": time.time() - 1000})
+
+        zrevoked, _clock = make_db(worker_name="worker-1", catch_up=True).get_state()
+
+        assert "task-old" in zrevoked
+
+    def test_get_state_keeps_own_timestamp(self, make_db) -> None:
+        """Test that revokes already known locally are not replaced."""
+        db = make_db(worker_name="worker-1", catch_up=True)
+        own = LimitedSet(maxlen=100)
+        own.add("task-1", now=10.0)
+        db.update(zrevoked=own, clock=1)
+
+        zrevoked, _clock = make_db(worker_name="worker-1", catch_up=True).get_state()
+
+        assert zrevoked.as_dict() == {"task-1": 10.0}
+
+    def test_caught_up_revokes_force_journal_snapshot(self, make_db, fake_redis) -> None:
+        """Test that caught-up revokes are stored with a snapshot in journal storage."""
+        fake_redis.zadd("test:revoked", {"task-2": time.time()})
+        db = make_db(worker_name="worker-1", storage="journal", catch_up=True)
+
+        zrevoked, _clock = db.get_state()
+        db.update(zrevoked=zrevoked, clock=1, changes=RevokedChanges())
+
+        assert db.redis_client.get(db._get_key("zrevoked")) is not None
+        assert db._journal_incomplete is False
+
+    def test_catch_up_disabled_by_default(self, redis_db: RedisStateDB) -> None:
+        """Test that per-worker storage does not touch the shared set by default."""
+        redis_db.redis_client.zadd("test:revoked", {"task-2": time.time()})
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+        redis_db.update(zrevoked=revoked_set, clock=1)
+
+        zrevoked, _clock = redis_db.get_state()
+
+        assert sorted(zrevoked) == ["task-1"]
+        assert redis_db.redis_client.zcard("test:revoked") == 1
+
+
+class TestRedisStateDBCooperative:
+    """Test encoding blobs in a native thread for greenlet pools."""
+
+    @pytest.fixture
+    def thread_offload(self):
+        """Offload recording the threads it ran functions in."""
+        threads = []
+
+        def offload(func, *args):
+            def run():
+                threads.append(threading.get_ident())
+                return func(*args)
+
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                return executor.submit(run).result()
+
+        offload.threads = threads
+        return offload
+
+    def test_round_trip_in_thread(self, make_db, thread_offload) -> None:
+        """Test that blobs are encoded and decoded off the calling thread."""
+        with patch("celery_redis_statedb.state.offload.get_offload", return_value=thread_offload):
+            db = make_db(cooperative=True)
+            other = make_db(cooperative=True)
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+
+        assert db.update(zrevoked=revoked_set, clock=1) is True
+        zrevoked, _clock = other.get_state()
+
+        assert sorted(zrevoked) == ["task-1"]
+        assert len(thread_offload.threads) == 2
+        assert threading.get_ident() not in thread_offload.threads
+
+    def test_encodes_a_copy(self, make_db, fake_redis) -> None:
+        """Test that revokes added while the thread serializes are left to the next sync."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1")
+
+        def offload(func, *args):
+            revoked_set.add("task-2")  # another greenlet revoking meanwhile
+            return func(*args)
+
+        with patch("celery_redis_statedb.state.offload.get_offload", return_value=offload):
+            db = make_db(cooperative=True)
+        db.update(zrevoked=revoked_set, clock=1)
+        stored = serialization.loads(compression.decode(fake_redis.get(db._get_key("zrevoked")))[1])
+
+        assert sorted(stored) == ["task-1"]
+
+    def test_errors_raised_in_thread(self, make_db, fake_redis, thread_offload) -> None:
+        """Test that failures in the thread are handled like inline ones."""
+        with patch("celery_redis_statedb.state.offload.get_offload", return_value=thread_offload):
+            db = make_db(cooperative=True)
+        fake_redis.set(db._get_key("zrevoked"), b"corrupted")
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add(object())
+
+        assert db.get_zrevoked() is None
+        with patch.object(db, "allow_pickle", False):
+            assert db.update(zrevoked=revoked_set, clock=1) is False
+
+    def test_inline_outside_green_pools(self, make_db) -> None:
+        """Test that cooperative mode runs inline without gevent or eventlet."""
+        db = make_db(cooperative=True)
+
+        assert db._offload is None
+
+
+class TestRedisStateDBLoadInto:
+    """Test loading revoked tasks straight into an existing set."""
+
+    @pytest.mark.parametrize("storage", ["blob", "zset", "journal", "shared"])
+    def test_get_state_into(self, make_db, storage: str) -> None:
+        """Test that every storage mode adds the revoked tasks to the given set."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1", now=10.0)
+        revoked_set.add("task-2", now=20.0)
+        make_db(storage=storage).update(zrevoked=revoked_set, clock=3)
+        target = LimitedSet(maxlen=100)
+        target.add("task-0", now=5.0)
+
+        zrevoked, clock = make_db(storage=storage).get_state(into=target)
+
+        assert zrevoked is target
+        assert sorted(target) == ["task-0", "task-1", "task-2"]
+        assert target.pop() == "task-0"
+        assert clock == 3
+
+    def test_get_state_into_empty(self, redis_db: RedisStateDB) -> None:
+        """Test that nothing stored is still reported as None."""
+        assert redis_db.get_state(into=LimitedSet()) == (None, 0)
+
+    def test_blob_streamed(self, make_db, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that blobs are decompressed piece by piece, never as a whole."""
+        monkeypatch.setattr(serialization, "BLOCK_SIZE", 10)
+        monkeypatch.setattr(compression, "STREAM_CHUNK_SIZE", 64)
+        revoked_set = LimitedSet(maxlen=1000)
+        for i in range(500):
+            revoked_set.add(f"task-{i}", now=float(i + 1))
+        db = make_db()
+        db.update(zrevoked=revoked_set, clock=1)
+        target = LimitedSet(maxlen=1000)
+
+        with (
+            patch("celery_redis_statedb.state.compression.decode", side_effect=AssertionError),
+            patch("celery_redis_statedb.state.serialization.loads", side_effect=AssertionError),
+        ):
+            make_db().get_state(into=target)
+
+        assert target.as_dict() == revoked_set.as_dict()
+
+    def test_streamed_digest_skips_identical_write(self, make_db) -> None:
+        """Test that a streamed load records the digest of what Redis holds."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1", now=10.0)
+        make_db().update(zrevoked=revoked_set, clock=1)
+        db = make_db()
+        target = LimitedSet(maxlen=100)
+        db.get_state(into=target)
+
+        with patch("celery_redis_statedb.state.compression.encode") as encode:
+            assert db.update(zrevoked=target, clock=2) is True
+
+        encode.assert_not_called()
+        assert db._snapshot is None
+
+    def test_pickle_blob_into(self, make_db, fake_redis) -> None:
+        """Test that pickled blobs are loaded into the given set as well."""
+        revoked_set = LimitedSet(maxlen=100)
+        revoked_set.add("task-1", now=10.0)
+        fake_redis.set("test:test-worker:zrevoked", zlib.compress(pickle.dumps(revoked_set)))
+        target = LimitedSet(maxlen=100)
+
+        zrevoked, _clock = make_db().get_state(into=target)
+
+        assert zrevoked is target
+        assert target.as_dict() == {"task-1": 10.0}
+
+    def test_truncated_blob_into(
+        self, make_db, fake_redis, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a truncated blob is reported and leaves the set consistent."""
+        monkeypatch.setattr(serialization, "BLOCK_SIZE", 2)
+        revoked_set = LimitedSet(maxlen=100)
+        for i in range(5):
+            revoked_set.add(f"task-{i}", now=float(i + 1))
+        payload = serialization.dumps(revoked_set)
+        fake_redis.set(
+            "test:test-worker:zrevoked",
+            compression.encode(
+                payload[:-4], compression.get_codec("none"), compression.FORMAT_BINARY
+            ),
+        )
+        target = LimitedSet(maxlen=100)
+
+        assert make_db().get_state(into=target) == (None, 0)
+        assert len(target._heap) == len(target._data)
+
+
+class TestRedisStateDBLocalSnapshot:
+    """Test the local snapshot file kept next to blob storage."""
+
+    @staticmethod
+    def revoked(*items: str) -> LimitedSet:
+        revoked_set = LimitedSet(maxlen=100)
+        for i, item in enumerate(items):
+            revoked_set.add(item, now=float(i + 1))
+        return revoked_set
+
+    def test_update_writes_snapshot(self, make_db, fake_redis, tmp_path) -> None:
+        """Test that every written blob is also written to the local file."""
+        path = tmp_path / "worker.snapshot"
+        db = make_db(local_snapshot=str(path))
+
+        db.update(zrevoked=self.revoked("task-1"), clock=1)
+
+        with db.local_snapshot.open() as local:
+            digest, blob = local
+            assert digest == fake_redis.get("test:test-worker:zrevoked_digest")
+            assert bytes(blob) == fake_redis.get("test:test-worker:zrevoked")
+        assert [p.name for p in tmp_path.iterdir()] == ["worker.snapshot"]
+
+    def test_warm_start_skips_download(self, make_db, fake_redis, tmp_path) -> None:
+        """Test that a snapshot matching the Redis digest is loaded from the file."""
+        path = tmp_path / "worker.snapshot"
+        make_db(local_snapshot=str(path)).update(zrevoked=self.revoked("task-1", "task-2"), clock=7)
+        db = make_db(local_snapshot=str(path))
+        target = LimitedSet(maxlen=100)
+
+        with patch.object(db.redis_client, "get", wraps=db.redis_client.get) as get:
+            zrevoked, clock = db.get_state(into=target)
+
+        assert zrevoked is target
+        assert sorted(target) == ["task-1", "task-2"]
+        assert clock == 7
+        assert "test:test-worker:zrevoked" not in [call.args[0] for call in get.call_args_list]
+
+        # Loaded content is what Redis holds, an identical update is skipped.
+        assert db._blob_digest == fake_redis.get("test:test-worker:zrevoked_digest")
+
+    def test_stale_snapshot_downloaded_and_replaced(self, make_db, fake_redis, tmp_path) -> None:
+        """Test that a snapshot older than Redis is replaced by the downloaded blob."""
+        path = tmp_path / "worker.snapshot"
+        make_db(local_snapshot=str(path)).update(zrevoked=self.revoked("task-1"), clock=1)
+        # Written by a worker without the snapshot file
+        make_db(local_snapshot=str(tmp_path / "other.snapshot")).update(
+            zrevoked=self.revoked("task-1", "task-2"), clock=2
+        )
+
+        zrevoked = make_db(local_snapshot=str(path)).get_zrevoked()
+
+        assert sorted(zrevoked) == ["task-1", "task-2"]
+        with make_db(local_snapshot=str(path)).local_snapshot.open() as local:
+            assert local[0] == fake_redis.get("test:test-worker:zrevoked_digest")
+
+    def test_redis_unavailable_loads_snapshot(self, make_db, tmp_path) -> None:
+        """Test that the file is loaded as is while Redis cannot be reached."""
+        import redis as redis_module
+
+        path = tmp_path / "worker.snapshot"
+        make_db(local_snapshot=str(path)).update(zrevoked=self.revoked("task-1"), clock=1)
+        db = make_db(local_snapshot=str(path))
+
+        with patch.object(db.redis_client, "get", side_effect=redis_module.ConnectionError("down")):
+            zrevoked = db.get_zrevoked()
+
+        assert list(zrevoked) == ["task-1"]
+        # Redis may not hold it, the next update writes it again.
+        assert db._blob_digest is None
+
+    def test_redis_cleared_ignores_snapshot(self, make_db, fake_redis, tmp_path) -> None:
+        """Test that the file is not loaded once the state was removed from Redis."""
+        path = tmp_path / "worker.snapshot"
+        make_db(local_snapshot=str(path)).update(zrevoked=self.revoked("task-1"), clock=1)
+        fake_redis.flushall()
+
+        assert make_db(local_snapshot=str(path)).get_state(into=LimitedSet()) == (None, 0)
+
+    @pytest.mark.parametrize("content", [b"", b"garbage", b"CRSL\x01" + b"\0" * 16 + b"junk"])
+    def test_invalid_snapshot_downloaded(self, make_db, tmp_path, content: bytes) -> None:
+        """Test that unreadable or corrupted files fall back to Redis."""
+        path = tmp_path / "worker.snapshot"
+        make_db(local_snapshot=str(tmp_path / "other.snapshot")).update(
+            zrevoked=self.revoked("task-1"), clock=1
+        )
+        path.write_bytes(content)
+
+        assert list(make_db(local_snapshot=str(path)).get_zrevoked()) == ["task-1"]
+
+    def test_snapshot_not_matching_digest(self, make_db, fake_redis, tmp_path) -> None:
+        """Test that a file whose payload does not hash to its digest is ignored."""
+        path = tmp_path / "worker.snapshot"
+        db = make_db(local_snapshot=str(path))
+        db.update(zrevoked=self.revoked("task-1"), clock=1)
+        other = compression.encode(
+            serialization.dumps(self.revoked("task-9")),
+            compression.get_codec("zlib"),
+            compression.FORMAT_BINARY,
+        )
+        db.local_snapshot.write(fake_redis.get("test:test-worker:zrevoked_digest"), other)
+
+        assert list(make_db(local_snapshot=str(path)).get_zrevoked()) == ["task-1"]
+
+    def test_snapshot_not_matching_digest_not_merged(self, make_db, fake_redis, tmp_path) -> None:
+        """Test that a tampered file adds nothing to the set loaded into."""
+        path = tmp_path / "worker.snapshot"
+        db = make_db(local_snapshot=str(path))
+        db.update(zrevoked=self.revoked("real-task"), clock=1)
+        digest = fake_redis.get("test:test-worker:zrevoked_digest")
+        db.local_snapshot.write(
+            digest,
+            compression.encode(
+                serialization.dumps(self.revoked("bogus-task")),
+                compression.get_codec("zlib"),
+                compression.FORMAT_BINARY,
+            ),
+        )
+        target = LimitedSet(maxlen=100)
+
+        zrevoked, _ = make_db(local_snapshot=str(path)).get_state(into=target)
+
+        assert zrevoked is not None
+        assert list(target) == ["real-task"]
+
+    def test_write_error_logged(self, make_db, fake_redis, tmp_path) -> None:
+        """Test that failing to write the file does not fail the update."""
+        db = make_db(local_snapshot=str(tmp_path / "missing" / "worker.snapshot"))
+
+        assert db.update(zrevoked=self.revoked("task-1"), clock=1)
+        assert fake_redis.get("test:test-worker:zrevoked") is not None
+
+    def test_requires_blob_storage(self, make_db, tmp_path) -> None:
+        """Test that other storage modes refuse a local snapshot."""
+        from celery.exceptions import ImproperlyConfigured
+
+        with pytest.raises(ImproperlyConfigured, match="local snapshot"):
+            make_db(local_snapshot=str(tmp_path / "worker.snapshot"), storage="zset")
+
+
+class TestRedisStateDBCluster:
+    """Test the hash-tagged keys of Redis Cluster mode."""
+
+    @pytest.mark.parametrize("storage", ["blob", "zset", "journal"])
+    def test_keys_share_slot(self, make_db, fake_redis, fake_cluster, storage: str) -> None:
+        """Test that all keys of the worker hash to the same slot."""
+        from redis.cluster import key_slot
+
+        db = make_db(fake_cluster, cluster=True, storage=storage)
+        revoked = LimitedSet(maxlen=100)
+        revoked.add("task-1", now=1.0)
+
+        assert db.update(zrevoked=revoked, clock=5)
+        keys = fake_redis.keys("*")
+        assert keys
+        assert all(key.startswith(b"test:{test-worker}:") for key in keys)
+        assert len({key_slot(key) for key in keys}) == 1
+
+        zrevoked, clock = db.get_state()
+        assert clock == 5
+        assert zrevoked is not None
+        assert "task-1" in zrevoked
+
+    @pytest.mark.parametrize("transactions", [True, False])
+    def test_update_pipeline(self, make_db, fake_cluster, transactions: bool) -> None:
+        """Test updates through a cluster pipeline, with or without transactions."""
+        revoked = LimitedSet(maxlen=100)
+        revoked.add("task-1")
+
+        with patch.object(RedisStateDB, "cluster_transactions", transactions):
+            db = make_db(fake_cluster, cluster=True)
+            with patch.object(fake_cluster, "pipeline", wraps=fake_cluster.pipeline) as pipeline:
+                assert db.update(zrevoked=revoked, clock=5)
+
+        pipeline.assert_called_once_with(transaction=transactions)
+        assert list(make_db(fake_cluster, cluster=True).get_zrevoked()) == ["task-1"]
+
+    def test_rejects_shared_storage(self, make_db, fake_cluster) -> None:
+        """Test that the fleet-wide sorted set cannot be used on a cluster."""
+        from celery.exceptions import ImproperlyConfigured
+
+        with pytest.raises(ImproperlyConfigured, match="cluster mode"):
+            make_db(fake_cluster, cluster=True, storage="shared")
+
+    def test_rejects_catch_up(self, make_db, fake_cluster) -> None:
+        """Test that catch-up, reading the fleet-wide key, cannot be used on a cluster."""
+        from celery.exceptions import ImproperlyConfigured
+
+        with pytest.raises(ImproperlyConfigured, match="cluster mode"):
+            make_db(fake_cluster, cluster=True, catch_up=True)
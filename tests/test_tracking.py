@@ -0,0 +1,176 @@
+"""Unit tests for revoked tasks change tracking."""
+
+import pickle
+
+from celery.utils.collections import LimitedSet  # type: ignore[attr-defined]
+
+from celery_redis_statedb.tracking import RevokedTracker
+
+
+class TestRevokedTracker:
+    """Test RevokedTracker functionality."""
+
+    def test_add_bumps_generation(self) -> None:
+        """Test that adding items is tracked."""
+        revoked = LimitedSet(maxlen=100)
+        tracker = RevokedTracker(revoked)
+
+        revoked.add("task-1")
+        assert tracker.generation == 1
+        assert "task-1" in revoked
+
+    def test_update_bumps_generation(self) -> None:
+        """Test that bulk updates (revoke broadcasts) are tracked."""
+        revoked = LimitedSet(maxlen=100)
+        tracker = RevokedTracker(revoked)
+
+        revoked.update(["task-1", "task-2"])
+        assert tracker.generation > 0
+        assert len(revoked) == 2
+
+    def test_discard_missing_item_is_not_a_change(self) -> None:
+        """Test that discarding an unknown item does not mark the set dirty."""
+        revoked = LimitedSet(maxlen=100)
+        revoked.add("task-1")
+        tracker = RevokedTracker(revoked)
+
+        revoked.discard("unknown")
+        assert tracker.generation == 0
+
+        revoked.discard("task-1")
+        assert tracker.generation == 1
+
+    def test_purge_tracks_expired_items(self) -> None:
+        """Test that purge only counts as a change when items expire."""
+        revoked = LimitedSet(maxlen=100, expires=10)
+        revoked.add("task-1", now=100.0)
+        tracker = RevokedTracker(revoked)
+
+        revoked.purge(now=105.0)
+        assert tracker.generation == 0
+
+        revoked.purge(now=200.0)
+        assert tracker.generation == 1
+        assert len(revoked) == 0
+
+    def test_for_set_reuses_tracker(self) -> None:
+        """Test that a set is only wrapped once."""
+        revoked = LimitedSet(maxlen=100)
+
+        tracker = RevokedTracker.for_set(revoked)
+        assert RevokedTracker.for_set(revoked) is tracker
+
+    def test_uninstall(self) -> None:
+        """Test restoring the original methods."""
+        revoked = LimitedSet(maxlen=100)
+        tracker = RevokedTracker(revoked)
+        tracker.uninstall()
+
+        revoked.add("task-1")
+        assert tracker.generation == 0
+        assert "add" not in revoked.__dict__
+
+    def test_tracked_set_pickles(self) -> None:
+        """Test that the wrapped set still pickles as a plain LimitedSet."""
+        revoked = LimitedSet(maxlen=100)
+        RevokedTracker(revoked)
+        revoked.add("task-1")
+
+        restored = pickle.loads(pickle.dumps(revoked))
+        assert restored == revoked
+        assert "add" not in restored.__dict__
+
+    def test_records_changes(self) -> None:
+        """Test that additions and removals are collected when enabled."""
+        revoked = LimitedSet(maxlen=100)
+        revoked.add("task-0", now=5.0)
+        tracker = RevokedTracker(revoked)
+        tracker.record_changes = True
+
+        revoked.add("task-1", now=10.0)
+        revoked.update({"task-2": 20.0})
+        revoked.discard("task-0")
+
+        changes = tracker.drain()
+        assert changes.added == {"task-1": 10.0, "task-2": 20.0}
+        assert changes.removed == {"task-0"}
+        assert not tracker.drain()
+
+    def test_records_evictions(self) -> None:
+        """Test that maxlen evictions are recorded as removals."""
+        revoked = LimitedSet(maxlen=2)
+        tracker = RevokedTracker(revoked)
+        tracker.record_changes = True
+
+        revoked.add("task-1", now=10.0)
+        revoked.add("task-2", now=20.0)
+        revoked.add("task-3", now=30.0)
+
+        changes = tracker.drain()
+        assert changes.added == {"task-2": 20.0, "task-3": 30.0}
+        assert changes.removed == {"task-1"}
+
+    def test_records_limitedset_update(self) -> None:
+        """Test that merging another LimitedSet is recorded."""
+        revoked = LimitedSet(maxlen=100)
+        tracker = RevokedTracker(revoked)
+        tracker.record_changes = True
+
+        other = LimitedSet(maxlen=100)
+        other.add("task-1", now=10.0)
+        revoked.update(other)
+
+        assert tracker.drain().added == {"task-1": 10.0}
+
+    def test_requeue_keeps_newer_changes(self) -> None:
+        """Test that requeued changes never override newer ones."""
+        revoked = LimitedSet(maxlen=100)
+        tracker = RevokedTracker(revoked)
+        tracker.record_changes = True
+
+        revoked.add("task-1", now=10.0)
+        revoked.add("task-2", now=20.0)
+        failed = tracker.drain()
+
+        revoked.discard("task-1")
+        tracker.requeue(failed)
+
+        changes = tracker.drain()
+        assert changes.added == {"task-2": 20.0}
+        assert changes.removed == {"task-1"}
+
+    def test_changes_not_recorded_by_default(self) -> None:
+        """Test that only the generation is kept unless recording is enabled."""
+        revoked = LimitedSet(maxlen=100)
+        tracker = RevokedTracker(revoked)
+
+        revoked.add("task-1")
+        assert tracker.generation == 1
+        assert not tracker.drain()
+
+    def test_on_change_called_for_changes(self) -> None:
+        """Test that the change callback runs on additions and removals only."""
+        revoked = LimitedSet(maxlen=100)
+        tracker = RevokedTracker(revoked)
+        calls = []
+        tracker.on_change = lambda: calls.append(len(revoked))
+
+        revoked.add("task-1")
+        revoked.discard("unknown")
+        revoked.discard("task-1")
+
+        assert calls == [1, 0]
+
+    def test_on_change_not_called_for_purge(self) -> None:
+        """Test that entries expired by a purge are tracked without the change callback."""
+        revoked = LimitedSet(maxlen=100, expires=10)
+        revoked.add("task-1", now=1.0)
+        tracker = RevokedTracker(revoked)
+        calls = []
+        tracker.on_change = lambda: calls.append(len(revoked))
+
+        revoked.purge(now=20.0)
+
+        assert len(revoked) == 0
+        assert tracker.generation == 1
+        assert calls == []